@@ -0,0 +1,99 @@
+import os
+import typing
+import uuid
+
+from benchmarks import data
+
+
+class Case:
+    def __init__(self, name: str, setup: typing.Callable[[str], typing.Any],
+                 run: typing.Callable[[typing.Any, typing.Any], typing.Optional[dict]], full_only: bool = False,
+                 slate_kwargs: dict = None):
+        """
+        A benchmark. setup builds the inputs in a scratch folder outside of the timed region, run is timed and may
+         return extra measurements like {'operations': 2000}
+
+        :param name: The key of the case in the results
+        :param setup: Called with a scratch folder, returns the inputs
+        :param run: Called with a Slate pointed at the stand-in server and the inputs
+        :param full_only: Skip this case unless the full suite is requested
+        :param slate_kwargs: Extra arguments for the Slate the case runs with
+        """
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.full_only = full_only
+        self.slate_kwargs = slate_kwargs or {}
+
+
+CASES = {}
+
+
+def register(name: str, setup, run, full_only: bool = False, slate_kwargs: dict = None):
+    CASES[name] = Case(name, setup, run, full_only=full_only, slate_kwargs=slate_kwargs)
+
+
+def post_result(slate, inputs: dict):
+    slate.backtest.result(symbols=['BTC-USD'], quote_asset='USD', start_time=0, stop_time=1,
+                          account_values=inputs['account_values'], trades=inputs['trades'], exchange='coinbase_pro',
+                          backtest_id=str(uuid.uuid4()), metrics={}, indicators={}, encoding=inputs['encoding'])
+    return {'operations': len(inputs['account_values']['time'] if isinstance(inputs['account_values'], dict)
+                              else inputs['account_values'])}
+
+
+def result_inputs(points: int, encoding: str) -> typing.Callable[[str], dict]:
+    """
+    Account values with points rows and a tenth as many trades, as records for json and as columns otherwise
+    """
+    def setup(scratch_dir: str) -> dict:
+        if encoding == 'json':
+            return {'account_values': data.account_value_records(points),
+                    'trades': data.trade_records(points // 10), 'encoding': encoding}
+        return {'account_values': data.account_value_columns(points), 'trades': data.trade_columns(points // 10),
+                'encoding': encoding}
+    return setup
+
+
+# 10M rows as python dicts take several gigabytes, so the json encoding stops at 1M
+for points, encodings, full_only in ((10_000, ('json', 'columnar', 'binary'), False),
+                                     (1_000_000, ('json', 'columnar', 'binary'), False),
+                                     (10_000_000, ('columnar', 'binary'), True)):
+    for encoding in encodings:
+        register(f'backtest_result_{points}_{encoding}', result_inputs(points, encoding), post_result,
+                 full_only=full_only)
+
+
+register('integration_backtesting_py',
+         lambda scratch_dir: data.backtesting_py_result(trades=20_000),
+         lambda slate, result: slate.integrations.backtesting.post_backtest(result, 'BTC-USD', 'coinbase_pro'))
+
+register('integration_bt_py',
+         lambda scratch_dir: data.BtResult(backtests=4, symbols=50, days=2520),
+         lambda slate, result: slate.integrations.bt.post_backtests(result))
+
+register('integration_jesse',
+         lambda scratch_dir: data.jesse_result(scratch_dir, trades=20_000),
+         lambda slate, path: slate.integrations.jesse.post_backtest(path))
+
+
+def spot_market(slate, orders: int) -> dict:
+    for i in range(orders):
+        slate.live.spot_market('BTC-USD', 'coinbase_pro', str(i), 'buy', size=0.1)
+    # Background orders count once they have actually been sent
+    slate.flush()
+    return {'operations': orders}
+
+
+register('spot_market_sync', lambda scratch_dir: 2_000, spot_market)
+register('spot_market_background', lambda scratch_dir: 20_000, spot_market,
+         slate_kwargs={'background': True, 'queue_size': 100_000})
+
+
+def zip_model(slate, root: str) -> dict:
+    from slate.cli.deploy import zip_dir
+    return {'archive_bytes': os.path.getsize(zip_dir(root, []))}
+
+
+register('zip_dir', lambda scratch_dir: data.source_tree(scratch_dir, files=2_000, file_size=20_000), zip_model)
+register('zip_dir_large', lambda scratch_dir: data.source_tree(scratch_dir, files=20_000, file_size=20_000),
+         zip_model, full_only=True)
@@ -0,0 +1,147 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Every generator is seeded so that runs on different versions upload identical data
+SEED = 7
+START = pd.Timestamp('2015-01-01')
+
+
+def equity_curve(points: int) -> pd.Series:
+    """
+    A random walk account value indexed by minute
+    """
+    rng = np.random.default_rng(SEED)
+    values = 10000 * np.exp(np.cumsum(rng.normal(0, 0.001, points)))
+    return pd.Series(values, index=pd.date_range(START, periods=points, freq='min'), name='value')
+
+
+def account_value_records(points: int) -> list:
+    """
+    Account values in the list of {'time', 'value'} form the json encoding takes
+    """
+    curve = equity_curve(points)
+    return [{'time': t, 'value': v} for t, v in zip(curve.index.asi8 / 1e9, curve.to_numpy())]
+
+
+def account_value_columns(points: int) -> dict:
+    curve = equity_curve(points)
+    return {'time': curve.index.asi8 / 1e9, 'value': curve.to_numpy()}
+
+
+def trade_columns(count: int) -> dict:
+    rng = np.random.default_rng(SEED + 1)
+    return {
+        'time': START.timestamp() + np.sort(rng.uniform(0, count * 600, count)),
+        'price': rng.uniform(10, 1000, count),
+        'size': rng.uniform(0.01, 10, count),
+        'side': np.where(rng.random(count) > 0.5, 'buy', 'sell'),
+        'symbol': np.full(count, 'BTC-USD'),
+        'type': np.full(count, 'market'),
+        'id': np.char.add('t', np.arange(count).astype(str)),
+    }
+
+
+def trade_records(count: int) -> list:
+    columns = trade_columns(count)
+    return [dict(zip(columns, row)) for row in zip(*(column.tolist() for column in columns.values()))]
+
+
+def backtesting_py_result(trades: int) -> dict:
+    """
+    The parts of a backtesting.py result which BacktestingPy.post_backtest reads
+    """
+    rng = np.random.default_rng(SEED + 2)
+    entries = START + pd.to_timedelta(np.sort(rng.integers(0, trades * 120, trades)), unit='min')
+    exits = entries + pd.to_timedelta(rng.integers(1, 120, trades), unit='min')
+    trades_frame = pd.DataFrame({
+        'Size': rng.integers(-100, 100, trades) | 1,
+        'EntryPrice': rng.uniform(10, 1000, trades),
+        'ExitPrice': rng.uniform(10, 1000, trades),
+        'EntryTime': entries,
+        'ExitTime': exits,
+    })
+    equity = equity_curve(trades * 10)
+    return {
+        '_trades': trades_frame,
+        '_equity_curve': pd.DataFrame({'Equity': equity.to_numpy()}, index=equity.index),
+        'Start': equity.index[0],
+        'End': equity.index[-1],
+    }
+
+
+class BtBacktest:
+    def __init__(self, name: str, symbols: list):
+        self.name = name
+        self.data = pd.DataFrame(columns=symbols)
+
+
+class BtResult:
+    def __init__(self, backtests: int, symbols: int, days: int):
+        """
+        The parts of a bt result which BtPy reads, with one price series and a set of transactions per backtest
+        """
+        rng = np.random.default_rng(SEED + 3)
+        index = pd.date_range(START, periods=days, freq='D')
+        names = [f's{i}' for i in range(backtests)]
+        tickers = [f'sym{i}' for i in range(symbols)]
+
+        self.backtest_list = [BtBacktest(name, tickers) for name in names]
+        self.prices = pd.DataFrame({name: 100 * np.exp(np.cumsum(rng.normal(0, 0.01, days))) for name in names},
+                                   index=index)
+        self.stats = {name: {'start': index[0], 'end': index[-1]} for name in names}
+
+        transaction_index = pd.MultiIndex.from_product([index, tickers], names=['Date', 'Security'])
+        self.__transactions = pd.DataFrame({
+            'price': rng.uniform(10, 1000, len(transaction_index)),
+            'quantity': rng.integers(-100, 100, len(transaction_index)) | 1,
+        }, index=transaction_index)
+
+    def get_transactions(self, name: str) -> pd.DataFrame:
+        return self.__transactions
+
+
+def jesse_result(directory: str, trades: int) -> str:
+    """
+    Write a jesse backtest JSON export
+
+    :return: The path to the file
+    """
+    rng = np.random.default_rng(SEED + 4)
+    opened = START.timestamp() + np.sort(rng.uniform(0, trades * 3600, trades))
+    path = os.path.join(directory, 'jesse.json')
+    with open(path, 'w') as file:
+        json.dump({'trades': [{
+            'symbol': 'BTC-USDT',
+            'size': float(size),
+            'type': 'long' if long else 'short',
+            'opened_at': float(o),
+            'closed_at': float(o + 1800),
+            'entry_price': float(entry),
+            'exit_price': float(exit_),
+            'PNL': float(exit_ - entry) * float(size)
+        } for o, size, long, entry, exit_ in zip(opened, rng.uniform(0.1, 2, trades), rng.random(trades) > 0.5,
+                                                   rng.uniform(100, 200, trades), rng.uniform(100, 200, trades))]},
+                  file)
+    return path
+
+
+def source_tree(directory: str, files: int, file_size: int) -> str:
+    """
+    A model folder of Python-like text files spread over nested packages
+
+    :return: The root of the tree
+    """
+    rng = np.random.default_rng(SEED + 5)
+    root = os.path.join(directory, 'model')
+    line = b'def function_%d(argument):\n    return argument * 2  # some fairly compressible source\n'
+    for i in range(files):
+        folder = os.path.join(root, f'package_{i % 20}', f'module_{i % 7}')
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f'file_{i}.py'), 'wb') as file:
+            body = b''.join(line % j for j in range(file_size // len(line) + 1))[:file_size]
+            # Some incompressible bytes so the archive isn't trivially small
+            file.write(body + rng.bytes(file_size // 10))
+    return root
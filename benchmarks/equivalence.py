@@ -0,0 +1,130 @@
+"""
+Check that the vectorized integration conversions produce the same uploads as the row at a time versions they replaced
+
+    python -m benchmarks.equivalence
+
+Exits with status 1 when a conversion differs
+"""
+import sys
+import uuid
+
+import pandas as pd
+
+from benchmarks import data
+
+
+def comparable(records: list) -> list:
+    """
+    Drop the random ids and order rows with the same time consistently, since the reference sort wasn't stable
+    """
+    rows = [tuple(sorted((key, value) for key, value in record.items() if key != 'id')) for record in records]
+    return sorted(rows, key=lambda row: (dict(row)['time'], row))
+
+
+def problems_with(name: str, expected: list, actual: list) -> list:
+    problems = []
+    if comparable(expected) != comparable(actual):
+        problems.append(f'{name} differ from the reference')
+    times = [record['time'] for record in actual]
+    if times != sorted(times):
+        problems.append(f'{name} are not sorted by time')
+    if 'id' in (actual[0] if actual else {}):
+        ids = [record['id'] for record in actual]
+        if len(set(ids)) != len(ids) or any(uuid.UUID(id_).version != 4 for id_ in ids):
+            problems.append(f'{name} ids are not unique uuid4s')
+    return problems
+
+
+def backtesting_py_reference(result: dict, symbol: str) -> tuple:
+    """
+    The trades and account values as BacktestingPy.post_backtest built them with map_trades
+    """
+    from slate.integrations.backtesting_py import map_trades
+
+    trades = result['_trades'] \
+        .apply(map_trades, axis=1, result_type='expand', symbol=symbol) \
+        .unstack() \
+        .reset_index(drop=True) \
+        .apply(pd.Series) \
+        .sort_values('time', ascending=True) \
+        .to_dict('records')
+
+    equity = result['_equity_curve']['Equity']
+    account_values = equity.loc[equity.shift() != equity] \
+        .reset_index() \
+        .rename(columns={'index': 'time', 'Equity': 'value'})
+    account_values['time'] = account_values['time'].map(lambda t: t.timestamp())
+    return trades, account_values.to_dict('records')
+
+
+def check_backtesting_py(result: dict) -> list:
+    from slate.backtest.columnar import columns_to_records
+    from slate.integrations.backtesting_py import trade_columns, account_value_columns
+
+    trades, account_values = backtesting_py_reference(result, 'BTC-USD')
+    return problems_with('backtesting.py trades', trades,
+                         columns_to_records(trade_columns(result['_trades'], 'BTC-USD'))) + \
+        problems_with('backtesting.py account values', account_values,
+                      columns_to_records(account_value_columns(result['_equity_curve']['Equity'])))
+
+
+def bt_py_reference(result, name: str) -> tuple:
+    """
+    The account values and trades as BtPy._post_backtest built them with map_trade
+    """
+    from slate.integrations.bt_py import map_trade
+
+    account_values = result \
+        .prices[name] \
+        .reset_index() \
+        .rename(columns={'index': 'time', name: 'value'})
+    account_values['time'] = account_values['time'].map(lambda t: t.timestamp())
+    account_values = account_values.sort_values('time', ascending=True).to_dict('records')
+
+    trades = result \
+        .get_transactions(name) \
+        .apply(map_trade, axis=1, result_type='expand') \
+        .to_dict('records')
+    return account_values, trades
+
+
+def check_bt_py(result) -> list:
+    from slate.backtest.columnar import columns_to_records
+    from slate.integrations.bt_py import trade_columns, account_value_columns
+
+    problems = []
+    for backtest in result.backtest_list:
+        account_values, trades = bt_py_reference(result, backtest.name)
+        problems += problems_with(f'bt {backtest.name} account values', account_values,
+                                  columns_to_records(account_value_columns(result.prices[backtest.name])))
+        problems += problems_with(f'bt {backtest.name} trades', trades,
+                                  columns_to_records(trade_columns(result.get_transactions(backtest.name))))
+    return problems
+
+
+def timezone_aware(result: dict) -> dict:
+    trades = result['_trades'].copy()
+    for column in ('EntryTime', 'ExitTime'):
+        trades[column] = trades[column].dt.tz_localize('America/New_York')
+    equity = result['_equity_curve'].tz_localize('UTC')
+    return {**result, '_trades': trades, '_equity_curve': equity}
+
+
+CHECKS = {
+    'backtesting_py': lambda: check_backtesting_py(data.backtesting_py_result(trades=5_000)),
+    'backtesting_py_timezone': lambda: check_backtesting_py(timezone_aware(data.backtesting_py_result(trades=2_000))),
+    'bt_py': lambda: check_bt_py(data.BtResult(backtests=2, symbols=5, days=500)),
+}
+
+
+def main():
+    failed = False
+    for name, check in CHECKS.items():
+        problems = check()
+        failed = failed or bool(problems)
+        print(f"{name:<28}{'; '.join(problems) or 'ok'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
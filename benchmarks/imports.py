@@ -0,0 +1,103 @@
+"""
+Import time budgets for the entry points short-lived jobs go through
+
+    python -m benchmarks.imports
+    python -m benchmarks.imports --scale 2   # double every budget on a slow machine
+
+Each scenario runs in a fresh interpreter several times and the fastest run is compared against its budget. A
+ scenario also fails if any of the modules it must not load ended up imported. Exits with status 1 when a scenario
+ fails so that it can gate CI
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.run import ROOT
+
+HEAVY = ['pandas', 'numpy', 'pyarrow', 'aiohttp', 'bt', 'jesse', 'backtesting']
+INTERACTIVE = ['questionary', 'prompt_toolkit', 'yaspin', 'webbrowser']
+
+
+class Scenario:
+    def __init__(self, name: str, code: str, budget: float, forbidden: list):
+        """
+        :param name: The key of the scenario in the results
+        :param code: The statements timed in a fresh interpreter
+        :param budget: The most seconds the statements may take
+        :param forbidden: Top level modules which must not be imported by the statements
+        """
+        self.name = name
+        self.code = code
+        self.budget = budget
+        self.forbidden = forbidden
+
+
+SCENARIOS = [
+    Scenario('import_slate', 'import slate', 0.02, ['requests'] + HEAVY + INTERACTIVE),
+    Scenario('construct_slate', 'import slate\nslate.Slate()', 0.4, HEAVY + INTERACTIVE),
+    Scenario('import_live', 'from slate.live.live import Live', 0.4, HEAVY + INTERACTIVE),
+    Scenario('cli_help', 'import sys\nfrom slate.cli import main\nsys.argv = ["slate", "--help"]\n'
+                         'try:\n    main()\nexcept SystemExit:\n    pass', 0.1,
+             ['requests'] + HEAVY + INTERACTIVE),
+    Scenario('cli_deploy_import', 'from slate.cli.deploy import zip_dir', 0.05, ['requests'] + HEAVY + INTERACTIVE),
+]
+
+# Times the scenario from inside the child so that interpreter startup, which slate can't change, isn't counted
+CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+exec(compile(sys.argv[1], '<scenario>', 'exec'))
+elapsed = time.perf_counter() - started
+print(json.dumps({'time': elapsed, 'modules': sorted({name.split('.')[0] for name in sys.modules})}))
+'''
+
+
+def measure(scenario: Scenario, runs: int) -> dict:
+    """
+    Run a scenario in fresh interpreters and keep the fastest time and every top level module any run imported
+    """
+    times = []
+    modules = set()
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        env = {'SLATE_MODEL_ID': 'benchmark', 'SLATE_API_KEY': 'benchmark', 'SLATE_API_PASS': 'benchmark',
+               **os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')]))}
+        for _ in range(runs):
+            process = subprocess.run([sys.executable, '-c', CHILD, scenario.code], cwd=scratch_dir, env=env,
+                                     capture_output=True, text=True)
+            if process.returncode != 0:
+                return {'error': process.stderr.strip().splitlines()[-1] if process.stderr.strip() else 'crashed'}
+            result = json.loads(process.stdout.strip().splitlines()[-1])
+            times.append(result['time'])
+            modules.update(result['modules'])
+    return {'time': min(times), 'imported': sorted(modules.intersection(scenario.forbidden))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the import time of slate entry points against budgets')
+    parser.add_argument('--runs', type=int, default=5, help='The number of fresh interpreters per scenario')
+    parser.add_argument('--scale', type=float, default=1, help='Multiply every budget by this')
+    args = parser.parse_args()
+
+    failed = False
+    for scenario in SCENARIOS:
+        result = measure(scenario, args.runs)
+        budget = scenario.budget * args.scale
+        if 'error' in result:
+            failed = True
+            print(f"{scenario.name:<28}error: {result['error']}")
+            continue
+        problems = []
+        if result['time'] > budget:
+            problems.append(f'over the {budget * 1e3:.0f}ms budget')
+        if result['imported']:
+            problems.append(f"imported {', '.join(result['imported'])}")
+        failed = failed or bool(problems)
+        print(f"{scenario.name:<28}{result['time'] * 1e3:>8.1f}ms  {'; '.join(problems) or 'ok'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmarks for serialization, the integrations and the transport, run offline against slate's local stand-in server
+
+    python -m benchmarks.run                          # every case except the largest ones
+    python -m benchmarks.run --full                   # include 10M point results and the large zip
+    python -m benchmarks.run zip_dir spot_market_sync # only some cases
+    python -m benchmarks.run --output new.json --compare old.json
+
+Each case runs in a fresh process so that its peak RSS isn't inflated by the cases before it. Results are written
+ as JSON with the wall time, peak RSS and the bytes received by the stand-in server both as they came over the wire
+ and after decompression
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# The repository root, so that the child processes import this checkout of slate
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def peak_rss() -> int:
+    """
+    The peak resident set size of this process in bytes, or None where it can't be measured
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS reports bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_child(name: str, url: str, scratch_dir: str):
+    """
+    Run a single case in this process and print its measurements as JSON
+    """
+    import slate
+    from benchmarks.cases import CASES
+
+    case = CASES[name]
+    inputs = case.setup(scratch_dir)
+    client = slate.Slate(api_url=url, **case.slate_kwargs)
+    setup_rss = peak_rss()
+
+    result = {'setup_rss': setup_rss}
+    started = time.perf_counter()
+    try:
+        result.update(case.run(client, inputs) or {})
+    except Exception as e:
+        result['error'] = f'{type(e).__name__}: {e}'
+    result['wall_time'] = time.perf_counter() - started
+    result['peak_rss'] = peak_rss()
+    if 'operations' in result and result['wall_time'] > 0:
+        result['operations_per_second'] = result['operations'] / result['wall_time']
+    client.close()
+    print(json.dumps(result))
+
+
+def run_case(name: str, server, timeout: float) -> dict:
+    """
+    Run a case in a child process and add the bytes the stand-in server received during it
+    """
+    requests, bytes_received, bytes_on_wire = server.requests, server.bytes_received, server.bytes_on_wire
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        env = {'SLATE_MODEL_ID': 'benchmark', 'SLATE_API_KEY': 'benchmark', 'SLATE_API_PASS': 'benchmark',
+               **os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')]))}
+        # Run from the scratch folder so that a slate.json in the working directory isn't picked up
+        process = subprocess.run([sys.executable, '-m', 'benchmarks.run', '--child', name, '--url', server.url,
+                                  '--scratch', scratch_dir], cwd=scratch_dir, env=env, capture_output=True,
+                                 text=True, timeout=timeout)
+    if process.returncode != 0:
+        return {'error': process.stderr.strip().splitlines()[-1] if process.stderr.strip() else 'crashed'}
+
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result['requests'] = server.requests - requests
+    result['bytes_received'] = server.bytes_received - bytes_received
+    result['wire_bytes'] = server.bytes_on_wire - bytes_on_wire
+    return result
+
+
+def compare(results: dict, baseline: dict):
+    """
+    Print the ratio of each measurement to a previous run, above 1 means this run used more
+    """
+    print(f"\n{'case':<36}{'wall time':>12}{'peak rss':>12}{'wire bytes':>12}")
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            continue
+        ratios = []
+        for key in ('wall_time', 'peak_rss', 'wire_bytes'):
+            if result.get(key) and before.get(key):
+                ratios.append(f'{result[key] / before[key]:>11.2f}x')
+            else:
+                ratios.append(f"{'-':>12}")
+        print(f'{name:<36}' + ''.join(ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the slate benchmarks against a local stand-in server')
+    parser.add_argument('cases', nargs='*', help='The cases to run, defaults to all of them')
+    parser.add_argument('--full', action='store_true', help='Include the largest cases')
+    parser.add_argument('--output', default='benchmarks.json', help='Where to write the results')
+    parser.add_argument('--compare', help='A previous results file to compare against')
+    parser.add_argument('--timeout', type=float, default=1800, help='The longest a single case may take')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--url', help=argparse.SUPPRESS)
+    parser.add_argument('--scratch', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.url, args.scratch)
+        return
+
+    from benchmarks.cases import CASES
+    from slate.standin import StandInServer
+
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(unknown)}. Choose from {', '.join(CASES)}")
+    names = args.cases or [name for name, case in CASES.items() if args.full or not case.full_only]
+
+    results = {}
+    with StandInServer() as server:
+        for name in names:
+            result = run_case(name, server, args.timeout)
+            results[name] = result
+            if 'error' in result:
+                print(f"{name:<36}error: {result['error']}")
+            else:
+                rss = f"{result['peak_rss'] / 2 ** 20:>9.1f}MB" if result['peak_rss'] is not None else f"{'-':>11}"
+                print(f"{name:<36}{result['wall_time']:>9.3f}s {rss} {result['wire_bytes'] / 2 ** 20:>9.2f}MB on the "
+                      f"wire")
+
+    output = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.time(),
+        'full': args.full,
+        'results': results
+    }
+    with open(args.output, 'w') as file:
+        json.dump(output, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            compare(results, json.load(file))
+
+
+if __name__ == '__main__':
+    main()
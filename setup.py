@@ -14,7 +14,7 @@ twine upload dist/*
 
 setup(
     name='blankly-slate',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     version='v1.10.6-beta',
     license='mit',
     description='View, manage and share your model from any codebase with slate',
@@ -30,6 +30,10 @@ setup(
         'pandas',
         'numpy',
     ],
+    extras_require={
+        'async': ['aiohttp'],
+        'zstd': ['zstandard'],
+    },
     classifiers=[
         # Possible: "3 - Alpha", "4 - Beta" or "5 - Production/Stable"
         'Development Status :: 4 - Beta',
@@ -1 +1,19 @@
-from slate.slate import Slate
+# The clients are imported on first access so that `import slate` stays cheap for short-lived jobs
+__all__ = ['Slate', 'AsyncSlate', 'Uploader']
+
+
+def __getattr__(name: str):
+    if name == 'Slate':
+        from slate.slate import Slate
+        return Slate
+    elif name == 'AsyncSlate':
+        from slate.aio.slate import AsyncSlate
+        return AsyncSlate
+    elif name == 'Uploader':
+        from slate.uploader import Uploader
+        return Uploader
+    raise AttributeError(f"module 'slate' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
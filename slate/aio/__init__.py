@@ -0,0 +1,2 @@
+from slate.aio.api import AsyncAPI
+from slate.aio.slate import AsyncSlate
@@ -0,0 +1,177 @@
+import copy
+import json
+import time
+
+from slate.multipart import MultipartBody, FileStream
+from slate.tracing import Traced
+from slate.utils import form_fields, get_api_url
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncAPI(Traced):
+    def __init__(self, model_id, api_key, api_pass, pool_size: int = 100, api_url: str = None):
+        """
+        Initialize the non-blocking API class. This has the same post & get interface as slate.api.API, but both are
+         coroutines backed by an aiohttp connection pool
+
+        :param model_id: The model id to associate the model with
+        :param api_key: The API key for this project
+        :param api_pass: The API pass for this project
+        :param pool_size: The maximum number of concurrent connections to the events service
+        :param api_url: Override the events service url, defaults to SLATE_API_URL or the hosted service
+        """
+        if aiohttp is None:
+            raise ImportError("The async client requires aiohttp. Install it with `pip install blankly-slate[async]`")
+
+        self.__headers = {
+            'model_id': model_id,
+            'api_key': api_key,
+            'api_pass': api_pass,
+            'time': str(time.time())
+        }
+
+        self.time_setting = None
+
+        self.__api_url = get_api_url(api_url)
+        self.__pool_size = pool_size
+
+        # aiohttp sessions must be created inside a running event loop, so this waits for the first request
+        self.__session = None
+
+    def __assemble_route(self, route: str) -> str:
+        """
+        Append the route to the base url. This just pulls the two strings together
+        :param route: route='/v1/backtest/status' -> https://events.blankly.finance/v1/backtest/status
+        :return: str
+        """
+        return self.__api_url + route
+
+    def __update_time(self, time_) -> dict:
+        """
+        Update the time in the headers
+
+        :return: None
+        """
+        headers = copy.copy(self.__headers)
+        if time_ is None:
+            headers['time'] = str(time.time())
+        elif isinstance(time_, (int, float)):
+            headers['time'] = str(time_)
+        else:
+            headers['time'] = str(time_.timestamp())
+        return headers
+
+    @property
+    def model_id(self) -> str:
+        """
+        The model id sent with every request
+        """
+        return self.__headers['model_id']
+
+    @property
+    def api_url(self) -> str:
+        """
+        The base url of the events service
+        """
+        return self.__api_url
+
+    @property
+    def session(self) -> 'aiohttp.ClientSession':
+        """
+        The pooled session shared by every sub-client
+        :return: aiohttp.ClientSession
+        """
+        if self.__session is None or self.__session.closed:
+            connector = aiohttp.TCPConnector(limit=self.__pool_size, keepalive_timeout=60)
+            self.__session = aiohttp.ClientSession(connector=connector)
+        return self.__session
+
+    async def __request(self, method: str, route: str, headers: dict, data=None) -> dict:
+        """
+        Send a request and read its body, reporting it to any hooks
+        """
+        call = self._start_request(method, route)
+        error = None
+        try:
+            started = time.perf_counter()
+            async with self.session.request(method, self.__assemble_route(route), data=data,
+                                            headers=headers) as response:
+                if call is not None:
+                    call.attempts = 1
+                    call.status_code = response.status
+                    call.network_time = time.perf_counter() - started
+                return await self.__read(response)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if call is not None:
+                self._finish_request(call, error)
+
+    @staticmethod
+    async def __read(response: 'aiohttp.ClientResponse') -> dict:
+        """
+        Read the body of a response so the connection can be released back into the pool. Failed statuses are
+         reported as an error in the body so that callers can tell them apart from a success
+
+        :return: dict
+        """
+        body = await response.text()
+        try:
+            parsed = json.loads(body) if body else {}
+        except ValueError:
+            parsed = {'error': body}
+        if response.status >= 400 and 'error' not in parsed:
+            parsed['error'] = f'{response.status} {response.reason}'
+        return parsed
+
+    async def post(self, route, data: dict, time_=None, files_: dict = None) -> dict:
+        """
+        Make a basic POST request at a route
+        :param route: The route without the base /v1/backtest/status
+        :param data: The data to post as a dictionary in the body
+        :param time_: A datetime to pass into the function
+        :param files_: A dictionary containing key/values of files to file paths or streams of bytes
+        :return: dict (exchange response)
+        """
+        headers = self.__update_time(time_)
+        if files_:
+            body = MultipartBody(form_fields(data), {name: FileStream(file) if isinstance(file, str) else file
+                                                     for name, file in files_.items()})
+            headers['Content-Type'] = body.content_type
+            body = self.__stream(body)
+        else:
+            body = form_fields(data)
+
+        return await self.__request('post', route, headers, data=body)
+
+    @staticmethod
+    async def __stream(body: MultipartBody):
+        """
+        Feed a multipart body to aiohttp chunk by chunk
+        """
+        for chunk in body:
+            yield chunk
+
+    async def get(self, route, time_=None) -> dict:
+        """
+        Make a basic GET request at the given route
+        :param route: The route without the base /time
+        :param time_: A datetime to pass into the function
+        :return: dict (the exchange response)
+        """
+        return await self.__request('get', route, self.__update_time(time_))
+
+    async def close(self):
+        """
+        Close the connection pool
+
+        :return: None
+        """
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
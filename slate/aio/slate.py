@@ -0,0 +1,90 @@
+import time
+
+import slate.utils as utils
+from slate.aio.api import AsyncAPI
+
+from slate.live.live import Live
+from slate.model.model import Model
+
+
+class AsyncSlate:
+    def __init__(self, model_id: str = None, pool_size: int = 100, api_url: str = None):
+        """
+        Initialize a new asyncio slate instance. The live, model and backtest clients have the same methods as the
+         ones on Slate, but each call returns an awaitable so many can run concurrently:
+
+            async with AsyncSlate() as slate:
+                await asyncio.gather(*[slate.live.log(line, 'stdout') for line in lines])
+
+        :param model_id: Override the model id found in the slate.json or environment
+        :param pool_size: The maximum number of concurrent connections to the events service
+        :param api_url: Override the events service url, for example to point at a local stand-in server
+        """
+        self.model_id, self.__api_key, self.__api_pass = utils.load_auth()
+        if model_id is not None:
+            self.model_id = model_id
+
+        self.__api = AsyncAPI(self.model_id, self.__api_key, self.__api_pass, pool_size=pool_size,
+                              api_url=api_url)
+
+        # The sub-clients only build the request bodies, so sharing them with an async API makes every call a
+        #  coroutine
+        self.live = Live(self.__api)
+        self.model = Model(self.__api)
+        # Created on first use so that pandas and numpy are only imported when backtests are posted
+        self.__backtest = None
+
+    @property
+    def backtest(self):
+        """
+        The backtest client, created on first use
+
+        :return: slate.backtest.backtest.Backtest
+        """
+        if self.__backtest is None:
+            from slate.backtest.backtest import Backtest
+            self.__backtest = Backtest(self.__api)
+        return self.__backtest
+
+    def add_hook(self, hook):
+        """
+        Call a hook around every request and span made by this slate instance, see slate.tracing for ready-made span
+         and Chrome trace hooks
+
+        :param hook: A slate.tracing.Hook or any object with before_request, after_response or on_error
+        :return: None
+        """
+        self.__api.add_hook(hook)
+
+    def remove_hook(self, hook):
+        self.__api.remove_hook(hook)
+
+    def span(self, name: str, **attributes):
+        """
+        Report a named piece of work to the hooks. Requests awaited inside it by the same task become its children:
+
+            with slate.span('rebalance', symbols=len(symbols)):
+                await asyncio.gather(*[slate.live.spot_market(...) for ...])
+
+        :param name: A name like 'strategy.rebalance'
+        :param attributes: Anything else worth recording
+        """
+        return self.__api.span(name, **attributes)
+
+    async def close(self):
+        """
+        Release the connections held by this slate instance
+
+        :return: None
+        """
+        await self.__api.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def now(self):
+        return time.time()
@@ -1,17 +1,129 @@
+import collections
 import copy
+import inspect
+import json
+import os
+import threading
 import time
+import urllib.parse
+import uuid
 import requests
-from slate.exceptions import APIException
+from requests.adapters import HTTPAdapter
+from slate.batch import RequestBatcher
+from slate.compression import Compressor, GZIP
+from slate.exceptions import APIException, CircuitOpenException
+from slate.multipart import MultipartBody, FileStream
+from slate.pipeline import EventPipeline, BLOCK
+from slate.ratelimit import RateLimiter
+from slate.resilience import RetryPolicy, CircuitBreaker
+from slate.spool import Spool, SpoolReplayer, FSYNC_INTERVAL, BODIES_DIR, BODY_SUFFIX
+from slate.telemetry import Telemetry
+from slate.tracing import Traced
+from slate.utils import form_fields, get_api_url
 
+# Failures which mean the events service couldn't be reached, as opposed to a request it rejected
+UNAVAILABLE_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                      requests.exceptions.HTTPError, CircuitOpenException)
 
-class API:
-    def __init__(self, model_id, api_key, api_pass):
+# Routes which upload large bodies and need longer than the default timeout
+DEFAULT_ROUTE_TIMEOUTS = {
+    '/v1/backtest/result': 300
+}
+
+
+class Dropped:
+    def __init__(self, reason: str):
+        """
+        Returned by API.post in place of a response when a post was discarded and will never be delivered. This is
+         different from None, which means the post was queued in background mode and will be sent later. Dropped is
+         falsy, check for it with isinstance(response, Dropped)
+
+        :param reason: 'rate_limited' or 'queue_full'
+        """
+        self.reason = reason
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return f'Dropped({self.reason!r})'
+
+
+# Posts thrown away by the rate limiter, and background posts thrown away by a full queue
+RATE_LIMITED = Dropped('rate_limited')
+QUEUE_FULL = Dropped('queue_full')
+
+
+def acknowledged(response) -> bool:
+    """
+    Check that the service accepted a post: a response without an error status or an error in its body, or the
+     result of a batched post without an error. Queued and dropped posts haven't been accepted yet
+
+    :param response: What API.post returned
+    """
+    if response is None or isinstance(response, Dropped):
+        return False
+    if isinstance(response, dict):
+        return 'error' not in response
+    if response.status_code >= 400:
+        return False
+    try:
+        body = response.json() if response.content else {}
+    except ValueError:
+        return False
+    return 'error' not in body
+
+
+def accepted(response) -> bool:
+    """
+    Check that a post was acknowledged by the service or queued in background mode, which takes over delivering
+     it. Helpers which resend whatever wasn't accepted use this
+
+    :param response: What API.post returned
+    """
+    if inspect.iscoroutine(response):
+        # Posted through the async API from code which can't await it, so it would never be sent
+        response.close()
+        raise TypeError("This helper needs the synchronous Slate client, the async API returned a coroutine")
+    return response is None or acknowledged(response)
+
+
+def _count_sent(stream, progress: dict):
+    """
+    Pass a streamed body through to requests, adding the size of each chunk to progress['sent'] and the time spent
+     producing it to progress['serialization']
+    """
+    iterator = iter(stream)
+    while True:
+        started = time.perf_counter()
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            progress['serialization'] += time.perf_counter() - started
+        progress['sent'] += len(chunk)
+        yield chunk
+
+
+class API(Traced):
+    def __init__(self, model_id, api_key, api_pass, pool_size: int = 10, preconnect: bool = False,
+                 api_url: str = None, timeout: float = 30, route_timeouts: dict = None, deadline: float = None,
+                 retry: RetryPolicy = None, breaker: CircuitBreaker = None):
         """
         Initialize the lower API class to handle requests
 
         :param model_id: The model id to associate the model with
         :param api_key: The API key for this project
         :param api_pass: The API pass for this project
+        :param pool_size: The maximum number of keep-alive connections held open to the events service
+        :param preconnect: Open a connection immediately so the first event doesn't pay the TCP + TLS handshake
+        :param api_url: Override the events service url, defaults to SLATE_API_URL or the hosted service
+        :param timeout: The number of seconds to wait on the events service for a single attempt
+        :param route_timeouts: Per-route overrides of timeout like {'/v1/live/log': 5}
+        :param deadline: The total number of seconds a request may take across all retries, None for no limit
+        :param retry: How to retry failed requests, defaults to 3 attempts with jittered exponential backoff
+        :param breaker: The circuit breaker which fails requests fast while the service is unhealthy
         """
 
         self.__headers = {
@@ -24,9 +136,259 @@ class API:
         # This is none for live but a datetime when set
         self.time_setting = None
 
-        self.__api_url = 'https://events.blankly.finance'
+        self.__api_url = get_api_url(api_url)
         self.__api_version = 'v1'
 
+        # The session is created lazily and recreated after a fork so that a child process never shares the
+        #  parent's sockets
+        self.__pool_size = pool_size
+        self.__session = None
+        self.__session_pid = None
+        self.__session_lock = threading.Lock()
+
+        self.__timeout = timeout
+        self.__route_timeouts = {**DEFAULT_ROUTE_TIMEOUTS, **(route_timeouts or {})}
+        self.__deadline = deadline
+        self.__retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.counters = collections.Counter()
+        self.telemetry = Telemetry()
+
+        # Set when background mode or batching are enabled
+        self.__pipeline = None
+        self.__batcher = None
+        self.__spool = None
+        self.__spool_only = False
+        self.__replayer = None
+        self.__compressor = None
+        self.__rate_limiter = None
+
+        if preconnect:
+            self.warmup()
+
+    @property
+    def model_id(self) -> str:
+        """
+        The model id sent with every request
+        """
+        return self.__headers['model_id']
+
+    @property
+    def api_url(self) -> str:
+        """
+        The base url of the events service
+        """
+        return self.__api_url
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        The pooled session shared by every sub-client. This is rebuilt if the process has forked since it was created
+        :return: requests.Session
+        """
+        if self.__session is None or self.__session_pid != os.getpid():
+            with self.__session_lock:
+                if self.__session is None or self.__session_pid != os.getpid():
+                    self.__session = self.__create_session()
+                    self.__session_pid = os.getpid()
+        return self.__session
+
+    def __create_session(self) -> requests.Session:
+        """
+        Create a keep-alive session with a connection pool sized for this API
+
+        :return: requests.Session
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.__pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['Connection'] = 'keep-alive'
+        return session
+
+    def warmup(self, timeout: float = 5):
+        """
+        Establish a connection to the events service ahead of the first request. Failures are ignored because the
+         connection will simply be retried on the first real request
+
+        :param timeout: The number of seconds to wait for the connection
+        :return: None
+        """
+        try:
+            self.session.head(self.__api_url, timeout=timeout)
+        except requests.exceptions.RequestException:
+            pass
+
+    def reset(self):
+        """
+        Drop all pooled connections. The next request will open a fresh connection
+
+        :return: None
+        """
+        with self.__session_lock:
+            session, self.__session = self.__session, None
+            # Only close sockets that belong to this process
+            if session is not None and self.__session_pid == os.getpid():
+                session.close()
+
+    def _hook_failed(self, error: Exception):
+        self.counters['hook_errors'] += 1
+
+    def enable_background(self, max_size: int = 10000, policy: str = BLOCK):
+        """
+        Send posts that don't upload files from a background thread instead of the calling thread. In this mode
+         post() returns None immediately for those routes, and the rate limit is applied on the background thread
+         instead of delaying the caller
+
+        :param max_size: The maximum number of events held in memory
+        :param policy: The backpressure policy when the queue is full - 'block', 'drop_oldest' or 'drop_newest'
+        :return: None
+        """
+        if self.__pipeline is None:
+            self.__pipeline = EventPipeline(self.__send_background, max_size=max_size, policy=policy)
+
+    def enable_batching(self, window: float = 0.01, max_size: int = 100):
+        """
+        Coalesce posts that don't upload files into multi-event requests. Each caller still receives the result for
+         its own event, as a dict. A post made on the calling thread waits for its batch to be sent, so batching pays
+         off with the background pipeline or with several threads posting at once. A lone synchronous caller skips
+         the window and has its event sent as a batch of one
+
+        :param window: The number of seconds to wait for more events after the first one is posted
+        :param max_size: The maximum number of events sent in a single request
+        :return: None
+        """
+        if self.__batcher is None:
+            self.__batcher = RequestBatcher(self.__post_batch, window=window, max_size=max_size)
+
+    def enable_spool(self, directory: str, fsync: str = FSYNC_INTERVAL, max_size: int = 256 * 1024 * 1024,
+                     retry_interval: float = 5, spool_only: bool = False):
+        """
+        Write posts that don't upload files to an on-disk spool when the events service can't be reached, and replay
+         them in order from a background thread once it can. While the spool holds unsent events, new events are
+         appended behind them instead of being sent directly. Every record keeps the model id it was posted for
+
+        :param directory: The folder holding the spool segments
+        :param fsync: When to flush the spool to disk - 'always', 'interval' or 'never'
+        :param max_size: The maximum size of the spool in bytes
+        :param retry_interval: The number of seconds between replay attempts while the service is down
+        :param spool_only: Write every post to the spool and never replay it from this process, leaving that to an
+         Uploader sharing the directory. Posts then never touch the network, posts which upload files have their
+         encoded body written to a file next to the segments and are sent from there by the Uploader
+        :return: None
+        """
+        if self.__spool is None:
+            self.__spool = Spool(directory, fsync=fsync, max_size=max_size)
+            self.__spool_only = spool_only
+            if not spool_only:
+                self.__replayer = SpoolReplayer(self.__spool, self.__replay, retry_interval=retry_interval).start()
+
+    def drain_spool(self) -> int:
+        """
+        Replay the spool on the calling thread, stopping at the first event which fails to send
+
+        :return: The number of events sent
+        """
+        if self.__spool is None:
+            return 0
+        return self.__spool.replay(self.__replay)
+
+    def enable_compression(self, algorithm: str = GZIP, level: int = None, threshold: int = 1024):
+        """
+        Compress request bodies. Uploads are compressed as they are streamed, other bodies are compressed once they
+         are at least threshold bytes
+
+        :param algorithm: 'gzip', or 'zstd' which requires the zstandard package
+        :param level: The compression level, defaults to 6 for gzip and 3 for zstd
+        :param threshold: The smallest body in bytes that is compressed
+        :return: None
+        """
+        self.__compressor = Compressor(algorithm, level=level, threshold=threshold)
+
+    def enable_rate_limit(self, rate: float = 50, burst: float = 100, route_budgets: dict = None,
+                          policies: dict = None, max_delay: float = 5):
+        """
+        Limit the rate of posts shared by every sub-client. Under pressure orders are delayed while metrics are
+         sampled and logs are dropped
+
+        :param rate: The number of posts per second across all routes
+        :param burst: The number of posts which can be sent at once after a quiet period
+        :param route_budgets: Budgets for individual routes like {'/v1/live/log': (rate, burst)}
+        :param policies: Override what a priority class does when throttled like {'logs': 'sample'}
+        :param max_delay: The longest a delayed post waits before it is sent anyway
+        :return: None
+        """
+        self.__rate_limiter = RateLimiter(rate, burst, route_budgets=route_budgets, policies=policies,
+                                          max_delay=max_delay)
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """
+        The shared rate limiter, or None if rate limiting is not enabled
+        """
+        return self.__rate_limiter
+
+    @property
+    def compressor(self) -> Compressor:
+        """
+        The request body compressor, or None if compression is not enabled
+        """
+        return self.__compressor
+
+    @property
+    def spool(self) -> Spool:
+        """
+        The on-disk spool, or None if spooling is not enabled
+        """
+        return self.__spool
+
+    @property
+    def batcher(self) -> RequestBatcher:
+        """
+        The request batcher, or None if batching is not enabled
+        """
+        return self.__batcher
+
+    @property
+    def pipeline(self) -> EventPipeline:
+        """
+        The background pipeline, or None if background mode is not enabled
+        """
+        return self.__pipeline
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait for all background events to be sent
+
+        :param timeout: The maximum number of seconds to wait, None waits forever
+        :return: True if everything was sent
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        flushed = True
+        for queue in (self.__pipeline, self.__batcher):
+            if queue is not None:
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+                flushed = queue.flush(remaining) and flushed
+        return flushed
+
+    def close(self, timeout: float = None):
+        """
+        Send any background events and close the connection pool
+
+        :param timeout: The maximum number of seconds to wait for background events
+        :return: None
+        """
+        if self.__pipeline is not None:
+            self.__pipeline.shutdown(timeout)
+            self.__pipeline = None
+        if self.__batcher is not None:
+            self.__batcher.flush(timeout)
+        if self.__spool is not None:
+            if self.__replayer is not None:
+                self.__replayer.stop(timeout)
+            self.__spool.close()
+        self.reset()
+
     def __assemble_route_components(self, components: list) -> str:
         """
         Create a list of components that are assembled into one usable API url
@@ -57,6 +419,8 @@ class API:
         headers = copy.copy(self.__headers)
         if time_ is None:
             headers['time'] = str(time.time())
+        elif isinstance(time_, (int, float)):
+            headers['time'] = str(time_)
         else:
             headers['time'] = str(time_.timestamp())
         return headers
@@ -64,7 +428,7 @@ class API:
     @staticmethod
     def __check_errors(response: requests.Response) -> dict:
         # Check if the body is empty
-        if response.raw._body is None:
+        if not response.content:
             body = {}
         else:
             body = response.json()
@@ -82,19 +446,329 @@ class API:
         :param route: The route without the base /v1/backtest/status
         :param data: The data to post as a dictionary in the body
         :param time_: A datetime to pass into the function
-        :param files_: A dictionary containing key/values of files to file paths
-        :return: dict (exchange response)
+        :param files_: A dictionary containing key/values of files to file paths or streams of bytes
+        :return: dict (exchange response), None if the post was queued in background mode, or RATE_LIMITED or
+         QUEUE_FULL if it was dropped by the rate limiter or by a full background queue. Queued posts go through the
+         rate limiter when they are sent, so they are never RATE_LIMITED here
         """
-        if files_ is not None:
-            for i in files_:
-                files_[i] = open(files_[i], 'rb')
-        else:
-            files_ = {}
+        # Every attempt at delivering this post carries the same key so the service can discard duplicates
+        key = str(uuid.uuid4())
+        if self.__pipeline is not None and files_ is None:
+            # Stamp the event now so the time reflects when it happened rather than when it was sent. The rate limit
+            #  is applied on the sender thread so that a delayed post never holds up the caller
+            if not self.__pipeline.submit(route, data, time.time() if time_ is None else time_, key):
+                return QUEUE_FULL
+            return None
+
+        if not self.__acquire(route):
+            return RATE_LIMITED
+        return self.__post(route, data, time_, files_, key=key)
+
+    def __acquire(self, route: str) -> bool:
+        """
+        Take a rate limit token for a post, waiting if its class is delayed
+
+        :return: False if the post was dropped
+        """
+        if self.__rate_limiter is not None and not self.__rate_limiter.acquire(route):
+            self.counters['rate_limited'] += 1
+            return False
+        return True
+
+    def __send_background(self, route, data: dict, time_=None, key: str = None):
+        """
+        Send an event from the background pipeline. When batching is enabled this doesn't wait for the batch so that
+         the pipeline can keep filling it. A post the rate limiter drops here is only counted in counters
+        """
+        if not self.__acquire(route):
+            return
+        self.__post(route, data, time_, key=key, wait=False)
 
-        route = self.__assemble_route(route)
-        headers = self.__update_time(time_)
-        response = requests.post(route, data=data, headers=headers, files=files_)
-        return response
+    def __post(self, route, data: dict, time_=None, files_: dict = None, key: str = None, wait: bool = True):
+        """
+        Perform the POST request on the calling thread
+        """
+        if self.__spool_only and files_:
+            return self.__spool_upload(route, data, time_, files_, key)
+
+        spooling = self.__spool is not None and not files_
+        if spooling and (self.__spool_only or self.__spool.pending):
+            # Stay in order behind the events already waiting in the spool
+            return self.__spool_event(route, data, time_, key)
+
+        try:
+            if self.__batcher is not None and files_ is None:
+                # The body is encoded exactly as it would be for a single request
+                future = self.__batcher.submit({
+                    'route': route,
+                    'body': urllib.parse.urlencode(form_fields(data)),
+                    'time': self.__update_time(time_)['time'],
+                    'idempotency_key': key
+                }, blocking=wait)
+                if wait:
+                    return future.result()
+                if spooling:
+                    def spool_on_failure(done):
+                        if isinstance(done.exception(), UNAVAILABLE_ERRORS):
+                            self.__spool_event(route, data, time_, key)
+                    future.add_done_callback(spool_on_failure)
+                return None
+
+            return self.__send(route, data, time_, files_, key=key, strict=spooling)
+        except UNAVAILABLE_ERRORS:
+            if not spooling:
+                raise
+            return self.__spool_event(route, data, time_, key)
+
+    def __timeout_for(self, route: str) -> float:
+        """
+        The single attempt timeout of a route
+        """
+        return self.__route_timeouts.get(route, self.__timeout)
+
+    def __request(self, method: str, route: str, url: str, time_=None, key: str = None, strict: bool = False,
+                  extra_headers: dict = None, serialization_time: float = 0, **kwargs) -> requests.Response:
+        """
+        Send a request, retrying connection failures, timeouts and retryable statuses with backoff until the retry
+         policy or deadline runs out. The time taken across every attempt and the bytes sent are recorded in telemetry
+         and reported to any hooks
+
+        :param method: 'get' or 'post'
+        :param route: The route used to look up the timeout
+        :param url: The full url
+        :param key: The idempotency key sent with every attempt
+        :param strict: Raise instead of returning the response if it still has a retryable status at the end
+        :param extra_headers: Headers describing the body such as Content-Type and Content-Encoding
+        :param serialization_time: The number of seconds spent encoding the body before this was called
+        :param kwargs: Passed through to requests
+        :return: requests.Response
+        """
+        progress = {'attempts': 0, 'sent': 0, 'serialization': serialization_time, 'network': 0}
+        call = self._start_request(method, route)
+
+        started = time.perf_counter()
+        response = None
+        error = None
+        try:
+            response = self.__attempt(method, route, url, time_, key, strict, extra_headers, progress, **kwargs)
+            return response
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.telemetry.record(route, time.perf_counter() - started, bytes_sent=progress['sent'],
+                                  bytes_received=len(response.content) if response is not None else 0,
+                                  error=response is None or response.status_code >= 400,
+                                  retries=max(progress['attempts'] - 1, 0))
+            if call is not None:
+                call.payload_size = progress['sent']
+                call.serialization_time = progress['serialization']
+                call.network_time = progress['network']
+                call.attempts = progress['attempts']
+                call.status_code = response.status_code if response is not None else None
+                self._finish_request(call, error)
+
+    def __attempt(self, method: str, route: str, url: str, time_, key: str, strict: bool, extra_headers: dict,
+                  progress: dict, data=None, **kwargs) -> requests.Response:
+        """
+        The retry loop of __request, counting attempts and bytes sent into progress
+        """
+        streamed = data is not None and not isinstance(data, (bytes, str, dict))
+        timeout = self.__timeout_for(route)
+        deadline = None if self.__deadline is None else time.monotonic() + self.__deadline
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self.counters['short_circuited'] += 1
+                raise CircuitOpenException(f"The events service is failing, not sending {route}")
+
+            headers = self.__update_time(time_)
+            if key is not None:
+                headers['Idempotency-Key'] = key
+            if extra_headers:
+                headers.update(extra_headers)
+            attempt_timeout = timeout if deadline is None else max(min(timeout, deadline - time.monotonic()), 0.001)
+
+            self.counters['requests'] += 1
+            progress['attempts'] += 1
+            attempt_started = time.perf_counter()
+            serialization = progress['serialization']
+            try:
+                response = self.session.request(method, url, headers=headers, timeout=attempt_timeout,
+                                                data=_count_sent(data, progress) if streamed else data, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.counters['timeouts' if isinstance(e, requests.exceptions.Timeout) else 'connection_errors'] += 1
+                self.breaker.record_failure()
+                error, response = e, None
+                progress['network'] += time.perf_counter() - attempt_started - \
+                    (progress['serialization'] - serialization)
+                if isinstance(data, (bytes, str)):
+                    progress['sent'] += len(data)
+            except BaseException:
+                # Nothing was learned about the service, so don't leave a half open circuit waiting on this request
+                self.breaker.release()
+                raise
+            else:
+                # Streamed bodies are encoded while they are sent, that time isn't network time
+                progress['network'] += time.perf_counter() - attempt_started - \
+                    (progress['serialization'] - serialization)
+                if not streamed:
+                    progress['sent'] += len(response.request.body or b'')
+                if response.status_code not in self.__retry.statuses:
+                    self.breaker.record_success()
+                    return response
+                self.counters['retryable_statuses'] += 1
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    # Throttled, which shows the service is up but isn't a success either
+                    self.breaker.release()
+                error = requests.exceptions.HTTPError(f"{response.status_code} from {url}", response=response)
+
+            delay = self.__retry.delay(attempt + 1)
+            attempt += 1
+            if attempt >= self.__retry.max_attempts or \
+                    (deadline is not None and time.monotonic() + delay >= deadline):
+                self.counters['failures'] += 1
+                if response is not None and not strict:
+                    return response
+                raise error
+            self.counters['retries'] += 1
+            time.sleep(delay)
+
+    def __send(self, route, data: dict, time_=None, files_: dict = None, key: str = None, strict: bool = False,
+               extra_headers: dict = None):
+        """
+        Send a single POST request. Files are streamed as a multipart body so they are never held in memory
+
+        :param files_: A dictionary of part names to file paths or re-iterable streams of bytes
+        :param strict: Raise if the service still responds with a server error after retrying
+        :param extra_headers: Headers sent on top of the defaults, such as the model id of a replayed event
+        """
+        url = self.__assemble_route(route)
+        extra_headers = extra_headers or {}
+        if files_:
+            return self.__send_body(route, self.__multipart(data, files_), time_, key=key, strict=strict,
+                                    extra_headers=extra_headers)
+
+        serialization_time = 0
+        if self.__compressor is not None:
+            started = time.perf_counter()
+            compressed = self.__compressor.compress(urllib.parse.urlencode(form_fields(data)).encode())
+            serialization_time = time.perf_counter() - started
+            if compressed is not None:
+                return self.__request('post', route, url, time_, key=key, strict=strict, data=compressed,
+                                      extra_headers={**extra_headers,
+                                                     'Content-Type': 'application/x-www-form-urlencoded',
+                                                     'Content-Encoding': self.__compressor.algorithm},
+                                      serialization_time=serialization_time)
+        return self.__request('post', route, url, time_, key=key, strict=strict, data=data,
+                              extra_headers=extra_headers or None, serialization_time=serialization_time)
+
+    @staticmethod
+    def __multipart(data: dict, files_: dict) -> MultipartBody:
+        return MultipartBody(form_fields(data), {name: FileStream(file) if isinstance(file, str) else file
+                                                 for name, file in files_.items()})
+
+    def __send_body(self, route, body, time_, key: str, strict: bool, extra_headers: dict):
+        """
+        Stream an encoded multipart body, compressing it on the way when compression is enabled
+
+        :param body: A re-iterable stream of bytes with a content_type
+        """
+        headers = {**extra_headers, 'Content-Type': body.content_type}
+        if self.__compressor is not None:
+            body = self.__compressor.compress_stream(body)
+            headers['Content-Encoding'] = self.__compressor.algorithm
+        return self.__request('post', route, self.__assemble_route(route), time_, key=key, strict=strict,
+                              extra_headers=headers, data=body)
+
+    def __spool_event(self, route, data: dict, time_=None, key: str = None):
+        """
+        Write an event to the spool to be replayed later
+
+        :return: None
+        """
+        self.__spool.append({
+            'route': route,
+            'data': data,
+            'time': float(self.__update_time(time_)['time']),
+            'idempotency_key': key,
+            'model_id': self.model_id
+        })
+        return None
+
+    def __spool_upload(self, route, data: dict, time_, files_: dict, key: str):
+        """
+        Write the encoded multipart body of a post which uploads files next to the spool segments, and spool a record
+         pointing at it. The body is complete on disk before the record is appended, so a replay never sees half of it
+
+        :return: None
+        """
+        body = self.__multipart(data, files_)
+        bodies = os.path.join(self.__spool.directory, BODIES_DIR)
+        os.makedirs(bodies, exist_ok=True)
+        name = f'{key}{BODY_SUFFIX}'
+        path = os.path.join(bodies, name)
+        with open(path + '.tmp', 'wb') as file:
+            for chunk in body:
+                file.write(chunk)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path + '.tmp', path)
+
+        if not self.__spool.append({
+            'route': route,
+            'body': name,
+            'content_type': body.content_type,
+            'time': float(self.__update_time(time_)['time']),
+            'idempotency_key': key,
+            'model_id': self.model_id
+        }):
+            os.remove(path)
+        return None
+
+    def __replay(self, record: dict):
+        """
+        Send a spooled event, raising if it was not delivered. Records written before model ids were spooled are sent
+         for this API's model
+        """
+        headers = {'model_id': record['model_id']} if record.get('model_id') else {}
+        key = record.get('idempotency_key')
+        if 'body' not in record:
+            self.__send(record['route'], record['data'], record['time'], key=key, strict=True, extra_headers=headers)
+            return
+
+        path = os.path.join(self.__spool.directory, BODIES_DIR, record['body'])
+        if not os.path.exists(path):
+            # Delivered by a replay which was interrupted before it could acknowledge the record
+            return
+        body = FileStream(path)
+        body.content_type = record['content_type']
+        self.__send_body(record['route'], body, record['time'], key=key, strict=True, extra_headers=headers)
+        os.remove(path)
+
+    def __post_batch(self, events: list) -> list:
+        """
+        Send a list of events as a single multi-event request
+
+        :param events: A list of {'route', 'body', 'time', 'idempotency_key'} events
+        :return: A list with the response body for each event
+        """
+        route = '/v1/batch'
+        started = time.perf_counter()
+        body = json.dumps({'events': events}).encode()
+        headers = {'Content-Type': 'application/json'}
+        if self.__compressor is not None:
+            compressed = self.__compressor.compress(body)
+            if compressed is not None:
+                body = compressed
+                headers['Content-Encoding'] = self.__compressor.algorithm
+        response = self.__request('post', route, self.__assemble_route_components(['batch']), key=str(uuid.uuid4()),
+                                  strict=True, extra_headers=headers, data=body,
+                                  serialization_time=time.perf_counter() - started)
+        body = self.__check_errors(response)
+        return body['results']
 
     def get(self, route, time_=None):
         """
@@ -103,6 +777,4 @@ class API:
         :param time_: A datetime to pass into the function
         :return: dict (the exchange response)
         """
-        route = self.__assemble_route(route)
-        headers = self.__update_time(time_)
-        return requests.get(route, headers=headers)
+        return self.__request('get', route, self.__assemble_route(route), time_)
@@ -1,11 +1,20 @@
 import datetime
+import functools
+import inspect
 import json
-import os
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
 import pandas as pd
 import numpy as np
 
-from slate.api import API
+from slate.api import API, accepted
+from slate.backtest.chunked import ChunkManifest, slice_values, value_count
+from slate.backtest.columnar import ColumnarStream, ENCODINGS, JSON, to_columns, columns_to_records
+from slate.backtest.downsample import downsample as downsample_columns
+from slate.exceptions import APIException
+from slate.multipart import JSONStream
 from slate.utils import assemble_base
 
 
@@ -51,68 +60,146 @@ class Backtest:
                backtest_id: str = None,
                metrics: dict = None,
                indicators: dict = None,
-               time: datetime.datetime = None
+               time: datetime.datetime = None,
+               encoding: str = JSON,
+               float_dtype: str = 'float64',
+               downsample: str = None,
+               max_points: int = 5000,
+               chunk_size: int = None,
+               upload_workers: int = 1,
+               manifest_dir: str = None
                ) -> dict:
         """
         Post a backtest result object to the platform
 
         **Look at this link to learn more**:
         https://docs.blankly.finance/services/events#post-v1backtestresult
+
+        :param encoding: How account values and trades are uploaded. 'json' sends lists of objects, 'columnar' sends
+         parallel JSON arrays with delta encoded timestamps, 'binary' sends the raw little-endian column buffers and
+         'arrow' sends an Arrow IPC stream (requires pyarrow). The columnar encodings also accept a DataFrame, a
+         dictionary of arrays or a Series indexed by time
+        :param float_dtype: 'float64' or 'float32' for float columns in the binary and arrow encodings
+        :param downsample: Reduce account_values to max_points before uploading. 'minmax' keeps the high and low of
+         each bucket, 'lttb' keeps the visually most significant points. Both keep the largest drawdown intact
+        :param max_points: The number of account values kept when downsampling
+        :param chunk_size: Upload account_values and trades in chunks of this many rows. Acknowledged chunks are
+         recorded in a local manifest so that if the upload fails, calling result again with the same backtest_id
+         only sends the chunks which are missing. Chunked uploads need the synchronous Slate client
+        :param upload_workers: The number of chunks uploaded in parallel
+        :param manifest_dir: Where chunk manifests are kept, defaults to the slate data folder
         """
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding: {encoding}. Use one of {', '.join(ENCODINGS)}")
+        if chunk_size is not None and inspect.iscoroutinefunction(self.__api.post):
+            # Each chunk is checked from a worker thread before the next is sent, which coroutines can't do
+            raise TypeError("Chunked uploads need the synchronous Slate client, leave chunk_size unset with "
+                                      "AsyncSlate instead")
+
         if backtest_id is None:  # generate one if they don't input one
             backtest_id = str(uuid4())
 
-        # Convert any ndarray
-        if isinstance(account_values, np.ndarray):
-            account_values = account_values.tolist()
-        if isinstance(trades, np.ndarray):
-            trades = trades.tolist()
-
-        if isinstance(account_values, pd.Series):
-            account_values = account_values.tolist()
-        if isinstance(trades, pd.Series):
-            trades = trades.tolist()
-
         if isinstance(start_time, datetime.datetime):
             start_time = start_time.timestamp()
         if isinstance(stop_time, datetime.datetime):
             stop_time = stop_time.timestamp()
 
-        data = {
-            'symbols': symbols,
-            'quote_asset': quote_asset,
-            'start_time': start_time,
-            'stop_time': stop_time,
-            'account_values': account_values,
-            'trades': trades,
-            'exchange': exchange,
-            'metrics': metrics,
-            'backtest_id': backtest_id,
-            'indicators': indicators,
-        }
-        files = {}
-        if len(account_values) > 0:
-            import tempfile
-            account_values_json = {
-                'account_values': account_values
+        def upload():
+            nonlocal account_values
+            data = {
+                'symbols': symbols,
+                'quote_asset': quote_asset,
+                'start_time': start_time,
+                'stop_time': stop_time,
+                'exchange': exchange,
+                'metrics': metrics,
+                'backtest_id': backtest_id,
+                'indicators': indicators,
             }
-            fd, path = tempfile.mkstemp()
-            open(path, 'w').write(json.dumps(account_values_json, indent=2))
-            os.close(fd)
-            files['account_values'] = path
-            data.pop('account_values')
-        if len(trades) > 0:
-            import tempfile
-            trades_json = {
-                'trades': trades
-            }
-            fd, path = tempfile.mkstemp()
-            open(path, 'w').write(json.dumps(trades_json, indent=2))
-            os.close(fd)
-            files['trades'] = path
-            data.pop('trades')
 
-        return self.__api.post(self.__assemble_base('/result'), data, time, files_=files)
+            if downsample is not None and value_count(account_values) > max_points:
+                with self.__api.span('backtest.result.downsample', method=downsample, max_points=max_points):
+                    account_values = downsample_columns(to_columns(account_values), downsample, max_points)
+                    if encoding == JSON:
+                        account_values = columns_to_records(account_values)
+
+            if encoding != JSON:
+                data['encoding'] = encoding
+
+            def encode(key, values):
+                # The arrays are encoded while they are uploaded so that large results are never copied into a
+                #  list or written out to a temporary file
+                if encoding == JSON:
+                    return JSONStream(key, values)
+                return ColumnarStream(key, values, encoding=encoding, float_dtype=float_dtype)
+
+            fields = {key: values for key, values in (('account_values', account_values), ('trades', trades))
+                      if value_count(values) > 0}
+
+            if chunk_size is not None:
+                return self.__result_chunked(data, fields, encode, chunk_size, upload_workers, manifest_dir, time)
+
+            files = {key: encode(key, values) for key, values in fields.items()}
+            return self.__api.post(self.__assemble_base('/result'), data, time, files_=files)
+
+        # Hooks see the encoding and upload requests nested inside this span
+        span = functools.partial(self.__api.span, 'backtest.result', backtest_id=backtest_id, encoding=encoding)
+        if inspect.iscoroutinefunction(self.__api.post):
+            return self.__await_in_span(span, upload)
+        with span():
+            return upload()
+
+    @staticmethod
+    async def __await_in_span(span, upload):
+        """
+        The async API only sends a post once it is awaited, so the span stays open until then
+        """
+        with span():
+            return await upload()
+
+    def __result_chunked(self, data: dict, fields: dict, encode, chunk_size: int, upload_workers: int,
+                         manifest_dir: str, time: datetime.datetime = None):
+        """
+        Upload each field to /v1/backtest/result-chunk in pieces of chunk_size rows, then post the result itself
+         with the number of chunks of each field
+        """
+        backtest_id = data['backtest_id']
+        counts = {key: math.ceil(value_count(values) / chunk_size) for key, values in fields.items()}
+        manifest = ChunkManifest(backtest_id, chunk_size, counts, manifest_dir)
+        failed = threading.Event()
+
+        def upload(field: str, index: int):
+            # Don't keep uploading into an outage, the rest will be resumed next time
+            if failed.is_set():
+                raise APIException(f"Skipped chunk {index} of {field}")
+            start = index * chunk_size
+            chunk = slice_values(fields[field], start, start + chunk_size)
+            response = self.__api.post(self.__assemble_base('/result-chunk'), {
+                'backtest_id': backtest_id,
+                'field': field,
+                'index': index,
+                'count': counts[field],
+                'encoding': data.get('encoding')
+            }, time, files_={field: encode(field, chunk)})
+            if not accepted(response):
+                failed.set()
+                raise APIException(f"Chunk {index} of {field} was not acknowledged")
+            manifest.acknowledge(field, index)
+
+        jobs = [(field, index) for field in fields for index in manifest.pending(field)]
+        with ThreadPoolExecutor(max_workers=upload_workers, thread_name_prefix='slate-chunk-upload') as executor:
+            futures = [executor.submit(upload, *job) for job in jobs]
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        if errors:
+            raise APIException(f"{len(errors)} of {len(jobs)} chunks failed to upload for backtest {backtest_id}. "
+                               f"Call result again with the same backtest_id to resume: {errors[0]}")
+
+        response = self.__api.post(self.__assemble_base('/result'), {**data, 'chunks': json.dumps(counts)}, time,
+                                   files_={})
+        # Spooled posts count too, the spool delivers them in order after the chunks
+        if accepted(response):
+            manifest.remove()
+        return response
 
     def status(self,
                successful: bool,
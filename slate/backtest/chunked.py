@@ -0,0 +1,86 @@
+import json
+import os
+import threading
+
+from slate.utils import get_data_dir
+
+
+def slice_values(values, start: int, end: int):
+    """
+    Take rows start to end of account values or trades in any format accepted by Backtest.result without copying
+     the whole input
+
+    :return: The same type as values
+    """
+    if isinstance(values, dict):
+        return {key: column[start:end] for key, column in values.items()}
+    if hasattr(values, 'iloc'):
+        return values.iloc[start:end]
+    return values[start:end]
+
+
+def value_count(values) -> int:
+    """
+    The number of rows in account values or trades
+    """
+    if isinstance(values, dict):
+        return len(next(iter(values.values()))) if values else 0
+    return len(values)
+
+
+class ChunkManifest:
+    def __init__(self, backtest_id: str, chunk_size: int, counts: dict, directory: str = None):
+        """
+        A record on disk of which chunks of a backtest result the platform has acknowledged. If an upload with the
+         same backtest id, chunk size and chunk counts is started again it picks up where the last one stopped
+
+        :param backtest_id: The identifier for the backtest
+        :param chunk_size: The number of rows in each chunk
+        :param counts: The number of chunks for each field like {'account_values': 10, 'trades': 2}
+        :param directory: Where manifests are kept, defaults to the slate data folder
+        """
+        directory = directory or os.path.join(get_data_dir(), 'uploads')
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f'{backtest_id}.json')
+        self.__lock = threading.Lock()
+
+        self.state = {
+            'backtest_id': backtest_id,
+            'chunk_size': chunk_size,
+            'counts': counts,
+            'acknowledged': {field: [] for field in counts}
+        }
+        try:
+            with open(self.path, 'r') as file:
+                existing = json.load(file)
+            # A different layout means the previous chunks don't line up with these ones
+            if existing.get('chunk_size') == chunk_size and existing.get('counts') == counts:
+                self.state = existing
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def pending(self, field: str) -> list:
+        """
+        The chunk indices of a field which have not been acknowledged
+        """
+        done = set(self.state['acknowledged'][field])
+        return [i for i in range(self.state['counts'][field]) if i not in done]
+
+    def acknowledge(self, field: str, index: int):
+        """
+        Record that a chunk was received. The manifest is replaced atomically so a crash never corrupts it
+        """
+        with self.__lock:
+            self.state['acknowledged'][field].append(index)
+            with open(self.path + '.tmp', 'w') as file:
+                json.dump(self.state, file)
+            os.replace(self.path + '.tmp', self.path)
+
+    def remove(self):
+        """
+        Delete the manifest once the upload has completed
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
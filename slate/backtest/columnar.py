@@ -0,0 +1,240 @@
+import json
+import struct
+import typing
+
+import numpy as np
+import pandas as pd
+
+from slate.multipart import CHUNK_SIZE, JSONStream
+
+JSON = 'json'
+COLUMNAR = 'columnar'
+BINARY = 'binary'
+ARROW = 'arrow'
+ENCODINGS = (JSON, COLUMNAR, BINARY, ARROW)
+
+# Timestamps are stored as integer deltas in the coarsest of these units that doesn't lose precision
+TIME_UNITS = (('s', 1), ('ms', 1_000), ('us', 1_000_000))
+
+
+def epoch_seconds(times) -> np.ndarray:
+    """
+    Convert a column of timestamps into float epoch seconds without touching the individual elements. Naive
+     timestamps are taken to be UTC, like Timestamp.timestamp() does
+    """
+    if isinstance(getattr(times, 'dtype', None), pd.DatetimeTZDtype):
+        times = pd.DatetimeIndex(times).tz_convert(None)
+    if isinstance(times, (pd.DatetimeIndex, pd.Series)) and times.dtype.kind == 'M':
+        times = times.to_numpy()
+    times = np.asarray(times)
+    if times.dtype.kind == 'M':
+        return times.astype('datetime64[ns]').view('int64') / 1e9
+    if times.dtype.kind == 'O':
+        # Timestamps or datetimes mixed in with python objects
+        return pd.to_datetime(times).to_numpy().astype('datetime64[ns]').view('int64') / 1e9
+    return times.astype('float64')
+
+
+def records_to_columns(records: list) -> dict:
+    """
+    Turn a list of dictionaries into a dictionary of columns. Numeric columns become numpy arrays, any other column
+     stays a list
+
+    :param records: A list like [{'time': 1651647605, 'value': 10}, ...]
+    :return: dict
+    """
+    keys = {}
+    for record in records:
+        for key in record:
+            keys[key] = None
+
+    columns = {}
+    for key in keys:
+        column = [record.get(key) for record in records]
+        array = np.asarray(column)
+        columns[key] = array if array.dtype.kind in 'iufb' else column
+    return columns
+
+
+def columns_to_records(columns: dict) -> list:
+    """
+    Turn a dictionary of columns back into a list of dictionaries. Whole second timestamps are written as integers
+
+    :param columns: A dictionary of numpy arrays or lists of the same length
+    :return: list
+    """
+    lists = {}
+    for name, column in columns.items():
+        if isinstance(column, np.ndarray):
+            if name == 'time' and column.dtype.kind == 'f' and np.array_equal(column, np.floor(column)):
+                column = column.astype('int64')
+            column = column.tolist()
+        lists[name] = column
+    return [dict(zip(lists, row)) for row in zip(*lists.values())]
+
+
+def to_columns(values) -> dict:
+    """
+    Convert account values or trades in any of the formats accepted by Backtest.result into columns. NumPy and
+     pandas inputs keep their buffers, lists of dictionaries are converted column by column
+
+    :param values: A list of dictionaries, a DataFrame, a dictionary of arrays, a numpy structured or (n, 2) array,
+     or a pandas Series indexed by time
+    :return: A dictionary of column names to numpy arrays or lists, with any 'time' column in epoch seconds
+    """
+    if isinstance(values, dict):
+        columns = {key: np.asarray(column) for key, column in values.items()}
+    elif isinstance(values, pd.DataFrame):
+        columns = {str(key): values[key].to_numpy() for key in values.columns}
+    elif isinstance(values, pd.Series):
+        if values.dtype.kind == 'O':
+            columns = records_to_columns(values.tolist())
+        else:
+            columns = {'time': epoch_seconds(values.index), 'value': values.to_numpy()}
+    elif isinstance(values, np.ndarray):
+        if values.dtype.names:
+            columns = {name: values[name] for name in values.dtype.names}
+        elif values.ndim == 2 and values.shape[1] == 2:
+            columns = {'time': values[:, 0], 'value': values[:, 1]}
+        else:
+            columns = records_to_columns(values.tolist())
+    else:
+        columns = records_to_columns(list(values))
+
+    if 'time' in columns:
+        columns['time'] = epoch_seconds(columns['time'])
+    return columns
+
+
+def encode_time(times: np.ndarray) -> typing.Tuple[int, np.ndarray, str]:
+    """
+    Delta encode epoch timestamps as integers
+
+    :param times: Float epoch seconds
+    :return: The first tick, the deltas between ticks in the smallest integer type that holds them (the first delta
+     is 0) and the unit of a tick
+    """
+    for unit, scale in TIME_UNITS:
+        scaled = times * scale
+        ticks = np.round(scaled)
+        if np.array_equal(ticks, scaled):
+            break
+    ticks = ticks.astype('int64')
+    base = int(ticks[0]) if len(ticks) else 0
+    deltas = np.diff(ticks, prepend=base)
+    # Regularly spaced data usually fits in a much smaller integer
+    for dtype in ('int8', 'int16', 'int32'):
+        info = np.iinfo(dtype)
+        if not len(deltas) or (deltas.min() >= info.min and deltas.max() <= info.max):
+            return base, deltas.astype(dtype), unit
+    return base, deltas, unit
+
+
+class ColumnarStream:
+    def __init__(self, key: str, values, encoding: str = COLUMNAR, float_dtype: str = 'float64'):
+        """
+        Encode account values or trades as parallel columns instead of a list of objects. Timestamps are delta
+         encoded as integers
+
+         - columnar: {key: {"length", "time_base", "time_unit", "columns": {"time": [deltas], "value": [...]}}} JSON
+         - binary: a little-endian uint32 header length, a JSON header describing each column, then the raw
+            little-endian column buffers back to back. Columns which aren't numeric are kept in the header
+         - arrow: an Arrow IPC stream holding a single record batch, this needs pyarrow
+
+        :param key: 'account_values' or 'trades'
+        :param values: Any format accepted by to_columns
+        :param encoding: 'columnar', 'binary' or 'arrow'
+        :param float_dtype: 'float64' or 'float32' for float columns in the binary and arrow encodings
+        """
+        if encoding not in (COLUMNAR, BINARY, ARROW):
+            raise ValueError(f"Unknown columnar encoding: {encoding}")
+        if float_dtype not in ('float32', 'float64'):
+            raise ValueError(f"Float columns can be 'float32' or 'float64', not {float_dtype}")
+
+        self.key = key
+        self.encoding = encoding
+        self.float_dtype = float_dtype
+        self.columns = to_columns(values)
+        self.length = len(next(iter(self.columns.values()))) if self.columns else 0
+        self.content_type = 'application/json' if encoding == COLUMNAR else 'application/octet-stream'
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __encoded_columns(self) -> typing.Tuple[dict, dict]:
+        """
+        Split the columns into numeric arrays ready to be written and everything else
+
+        :return: (header, numeric columns)
+        """
+        header = {'key': self.key, 'length': self.length}
+        numeric = {}
+        for name, column in self.columns.items():
+            if name == 'time':
+                header['time_base'], numeric['time'], header['time_unit'] = encode_time(column)
+            elif isinstance(column, np.ndarray) and column.dtype.kind in 'iufb':
+                if column.dtype.kind == 'f':
+                    column = column.astype(self.float_dtype, copy=False)
+                elif column.dtype.kind == 'b':
+                    column = column.astype('uint8')
+                numeric[name] = column
+            else:
+                header.setdefault('strings', {})[name] = [None if v is None else str(v) for v in column]
+        return header, numeric
+
+    def __iter_columnar(self) -> typing.Iterator[bytes]:
+        header, numeric = self.__encoded_columns()
+        strings = header.pop('strings', {})
+        yield (json.dumps({self.key: header})[:-2] + ', "columns": {').encode()
+        for i, (name, column) in enumerate({**numeric, **strings}.items()):
+            yield (', ' if i else '').encode() + json.dumps(name).encode() + b': '
+            yield from JSONStream(None, column).iter_array()
+        yield b'}}}'
+
+    def __iter_binary(self) -> typing.Iterator[bytes]:
+        header, numeric = self.__encoded_columns()
+        header['columns'] = []
+        offset = 0
+        buffers = []
+        for name, column in numeric.items():
+            column = np.ascontiguousarray(column, dtype=column.dtype.newbyteorder('<'))
+            header['columns'].append({'name': name, 'dtype': column.dtype.str, 'offset': offset,
+                                      'nbytes': column.nbytes})
+            offset += column.nbytes
+            buffers.append(column)
+
+        encoded = json.dumps(header).encode()
+        yield struct.pack('<I', len(encoded)) + encoded
+        # Hand out views of the numpy buffers rather than converting any elements
+        for column in buffers:
+            view = memoryview(column).cast('B')
+            for start in range(0, len(view), CHUNK_SIZE):
+                yield view[start:start + CHUNK_SIZE]
+
+    def __iter_arrow(self) -> typing.Iterator[bytes]:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("The arrow encoding requires pyarrow. Install it with `pip install pyarrow`")
+
+        header, numeric = self.__encoded_columns()
+        strings = header.pop('strings', {})
+        arrays = {name: pa.array(column) for name, column in numeric.items()}
+        arrays.update({name: pa.array(column, type=pa.string()) for name, column in strings.items()})
+        batch = pa.RecordBatch.from_pydict(arrays)
+        # The remaining header entries describe the time encoding
+        schema = batch.schema.with_metadata({k: json.dumps(v) for k, v in header.items()})
+
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            writer.write_batch(batch.replace_schema_metadata(schema.metadata))
+        buffer = memoryview(sink.getvalue())
+        for start in range(0, len(buffer), CHUNK_SIZE):
+            yield buffer[start:start + CHUNK_SIZE]
+
+    def __iter__(self) -> typing.Iterator[bytes]:
+        if self.encoding == COLUMNAR:
+            return self.__iter_columnar()
+        elif self.encoding == BINARY:
+            return self.__iter_binary()
+        return self.__iter_arrow()
@@ -0,0 +1,114 @@
+import numpy as np
+
+LTTB = 'lttb'
+MINMAX = 'minmax'
+METHODS = (LTTB, MINMAX)
+
+
+def lttb(times: np.ndarray, values: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-triangle-three-buckets. The series is split into threshold - 2 buckets and from each one the point
+     forming the largest triangle with the previously selected point and the average of the next bucket is kept.
+     The first and last points are always kept
+
+    :param times: Float epoch seconds
+    :param values: The value at each time
+    :param threshold: The number of points to keep
+    :return: The sorted indices of the kept points
+    """
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    edges = np.floor(np.arange(threshold - 1) * every).astype('int64') + 1
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+
+    # The averages of every bucket are computed up front, only the choice of point depends on the last one chosen
+    avg_times = np.add.reduceat(times[:n - 1], starts) / counts
+    avg_values = np.add.reduceat(values[:n - 1], starts) / counts
+    avg_times = np.append(avg_times[1:], times[-1])
+    avg_values = np.append(avg_values[1:], values[-1])
+
+    selected = np.empty(threshold, dtype='int64')
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = starts[i], ends[i]
+        area = np.abs((times[a] - avg_times[i]) * (values[start:end] - values[a]) -
+                      (times[a] - times[start:end]) * (avg_values[i] - values[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(times: np.ndarray, values: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Keep the minimum and maximum of each of threshold / 2 buckets along with the first and last points. Every peak
+     and trough the buckets can resolve survives, which makes this the better choice for equity curves
+
+    :param times: Float epoch seconds
+    :param values: The value at each time
+    :param threshold: The number of points to keep
+    :return: The sorted indices of the kept points
+    """
+    n = len(values)
+    if threshold >= n or threshold < 4:
+        return np.arange(n)
+
+    buckets = (threshold - 2) // 2
+    edges = np.linspace(1, n - 1, buckets + 1).astype('int64')
+    edges = np.unique(edges)
+    starts = edges[:-1]
+    counts = np.diff(edges)
+    bucket_ids = np.repeat(np.arange(len(starts)), counts)
+    inner = values[1:n - 1]
+
+    selected = [np.array([0, n - 1])]
+    for reduce in (np.maximum, np.minimum):
+        extremes = reduce.reduceat(inner, starts - 1)
+        matches = np.flatnonzero(inner == np.repeat(extremes, counts))
+        # Take the first match in each bucket
+        _, first = np.unique(bucket_ids[matches], return_index=True)
+        selected.append(matches[first] + 1)
+    return np.unique(np.concatenate(selected))
+
+
+def max_drawdown(values: np.ndarray) -> np.ndarray:
+    """
+    Find the peak and trough of the largest drawdown
+
+    :param values: The equity curve
+    :return: The indices of the peak and the trough
+    """
+    if not len(values):
+        return np.array([], dtype='int64')
+    trough = int(np.argmin(values - np.maximum.accumulate(values)))
+    peak = int(np.argmax(values[:trough + 1]))
+    return np.array([peak, trough])
+
+
+def downsample(columns: dict, method: str = MINMAX, max_points: int = 5000) -> dict:
+    """
+    Reduce account value columns to about max_points points. The peak and trough of the largest drawdown are always
+     kept so the drawdown shown on the platform matches the full curve
+
+    :param columns: A dictionary of columns with at least 'time' and 'value'
+    :param method: 'lttb' or 'minmax'
+    :param max_points: The number of points to keep
+    :return: The same columns with only the kept rows
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}. Use '{LTTB}' or '{MINMAX}'")
+
+    times = np.asarray(columns['time'], dtype='float64')
+    values = np.asarray(columns['value'], dtype='float64')
+    if len(values) <= max_points:
+        return columns
+
+    keep = (lttb if method == LTTB else minmax)(times, values, max_points)
+    keep = np.union1d(keep, max_drawdown(values))
+    return {name: np.asarray(column)[keep] if isinstance(column, np.ndarray) else [column[i] for i in keep]
+            for name, column in columns.items()}
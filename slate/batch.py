@@ -0,0 +1,117 @@
+import threading
+import time
+import typing
+from concurrent.futures import Future
+
+from slate.utils import BackgroundThread
+
+
+class RequestBatcher:
+    def __init__(self, send_batch: typing.Callable[[list], list], window: float = 0.01, max_size: int = 100):
+        """
+        Coalesce individual posts into multi-event requests. Posts submitted within the window of the first queued
+         post (or until max_size posts are queued) are sent together, in submission order, and each caller gets the
+         result for its own event
+
+        :param send_batch: Called on the flush thread with a list of events, must return a list of results of the
+         same length and order
+        :param window: The number of seconds to wait for more events after the first one arrives
+        :param max_size: The maximum number of events in a single request
+        """
+        self.__send_batch = send_batch
+        self.__window = window
+        self.__max_size = max_size
+
+        self.__events = []
+        self.__futures = []
+        # Whether the caller of each queued event is blocked waiting for its result
+        self.__blocking = []
+        self.__first_at = None
+        self.__condition = threading.Condition()
+        # Batches which have been taken off of the queue but not resolved yet
+        self.__in_flight = 0
+
+        self.__thread = BackgroundThread(self.__run, 'slate-request-batcher')
+
+        self.batches = 0
+        self.events = 0
+        self.errors = 0
+
+    def submit(self, event: dict, blocking: bool = False) -> Future:
+        """
+        Add an event to the current batch
+
+        :param event: The event to be sent as part of the multi-event request
+        :param blocking: The caller is going to wait for the result. A batch holding nothing but one such event is
+         sent straight away, since its caller can't add anything more to it while waiting out the window
+        :return: A future resolving to the result for this event
+        """
+        future = Future()
+        with self.__condition:
+            self.__thread.ensure()
+            if not self.__events:
+                self.__first_at = time.monotonic()
+            self.__events.append(event)
+            self.__futures.append(future)
+            self.__blocking.append(blocking)
+            self.__condition.notify_all()
+        return future
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while not self.__events:
+                    self.__condition.wait()
+                # Wait out the rest of the window unless the batch fills up first
+                while len(self.__events) < self.__max_size and self.__blocking != [True]:
+                    remaining = self.__first_at + self.__window - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.__condition.wait(remaining)
+
+                events, self.__events = self.__events[:self.__max_size], self.__events[self.__max_size:]
+                futures, self.__futures = self.__futures[:self.__max_size], self.__futures[self.__max_size:]
+                self.__blocking = self.__blocking[self.__max_size:]
+                # Anything left over starts a new window now
+                self.__first_at = time.monotonic()
+                self.__in_flight += 1
+
+            try:
+                results = self.__send_batch(events)
+                if len(results) != len(events):
+                    raise ValueError(f"Expected {len(events)} results from the batch but received {len(results)}")
+                self.batches += 1
+                self.events += len(events)
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+            except Exception as e:
+                self.errors += 1
+                for future in futures:
+                    future.set_exception(e)
+            finally:
+                with self.__condition:
+                    self.__in_flight -= 1
+                    self.__condition.notify_all()
+
+    @property
+    def depth(self) -> int:
+        """
+        The number of events waiting for the current window to close
+        """
+        return len(self.__events)
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait until every submitted event has been sent
+
+        :param timeout: The maximum number of seconds to wait, None waits forever
+        :return: True if everything was sent, False if the timeout expired first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.__condition:
+            while self.__events or self.__in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.__condition.wait(remaining)
+        return True
@@ -0,0 +1,102 @@
+import threading
+import typing
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP = 'gzip'
+ZSTD = 'zstd'
+
+
+class Compressor:
+    def __init__(self, algorithm: str = GZIP, level: int = None, threshold: int = 1024):
+        """
+        Compress request bodies before they are sent
+
+        :param algorithm: 'gzip', or 'zstd' which requires the zstandard package
+        :param level: The compression level, defaults to 6 for gzip and 3 for zstd
+        :param threshold: Bodies smaller than this many bytes are sent uncompressed. Streamed bodies have no known
+         size and are always compressed
+        """
+        if algorithm == ZSTD and zstandard is None:
+            raise ImportError("zstd compression requires zstandard. Install it with `pip install zstandard`")
+        if algorithm not in (GZIP, ZSTD):
+            raise ValueError(f"Unknown compression algorithm: {algorithm}. Use '{GZIP}' or '{ZSTD}'")
+
+        self.algorithm = algorithm
+        self.level = level if level is not None else (6 if algorithm == GZIP else 3)
+        self.threshold = threshold
+
+        self.__lock = threading.Lock()
+        self.bodies = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+    def record(self, bytes_in: int, bytes_out: int, bodies: int = 0):
+        with self.__lock:
+            self.bodies += bodies
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+
+    def compressobj(self):
+        """
+        Create an incremental compressor with compress(bytes) and flush() methods
+        """
+        if self.algorithm == ZSTD:
+            return zstandard.ZstdCompressor(level=self.level).compressobj()
+        # wbits=31 writes a gzip header and trailer
+        return zlib.compressobj(self.level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> typing.Optional[bytes]:
+        """
+        Compress a complete body
+
+        :param data: The encoded body
+        :return: The compressed body, or None if the body is under the threshold or didn't get any smaller
+        """
+        if len(data) < self.threshold:
+            return None
+        compressor = self.compressobj()
+        compressed = compressor.compress(data) + compressor.flush()
+        if len(compressed) >= len(data):
+            # Already compressed or too small to win back the header, it goes out as it is
+            return None
+        self.record(len(data), len(compressed), bodies=1)
+        return compressed
+
+    def compress_stream(self, stream: typing.Iterable[bytes]) -> 'CompressedStream':
+        """
+        Wrap a re-iterable stream of bytes so that it is compressed as it is sent
+        """
+        return CompressedStream(self, stream)
+
+
+class CompressedStream:
+    def __init__(self, compressor: Compressor, stream: typing.Iterable[bytes]):
+        """
+        Compress a stream chunk by chunk. A new compressor is started each time this is iterated so a retried upload
+         is compressed again from the start
+        """
+        self.__compressor = compressor
+        self.__stream = stream
+
+    def __iter__(self) -> typing.Iterator[bytes]:
+        compressor = self.__compressor.compressobj()
+        bytes_in = bytes_out = 0
+        for chunk in self.__stream:
+            bytes_in += len(chunk)
+            compressed = compressor.compress(chunk)
+            if compressed:
+                bytes_out += len(compressed)
+                yield compressed
+        compressed = compressor.flush()
+        bytes_out += len(compressed)
+        yield compressed
+        self.__compressor.record(bytes_in, bytes_out, bodies=1)
@@ -1,9 +1,11 @@
 from operator import itemgetter
 
+import numpy as np
 import pandas as pd
 
 import slate
-from slate.integrations.common import b_id, DUMMY_METRICS, DUMMY_INDICATORS
+from slate.backtest.columnar import columns_to_records, epoch_seconds
+from slate.integrations.common import b_id, b_ids, DUMMY_METRICS, DUMMY_INDICATORS
 
 try:
     import backtesting
@@ -24,20 +26,8 @@ class BacktestingPy:
         symbol = symbol or 'Unknown'
         quote = symbol.split('-')[1] if '-' in symbol else 'USD'
 
-        trades = result['_trades'] \
-            .apply(map_trades, axis=1, result_type='expand', symbol=symbol) \
-            .unstack() \
-            .reset_index(drop=True) \
-            .apply(pd.Series) \
-            .sort_values('time', ascending=True) \
-            .to_dict('records')
-
-        equity = result['_equity_curve']['Equity']
-        account_values = equity.loc[equity.shift() != equity] \
-            .reset_index() \
-            .rename(columns={'index': 'time', 'Equity': 'value'})
-        account_values['time'] = account_values['time'].map(lambda t: t.timestamp())
-        account_values = account_values.to_dict('records')
+        trades = columns_to_records(trade_columns(result['_trades'], symbol))
+        account_values = columns_to_records(account_value_columns(result['_equity_curve']['Equity']))
 
         id = b_id()
         self.slate.backtest.result(symbols=[symbol],
@@ -58,7 +48,45 @@ class BacktestingPy:
                                    time_elapsed=0)
 
 
+def trade_columns(trades: pd.DataFrame, symbol: str) -> dict:
+    """
+    Split each backtesting.py trade into its entry and exit order, sorted by time. Entries come before exits that
+     happened at the same time
+
+    :param trades: The _trades frame of a backtesting.py result
+    :param symbol: The symbol traded
+    :return: A dictionary of columns in the order map_trades builds its dictionaries
+    """
+    size = trades['Size'].to_numpy()
+    count = len(size)
+    long = size > 0
+    times = np.concatenate([epoch_seconds(trades['EntryTime']), epoch_seconds(trades['ExitTime'])])
+    order = np.argsort(times, kind='stable')
+    return {
+        'symbol': [symbol] * (2 * count),
+        'size': np.abs(np.concatenate([size, size]))[order],
+        'type': ['market'] * (2 * count),
+        'time': times[order],
+        'side': np.concatenate([np.where(long, 'buy', 'sell'), np.where(long, 'sell', 'buy')])[order],
+        'id': b_ids(2 * count),
+        'price': np.concatenate([trades['EntryPrice'].to_numpy(), trades['ExitPrice'].to_numpy()])[order],
+    }
+
+
+def account_value_columns(equity: pd.Series) -> dict:
+    """
+    The points of an equity curve where its value changed
+
+    :param equity: The Equity column of a backtesting.py equity curve, indexed by time
+    """
+    changed = equity.loc[equity.shift() != equity]
+    return {'time': epoch_seconds(changed.index), 'value': changed.to_numpy()}
+
+
 def map_trades(row: pd.Series, symbol: str) -> list:
+    """
+    The row at a time version of trade_columns, kept as the reference its output is checked against
+    """
     common = {'symbol': symbol,
               'size': abs(row['Size']),
               'type': 'market'}
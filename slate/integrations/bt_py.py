@@ -1,7 +1,15 @@
+import typing
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from operator import itemgetter
 
+import numpy as np
+import pandas as pd
+
 import slate
-from slate.integrations.common import b_id, DUMMY_METRICS, DUMMY_INDICATORS
+from slate.api import accepted
+from slate.backtest.columnar import columns_to_records, epoch_seconds
+from slate.exceptions import APIException
+from slate.integrations.common import b_id, b_ids, DUMMY_METRICS, DUMMY_INDICATORS
 
 try:
     import bt
@@ -18,52 +26,130 @@ class BtPy:
         self.slate = slate
         self.api = api
 
-    def post_backtests(self, result: 'Result'):
-        for backtest in result.backtest_list:
-            self._post_backtest(result, backtest)
-
-    def _post_backtest(self, result: 'Result', backtest: 'Backtest'):
-        symbols = [sym.upper() for sym in backtest.data.columns]
+    def post_backtests(self, result: 'Result', exchange: str = None, workers: int = 4,
+                       progress: typing.Callable[[int, int, str], typing.Any] = None) -> dict:
+        """
+        Upload every backtest of a bt run, several at a time
+
+        :param result: The result of bt.run
+        :param exchange: The exchange the backtests traded on
+        :param workers: The number of backtests converted and uploaded at once
+        :param progress: Called with the number of backtests finished, the total and the name of the one which just
+         finished, whether or not it succeeded
+        :return: A dictionary of backtest names to the backtest ids they were uploaded as
+        """
+        backtests = result.backtest_list
+        # Registered once up front, the uploads running in parallel would otherwise each post the shared symbols
+        self.slate.model.add_symbols(list(dict.fromkeys(symbol for backtest in backtests
+                                                        for symbol in backtest_symbols(backtest))))
+        ids = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='slate-bt-upload') as executor:
+            futures = {executor.submit(self._post_backtest, result, backtest, exchange): backtest.name
+                       for backtest in backtests}
+            for done, future in enumerate(as_completed(futures), 1):
+                name = futures[future]
+                if future.exception() is not None:
+                    errors[name] = future.exception()
+                else:
+                    ids[name] = future.result()
+                if progress is not None:
+                    progress(done, len(backtests), name)
+        if errors:
+            name, error = next(iter(errors.items()))
+            raise APIException(f"{len(errors)} of {len(backtests)} backtests failed to upload: "
+                               f"{', '.join(errors)}. The first error, from {name}: {error!r}")
+        return {backtest.name: ids[backtest.name] for backtest in backtests}
+
+    def _post_backtest(self, result: 'Result', backtest: 'Backtest', exchange: str = None) -> str:
+        symbols = backtest_symbols(backtest)
         quote = 'USD'
         for symbol in symbols:
-            self.slate.model.add_symbol(symbol)
             if '-' in symbol:
                 quote = symbol.split('_')[1]
 
-        account_values = result \
-            .prices[backtest.name] \
-            .reset_index() \
-            .rename(columns={'index': 'time', backtest.name: 'value'})
-        account_values['time'] = account_values['time'].map(lambda t: t.timestamp())
-        account_values = account_values.sort_values('time', ascending=True)
-        account_values = account_values.to_dict('records')
-
-        trades = result \
-            .get_transactions(backtest.name) \
-            .apply(map_trade, axis=1, result_type='expand') \
-            .to_dict('records')
+        account_values = columns_to_records(account_value_columns(result.prices[backtest.name]))
+        trades = columns_to_records(trade_columns(result.get_transactions(backtest.name)))
 
         id = b_id()
         start = result.stats[backtest.name]['start'].timestamp()
         end = result.stats[backtest.name]['end'].timestamp()
-        self.slate.backtest.result(symbols=symbols,
-                                   quote_asset=quote,
-                                   start_time=start,
-                                   stop_time=end,
-                                   account_values=account_values,
-                                   trades=trades,
-                                   backtest_id=id,
-                                   metrics=DUMMY_INDICATORS,
-                                   indicators=DUMMY_METRICS)
-
-        self.slate.backtest.status(backtest_id=id,
-                                   successful=True,
-                                   status_summary='Completed',
-                                   status_details='',
-                                   time_elapsed=0)
+        response = self.slate.backtest.result(symbols=symbols,
+                                              quote_asset=quote,
+                                              exchange=exchange,
+                                              start_time=start,
+                                              stop_time=end,
+                                              account_values=account_values,
+                                              trades=trades,
+                                              backtest_id=id,
+                                              metrics=DUMMY_INDICATORS,
+                                              indicators=DUMMY_METRICS)
+        check_accepted(response, f'The result of {backtest.name}')
+
+        response = self.slate.backtest.status(backtest_id=id,
+                                              successful=True,
+                                              status_summary='Completed',
+                                              status_details='',
+                                              time_elapsed=0)
+        check_accepted(response, f'The status of {backtest.name}')
+        return id
+
+
+def check_accepted(response, what: str):
+    """
+    Raise unless the platform acknowledged a post, or it was queued or spooled for delivery
+    """
+    if accepted(response):
+        return
+    if isinstance(response, dict):
+        reason = response.get('error')
+    elif hasattr(response, 'status_code'):
+        reason = f'{response.status_code} {response.text[:200]}'
+    else:
+        reason = repr(response)
+    raise APIException(f"{what} was not acknowledged: {reason}")
+
+
+def backtest_symbols(backtest: 'Backtest') -> list:
+    """
+    The symbols a bt backtest traded, upper cased
+    """
+    return [sym.upper() for sym in backtest.data.columns]
+
+
+def account_value_columns(prices: pd.Series) -> dict:
+    """
+    The price series of a bt backtest as account values sorted by time
+
+    :param prices: A column of Result.prices, indexed by date
+    """
+    prices = prices.sort_index(kind='stable')
+    return {'time': epoch_seconds(prices.index), 'value': prices.to_numpy()}
+
+
+def trade_columns(transactions: pd.DataFrame) -> dict:
+    """
+    Convert bt transactions into trades column by column
+
+    :param transactions: The frame from Result.get_transactions, indexed by date and security
+    :return: A dictionary of columns in the order map_trade builds its dictionaries
+    """
+    quantity = transactions['quantity'].to_numpy()
+    return {
+        'time': epoch_seconds(transactions.index.get_level_values(0)),
+        'side': np.where(quantity > 0, 'buy', 'sell'),
+        'symbol': transactions.index.get_level_values(1).str.upper().tolist(),
+        'price': transactions['price'].to_numpy(),
+        'size': np.abs(quantity),
+        'id': b_ids(len(transactions)),
+        'type': ['market'] * len(transactions),
+    }
 
 
 def map_trade(row):
+    """
+    The row at a time version of trade_columns, kept as the reference its output is checked against
+    """
     time, symbol = row.name
     return {'time': time.timestamp(),
             'side': 'buy' if row['quantity'] > 0 else 'sell',
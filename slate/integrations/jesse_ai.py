@@ -18,7 +18,7 @@ class JesseAi:
         self.slate = slate
         self.api = api
 
-    def post_backtest(self, json_result: str):
+    def post_backtest(self, json_result: str, exchange: str = None):
         with open(json_result, 'r') as file:
             trades = json.load(file)['trades']
 
@@ -43,6 +43,7 @@ class JesseAi:
 
         self.slate.backtest.result(symbols=symbols,
                                    quote_asset=quote_asset,
+                                   exchange=exchange,
                                    start_time=start,
                                    stop_time=end,
                                    account_values=account_values,
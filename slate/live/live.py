@@ -1,8 +1,13 @@
 import datetime
+import inspect
 import json
+import logging
 import warnings
 
 from slate.api import API
+from slate.live.log_handler import LogBuffer, OutputTee, SlateLogHandler
+from slate.live.metrics import MetricPublisher
+from slate.live.pnl import PnlStream
 from slate.utils import assemble_base
 
 
@@ -16,6 +21,13 @@ class Live:
 
         self.__live_base = '/v1/live'
 
+        # Created on the first append_pnl unless configured beforehand
+        self.__pnl_stream = None
+        # Created on the first publish_metric unless configured beforehand
+        self.__metric_publisher = None
+        # Shared by log_handler and capture_output, created on first use unless configured beforehand
+        self.__log_buffer = None
+
     def __assemble_base(self, route: str) -> str:
         """
         Assemble the sub-route specific to live posts
@@ -25,6 +37,15 @@ class Live:
         """
         return assemble_base(self.__live_base, route)
 
+    def __require_sync(self, feature: str, alternative: str):
+        """
+        The buffered helpers send from a background thread or check each response, neither of which works with the
+         coroutines returned by the async API
+        """
+        if inspect.iscoroutinefunction(self.__api.post):
+            raise TypeError(f"{feature} needs the synchronous Slate client, await {alternative} with "
+                                      f"AsyncSlate instead")
+
     def event(self, args: dict, response: dict, type_: str, annotation: str = None,
               time: datetime.datetime = None) -> dict:
         """
@@ -57,6 +78,59 @@ class Live:
             'values': json.dumps(pnl_values)
         })
 
+    def configure_pnl_stream(self, capacity: int = 100000, coalesce_interval: float = 0, flush_interval: float = 0,
+                             resync_interval: float = 3600) -> PnlStream:
+        """
+        Configure how append_pnl buffers and sends points. This replaces any existing stream after sending the points
+         it held back
+
+        :param capacity: The number of points kept locally for resyncs. Resyncs stop once more points than this have
+         been appended, since overwriting the series with the buffer would delete the evicted ones
+        :param coalesce_interval: A point arriving within this many seconds of the last unsent point replaces it
+        :param flush_interval: The minimum number of seconds between sends, 0 sends on every point
+        :param resync_interval: The number of seconds between full overwrites of the series, None to never resync
+        :return: The PnlStream
+        """
+        self.__require_sync('The PNL stream', 'set_pnl')
+        if self.__pnl_stream is not None:
+            self.__pnl_stream.close()
+        self.__pnl_stream = PnlStream(
+            lambda values: self.__api.post(self.__assemble_base('/append-pnl'), {'values': values}),
+            lambda values: self.__api.post(self.__assemble_base('/set-pnl'), {'values': values}),
+            capacity=capacity,
+            coalesce_interval=coalesce_interval,
+            flush_interval=flush_interval,
+            resync_interval=resync_interval
+        )
+        return self.__pnl_stream
+
+    def append_pnl(self, time: [int, float, datetime.datetime], value: [int, float]):
+        """
+        Add a point to the end of the PNL series. Only the points added since the last acknowledged send are posted,
+         unlike set_pnl which re-sends the whole series
+
+        :param time: The time of the point as a datetime or epoch seconds
+        :param value: The PNL value at that time
+        :return: None
+        """
+        if self.__pnl_stream is None:
+            self.configure_pnl_stream()
+        self.__pnl_stream.append(time, value)
+
+    def flush_pnl(self, resync: bool = False):
+        """
+        Send any PNL points held back by the flush interval
+
+        :param resync: Overwrite the whole series with the locally buffered points instead
+        :return: None
+        """
+        if self.__pnl_stream is None:
+            return
+        if resync:
+            self.__pnl_stream.resync()
+        else:
+            self.__pnl_stream.flush()
+
     def set_custom_metric(self, name: str, value: float, display_name: str, type_: str = 'number'):
         """
         Set custom metrics on the platform. These will appear under "custom" in the dropdown
@@ -78,6 +152,47 @@ class Live:
             'metrics': json.dumps(body)
         })
 
+    def configure_metric_publisher(self, flush_interval: float = 1) -> MetricPublisher:
+        """
+        Configure how publish_metric batches metrics. Any changes held by an existing publisher are sent first
+
+        :param flush_interval: The number of seconds between sends, 0 sends on every change
+        :return: The MetricPublisher
+        """
+        self.__require_sync('Publishing metrics', 'set_custom_metric')
+        if self.__metric_publisher is not None:
+            self.__metric_publisher.close()
+        self.__metric_publisher = MetricPublisher(
+            lambda metrics: self.__api.post(self.__assemble_base('/set-custom-metric'), {'metrics': metrics}),
+            flush_interval=flush_interval
+        )
+        return self.__metric_publisher
+
+    def publish_metric(self, name: str, value: float, display_name: str, type_: str = 'number'):
+        """
+        Set a custom metric without posting it immediately. The latest value of every metric is kept and the ones
+         which changed are sent together in one set-custom-metric request each flush interval
+
+        :param name: The string identifying the metric. This must be unique with all other metrics (will not be
+         displayed)
+        :param value: The value to be displayed
+        :param display_name: The display name. This will appear on the platform above the metric
+        :param type_: Set display type, this can be "number" or "percentage"
+        :return: None
+        """
+        if self.__metric_publisher is None:
+            self.configure_metric_publisher()
+        self.__metric_publisher.set(name, value, display_name, type_)
+
+    def flush_metrics(self):
+        """
+        Send any metrics set with publish_metric which changed since the last flush
+
+        :return: None
+        """
+        if self.__metric_publisher is not None:
+            self.__metric_publisher.flush()
+
     def set_auto_pnl(self, setting: bool) -> dict:
         """
         Enable or disable blankly's auto PNL on your trades
@@ -110,7 +225,7 @@ class Live:
         :param funds: Mutually exclusive with size - if you place an order priced in the quote asset
         :param annotation: An optional annotation to be given to this order
         :param time: A time object to fill if the event occurred in the past
-        :return: API response (dict)
+        :return: API response (dict), None if it was queued in background mode or Dropped if it was discarded
         """
         return self.__api.post(self.__assemble_base('/spot-market'), {
             'symbol': symbol,
@@ -154,7 +269,7 @@ class Live:
         :param status: If the order is still open, fill status with its status - mutually exclusive with executed and
          status
         :param time: A time object to fill if the event occurred in the past
-        :return: API response (dict)
+        :return: API response (dict), None if it was queued in background mode or Dropped if it was discarded
         """
         if executed_time is not None:
             executed_time = int(executed_time.timestamp())
@@ -201,7 +316,7 @@ class Live:
         :param funds: Mutually exclusive with size - if you place an order priced in the quote asset
         :param annotation: An optional annotation to be given to this order
         :param time: A time object to fill if the event occurred in the past
-        :return: API response (dict)
+        :return: API response (dict), None if it was queued in background mode or Dropped if it was discarded
         """
         return self.__api.post(self.__assemble_base('/spot-limit'), {
             'symbol': symbol,
@@ -222,7 +337,7 @@ class Live:
 
         :param id_: The exchange-given order id
         :param kwargs: Any key/value pair. Generally these should be the same as the above order keys
-        :return: API Response (dict)
+        :return: API response (dict), None if it was queued in background mode or Dropped if it was discarded
         """
         kwargs['id'] = id_
         return self.__api.post(self.__assemble_base('/update-trade'), kwargs)
@@ -234,7 +349,7 @@ class Live:
 
         :param id_: The exchange-given order id
         :param annotation: A descriptor about the order
-        :return: API Response (dict)
+        :return: API response (dict), None if it was queued in background mode or Dropped if it was discarded
         """
         return self.__api.post(self.__assemble_base('/update-annotation'), {
             'id': id_,
@@ -259,7 +374,7 @@ class Live:
                 }
             }
         :param time_: A time object to fill if the event occurred in the past
-        :return: API response (dict)
+        :return: API response (dict), None if it was queued in background mode or Dropped if it was discarded
         """
 
         # Test for double nesting in the results dictionary
@@ -283,9 +398,79 @@ class Live:
         :param line: The line to write
         :param type_: The type of line, common types include 'stdout' or 'stderr'
         :param time_: A time object to fill if the event occurred in the past
-        :return: API response (dict)
+        :return: API response (dict), None if it was queued in background mode or Dropped if it was discarded
         """
         return self.__api.post('/log', {
             'line': line,
             'type': type_
         }, time_)
+
+    def log_batch(self, lines: list) -> dict:
+        """
+        Post many log lines in a single request
+
+        :param lines: A list of lines like [{'line': 'started', 'type': 'stdout', 'time': 1650000000.0}] where time
+         is in epoch seconds
+        :return: API response (dict), None if it was queued in background mode or Dropped if it was discarded
+        """
+        return self.__api.post(self.__assemble_base('/log-batch'), {
+            'lines': lines if isinstance(lines, str) else json.dumps(lines)
+        })
+
+    def configure_log_buffer(self, max_lines: int = 500, max_bytes: int = 256 * 1024, flush_interval: float = 1,
+                             max_buffer_bytes: int = 4 * 1024 * 1024) -> LogBuffer:
+        """
+        Configure how lines from log_handler and capture_output are batched. Any lines waiting in an existing buffer
+         are sent first
+
+        :param max_lines: The number of waiting lines which triggers a send
+        :param max_bytes: The size of the waiting lines in bytes which triggers a send
+        :param flush_interval: The longest a line waits before it is sent
+        :param max_buffer_bytes: Lines arriving while this many bytes are waiting are dropped and counted
+        :return: The LogBuffer
+        """
+        self.__require_sync('Buffered logging', 'log_batch')
+        if self.__log_buffer is not None:
+            self.__log_buffer.close()
+        self.__log_buffer = LogBuffer(self.log_batch, max_lines=max_lines, max_bytes=max_bytes,
+                                      flush_interval=flush_interval, max_buffer_bytes=max_buffer_bytes)
+        return self.__log_buffer
+
+    def __get_log_buffer(self) -> LogBuffer:
+        if self.__log_buffer is None:
+            self.configure_log_buffer()
+        return self.__log_buffer
+
+    def log_handler(self, level: int = logging.INFO) -> SlateLogHandler:
+        """
+        Create a logging handler which sends records to the platform in batches, for example
+         logging.getLogger().addHandler(slate.live.log_handler())
+
+        :param level: The lowest level which is sent
+        :return: SlateLogHandler
+        """
+        return SlateLogHandler(self.__get_log_buffer(), level)
+
+    def capture_output(self, stdout: bool = True, stderr: bool = True) -> OutputTee:
+        """
+        Send everything printed to stdout and stderr to the platform in batches while still printing it. Call
+         uninstall on the result, or use it as a context manager, to stop
+
+        :param stdout: Capture stdout
+        :param stderr: Capture stderr
+        :return: The installed OutputTee
+        """
+        return OutputTee(self.__get_log_buffer(), stdout=stdout, stderr=stderr).install()
+
+    def close(self):
+        """
+        Send whatever the PNL stream, metric publisher and log buffer are holding back and stop their threads. They
+         are created again if used afterwards
+
+        :return: None
+        """
+        helpers = (self.__pnl_stream, self.__metric_publisher, self.__log_buffer)
+        self.__pnl_stream = self.__metric_publisher = self.__log_buffer = None
+        for helper in helpers:
+            if helper is not None:
+                helper.close()
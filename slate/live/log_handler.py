@@ -0,0 +1,237 @@
+import collections
+import json
+import logging
+import sys
+import threading
+import time
+import typing
+
+from slate.api import Dropped, accepted
+from slate.utils import BackgroundThread, close_at_exit, forget_at_exit
+
+
+class LogBuffer:
+    def __init__(self, send: typing.Callable[[str], typing.Any], max_lines: int = 500,
+                 max_bytes: int = 256 * 1024, flush_interval: float = 1, max_buffer_bytes: int = 4 * 1024 * 1024):
+        """
+        Buffer log lines in memory and send them in batches from a dedicated thread. A batch is sent once max_lines
+         or max_bytes are waiting, or every flush_interval seconds, whichever comes first. Adding a line never waits
+         on the network
+
+        :param send: Posts a JSON list of lines like [{'line': ..., 'type': ..., 'time': ...}], returns the API
+         response
+        :param max_lines: The number of lines which triggers a send
+        :param max_bytes: The size of the waiting lines in bytes which triggers a send
+        :param flush_interval: The longest a line waits before it is sent
+        :param max_buffer_bytes: Lines arriving while this many bytes are waiting are dropped
+        """
+        self.__send = send
+        self.__max_lines = max_lines
+        self.__max_bytes = max_bytes
+        self.__flush_interval = flush_interval
+        self.__max_buffer_bytes = max_buffer_bytes
+
+        self.__lock = threading.Lock()
+        self.__send_lock = threading.Lock()
+        self.__lines = collections.deque()
+        self.__bytes = 0
+        self.__wake = threading.Event()
+        self.__closed = False
+        self.__thread = BackgroundThread(self.__run, 'slate-log-buffer')
+
+        self.lines = 0
+        self.batches = 0
+        self.dropped = 0
+        self.throttled = 0
+        self.errors = 0
+        self.last_error = None
+
+        # Waiting lines are sent when the interpreter exits
+        close_at_exit(self)
+
+    @property
+    def sending_thread(self) -> bool:
+        """
+        True on the thread which sends batches. Anything logged while sending must not be captured again
+        """
+        return self.__thread.current
+
+    def __run(self):
+        while not self.__closed:
+            self.__wake.wait(self.__flush_interval)
+            self.__wake.clear()
+            self.flush()
+
+    def add(self, line: str, type_: str, time_: float = None) -> bool:
+        """
+        Queue a line to be sent
+
+        :param line: The line to write
+        :param type_: The type of line, common types include 'stdout' or 'stderr'
+        :param time_: The epoch time of the line, defaults to now
+        :return: False if the buffer is full and the line was dropped
+        """
+        size = len(line)
+        with self.__lock:
+            if self.__bytes + size > self.__max_buffer_bytes:
+                self.dropped += 1
+                return False
+            self.__lines.append({'line': line, 'type': type_, 'time': time.time() if time_ is None else time_})
+            self.__bytes += size
+            full = len(self.__lines) >= self.__max_lines or self.__bytes >= self.__max_bytes
+
+        self.__thread.ensure()
+        if full:
+            self.__wake.set()
+        return True
+
+    def flush(self):
+        """
+        Send every waiting line, one batch at a time
+        """
+        with self.__send_lock:
+            while True:
+                with self.__lock:
+                    if not self.__lines:
+                        return
+                    batch, size = [], 0
+                    while self.__lines and len(batch) < self.__max_lines and size < self.__max_bytes:
+                        line = self.__lines.popleft()
+                        batch.append(line)
+                        size += len(line['line'])
+                    self.__bytes -= size
+
+                response = None
+                try:
+                    response = self.__send(json.dumps(batch))
+                    failed = not accepted(response)
+                except Exception as e:
+                    failed = True
+                    self.last_error = e
+
+                if failed:
+                    # A batch the rate limiter dropped is kept like a failed one so that it's sent once there's room
+                    if isinstance(response, Dropped):
+                        self.throttled += 1
+                    else:
+                        self.errors += 1
+                    # Logs are the first thing to give up under pressure, a failed batch is only kept if it fits
+                    with self.__lock:
+                        if self.__bytes + size <= self.__max_buffer_bytes:
+                            self.__lines.extendleft(reversed(batch))
+                            self.__bytes += size
+                        else:
+                            self.dropped += len(batch)
+                    return
+                self.batches += 1
+                self.lines += len(batch)
+
+    def close(self):
+        """
+        Stop the flush thread after sending any waiting lines
+        """
+        forget_at_exit(self)
+        self.__closed = True
+        self.__wake.set()
+        self.flush()
+
+
+class SlateLogHandler(logging.Handler):
+    def __init__(self, buffer: LogBuffer, level: int = logging.INFO):
+        """
+        A logging handler which sends formatted records to the platform in batches. Attach it to the root logger to
+         route the whole logging tree to slate
+
+        :param buffer: The buffer shared with any output tee
+        :param level: The lowest level which is sent
+        """
+        super().__init__(level)
+        self.buffer = buffer
+
+    def emit(self, record: logging.LogRecord):
+        if self.buffer.sending_thread:
+            return
+        try:
+            self.buffer.add(self.format(record), record.levelname.lower(), record.created)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.buffer.flush()
+
+
+class OutputTee:
+    def __init__(self, buffer: LogBuffer, stdout: bool = True, stderr: bool = True):
+        """
+        Copy everything written to stdout and stderr into a log buffer while still writing it to the terminal
+
+        :param buffer: The buffer shared with any logging handler
+        :param stdout: Capture stdout
+        :param stderr: Capture stderr
+        """
+        self.buffer = buffer
+        self.__streams = {}
+        if stdout:
+            self.__streams['stdout'] = None
+        if stderr:
+            self.__streams['stderr'] = None
+
+    def install(self) -> 'OutputTee':
+        """
+        Replace sys.stdout and sys.stderr
+
+        :return: This tee
+        """
+        for name in self.__streams:
+            if self.__streams[name] is None:
+                self.__streams[name] = getattr(sys, name)
+                setattr(sys, name, _TeeStream(self.__streams[name], self.buffer, name))
+        return self
+
+    def uninstall(self):
+        """
+        Restore the original streams, sending any partial lines
+        """
+        for name, original in self.__streams.items():
+            if original is not None:
+                stream = getattr(sys, name)
+                if isinstance(stream, _TeeStream):
+                    stream.finish()
+                setattr(sys, name, original)
+                self.__streams[name] = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.uninstall()
+
+
+class _TeeStream:
+    def __init__(self, original, buffer: LogBuffer, type_: str):
+        self.__original = original
+        self.__buffer = buffer
+        self.__type = type_
+        self.__partial = ''
+
+    def write(self, text: str) -> int:
+        written = self.__original.write(text)
+        if not self.__buffer.sending_thread:
+            *lines, self.__partial = (self.__partial + text).split('\n')
+            for line in lines:
+                self.__buffer.add(line, self.__type)
+        return written
+
+    def flush(self):
+        self.__original.flush()
+
+    def finish(self):
+        """
+        Send a trailing line which never got its newline
+        """
+        if self.__partial:
+            self.__buffer.add(self.__partial, self.__type)
+            self.__partial = ''
+
+    def __getattr__(self, item):
+        return getattr(self.__original, item)
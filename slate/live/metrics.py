@@ -0,0 +1,107 @@
+import json
+import threading
+import typing
+
+from slate.api import accepted
+from slate.utils import BackgroundThread, close_at_exit, forget_at_exit
+
+
+class MetricPublisher:
+    def __init__(self, send: typing.Callable[[str], typing.Any], flush_interval: float = 1):
+        """
+        Hold the latest value of every custom metric and send the ones which changed as a single set-custom-metric
+         body once per flush interval. Setting a metric only updates a dictionary, so it is cheap enough to call from
+         inside a strategy loop
+
+        :param send: Posts the JSON encoded metrics body, returns the API response
+        :param flush_interval: The number of seconds between sends, 0 sends on every change
+        """
+        self.__send = send
+        self.__flush_interval = flush_interval
+
+        self.__lock = threading.Lock()
+        self.__metrics = {}
+        self.__sent = {}
+        self.__dirty = set()
+
+        self.__wake = threading.Event()
+        self.__closed = False
+        self.__thread = BackgroundThread(self.__run, 'slate-metric-publisher')
+
+        self.sets = 0
+        self.flushes = 0
+        self.errors = 0
+        self.last_error = None
+
+        # Remaining changes are sent when the interpreter exits
+        close_at_exit(self)
+
+    def __run(self):
+        while not self.__closed:
+            self.__wake.wait(self.__flush_interval)
+            self.__wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+
+    def set(self, name: str, value: float, display_name: str, type_: str = 'number'):
+        """
+        Record the latest value of a metric. It is sent with the next flush if it differs from what was last sent
+
+        :param name: The string identifying the metric
+        :param value: The value to be displayed
+        :param display_name: The display name shown on the platform above the metric
+        :param type_: Set display type, this can be "number" or "percentage"
+        """
+        metric = {'value': value, 'display_name': display_name, 'type': type_}
+        with self.__lock:
+            self.sets += 1
+            self.__metrics[name] = metric
+            if self.__sent.get(name) != metric:
+                self.__dirty.add(name)
+            else:
+                self.__dirty.discard(name)
+
+        if self.__flush_interval <= 0:
+            self.flush()
+        else:
+            self.__thread.ensure()
+
+    def flush(self):
+        """
+        Send every metric which changed since the last flush in one body
+        """
+        with self.__lock:
+            if not self.__dirty:
+                return
+            body = {name: self.__metrics[name] for name in self.__dirty}
+            self.__dirty = set()
+
+        sent = False
+        try:
+            # Metrics throttled by the rate limiter are kept dirty and go out with the next flush
+            sent = accepted(self.__send(json.dumps(body)))
+        finally:
+            with self.__lock:
+                for name, metric in body.items():
+                    # Anything which failed to send, or changed while sending, goes out with the next flush
+                    if sent and self.__metrics[name] is metric:
+                        self.__sent[name] = metric
+                    elif self.__sent.get(name) != self.__metrics[name]:
+                        self.__dirty.add(name)
+        self.flushes += 1
+
+    def close(self):
+        """
+        Stop the flush thread after sending any remaining changes
+        """
+        forget_at_exit(self)
+        self.__closed = True
+        self.__wake.set()
+        try:
+            self.flush()
+        except Exception as e:
+            self.errors += 1
+            self.last_error = e
@@ -0,0 +1,139 @@
+import collections
+import datetime
+import itertools
+import json
+import threading
+import time as time_module
+import typing
+
+from slate.api import accepted
+from slate.utils import BackgroundThread, close_at_exit, forget_at_exit
+
+
+class PnlStream:
+    def __init__(self, send_append: typing.Callable[[str], typing.Any],
+                 send_full: typing.Callable[[str], typing.Any],
+                 capacity: int = 100000,
+                 coalesce_interval: float = 0,
+                 flush_interval: float = 0,
+                 resync_interval: float = 3600):
+        """
+        Keep the PNL series in a local ring buffer and ship only the points added since the last acknowledged one.
+         The whole buffer is periodically re-sent with set-pnl so the platform can't drift from the local series.
+         Overwriting the series with a buffer which has evicted points would delete them from the platform, so resyncs
+         stop once more than capacity points have been appended
+
+        :param send_append: Posts a JSON list of new points, returns the API response
+        :param send_full: Posts a JSON list of every buffered point, overwriting the series, returns the API response
+        :param capacity: The number of points kept locally for resyncs
+        :param coalesce_interval: A point arriving within this many seconds of the last unsent point replaces it
+        :param flush_interval: The minimum number of seconds between appends, 0 sends on every point. Points held
+         back are sent from a background thread once the interval passes, and when the interpreter exits
+        :param resync_interval: The number of seconds between full resyncs, None to never resync
+        """
+        self.__send_append = send_append
+        self.__send_full = send_full
+        self.__coalesce_interval = coalesce_interval
+        self.__flush_interval = flush_interval
+        self.__resync_interval = resync_interval
+
+        self.__lock = threading.RLock()
+        # Each point is [sequence, time, value] so acknowledged points can be found after old ones are evicted
+        self.__points = collections.deque(maxlen=capacity)
+        self.__sequence = 0
+        self.__acknowledged = 0
+        self.__last_flush = 0
+        self.__last_resync = time_module.monotonic()
+        # Set once the ring buffer drops its oldest point, after which it no longer holds the whole series
+        self.__evicted = False
+
+        self.__wake = threading.Event()
+        self.__closed = False
+        self.__thread = BackgroundThread(self.__run, 'slate-pnl-stream')
+
+        self.appended = 0
+        self.resyncs = 0
+        self.errors = 0
+        self.last_error = None
+
+        # Points held back by the flush interval are sent when the interpreter exits
+        close_at_exit(self)
+
+    def __run(self):
+        while not self.__closed:
+            self.__wake.wait(self.__flush_interval)
+            self.__wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+
+    def append(self, time: typing.Union[int, float, datetime.datetime], value: float):
+        """
+        Add a point to the end of the series, sending it if the flush interval has passed
+
+        :param time: The time of the point as a datetime or epoch seconds
+        :param value: The PNL value at that time
+        """
+        if isinstance(time, datetime.datetime):
+            time = time.timestamp()
+
+        with self.__lock:
+            last = self.__points[-1] if self.__points else None
+            if last is not None and last[0] > self.__acknowledged and \
+                    0 <= time - last[1] < self.__coalesce_interval:
+                last[1], last[2] = time, value
+            else:
+                if len(self.__points) == self.__points.maxlen:
+                    self.__evicted = True
+                self.__sequence += 1
+                self.__points.append([self.__sequence, time, value])
+
+            now = time_module.monotonic()
+            if self.__resync_interval is not None and now - self.__last_resync >= self.__resync_interval:
+                self.resync()
+            elif now - self.__last_flush >= self.__flush_interval:
+                self.flush()
+            else:
+                self.__thread.ensure()
+
+    def flush(self):
+        """
+        Send every point which hasn't been acknowledged
+        """
+        with self.__lock:
+            self.__last_flush = time_module.monotonic()
+            # Walk back from the newest point so this only touches the points being sent
+            new = list(itertools.takewhile(lambda point: point[0] > self.__acknowledged, reversed(self.__points)))
+            new = [{'time': t, 'value': v} for _, t, v in reversed(new)]
+            if not new:
+                return
+            if accepted(self.__send_append(json.dumps(new))):
+                self.__acknowledged = self.__points[-1][0]
+                self.appended += len(new)
+
+    def resync(self):
+        """
+        Overwrite the series on the platform with every buffered point. Once points have been evicted this only sends
+         the unacknowledged ones, since the buffer is missing the start of the series
+        """
+        with self.__lock:
+            if self.__evicted:
+                self.__last_resync = time_module.monotonic()
+                self.flush()
+                return
+            self.__last_resync = self.__last_flush = time_module.monotonic()
+            values = [{'time': t, 'value': v} for _, t, v in self.__points]
+            if accepted(self.__send_full(json.dumps(values))):
+                self.__acknowledged = self.__points[-1][0] if self.__points else self.__acknowledged
+                self.resyncs += 1
+
+    def close(self):
+        """
+        Stop the flush thread after sending any points held back by the flush interval
+        """
+        forget_at_exit(self)
+        self.__closed = True
+        self.__wake.set()
+        self.flush()
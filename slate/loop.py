@@ -0,0 +1,105 @@
+import asyncio
+import concurrent.futures
+import functools
+import threading
+import typing
+
+
+class BackgroundLoop:
+    def __init__(self, workers: int = None):
+        """
+        An asyncio event loop running on a daemon thread with a thread pool for blocking work. Jobs can be submitted
+         from any thread and each one returns a concurrent.futures.Future
+
+        :param workers: The number of threads running blocking callables, defaults to the ThreadPoolExecutor default
+        """
+        self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                                                                thread_name_prefix='slate-submit')
+        self.__loop = asyncio.new_event_loop()
+        self.__loop.set_default_executor(self.__executor)
+        self.__thread = threading.Thread(target=self.__loop.run_forever, name='slate-event-loop', daemon=True)
+        self.__thread.start()
+
+        self.__lock = threading.Lock()
+        self.__pending = set()
+        self.__closed = False
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self.__loop
+
+    def submit(self, callable_: typing.Union[typing.Callable, typing.Coroutine], *args,
+               **kwargs) -> concurrent.futures.Future:
+        """
+        Run a job in the background. Coroutine functions and coroutines run on the event loop, anything else runs in
+         the thread pool so it never blocks the loop
+
+        :param callable_: A function, coroutine function or coroutine
+        :param args: Positional arguments for the function
+        :param kwargs: Keyword arguments for the function
+        :return: A future holding the result
+        """
+        with self.__lock:
+            if self.__closed:
+                raise RuntimeError("Cannot submit to a slate event loop which has been shut down")
+            future = asyncio.run_coroutine_threadsafe(self.__execute(callable_, args, kwargs), self.__loop)
+            self.__pending.add(future)
+        future.add_done_callback(self.__discard)
+        return future
+
+    def __discard(self, future: concurrent.futures.Future):
+        with self.__lock:
+            self.__pending.discard(future)
+
+    async def __execute(self, callable_, args: tuple, kwargs: dict):
+        """
+        Execute the job on the event loop
+        """
+        if asyncio.iscoroutine(callable_):
+            return await callable_
+        if asyncio.iscoroutinefunction(callable_):
+            return await callable_(*args, **kwargs)
+        result = await self.__loop.run_in_executor(None, functools.partial(callable_, *args, **kwargs))
+        # A plain function may still hand back a coroutine
+        if asyncio.iscoroutine(result):
+            return await result
+        return result
+
+    @staticmethod
+    async def __cancel_tasks():
+        """
+        Cancel every other task on the loop and let them unwind before it stops
+        """
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def shutdown(self, timeout: float = None) -> bool:
+        """
+        Stop accepting jobs, wait for the pending ones and stop the loop. Jobs still running after the timeout are
+         cancelled
+
+        :param timeout: The maximum number of seconds to wait, None waits forever
+        :return: True if every job finished
+        """
+        with self.__lock:
+            if self.__closed:
+                return True
+            self.__closed = True
+            pending = list(self.__pending)
+
+        _, not_done = concurrent.futures.wait(pending, timeout=timeout)
+        if not_done:
+            try:
+                asyncio.run_coroutine_threadsafe(self.__cancel_tasks(), self.__loop).result(timeout=1)
+            except concurrent.futures.TimeoutError:
+                pass
+
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        self.__thread.join(timeout)
+        # Blocking callables can't be interrupted, don't wait on any which outlived the timeout
+        self.__executor.shutdown(wait=not not_done)
+        if not self.__thread.is_alive():
+            self.__loop.close()
+        return not not_done
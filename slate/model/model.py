@@ -1,5 +1,11 @@
-from slate.api import API
-from slate.utils import assemble_base
+import hashlib
+import inspect
+import json
+import os
+import threading
+
+from slate.api import API, acknowledged
+from slate.utils import assemble_base, get_data_dir
 
 
 class Model:
@@ -12,6 +18,13 @@ class Model:
 
         self.__live_base = '/v1/model'
 
+        # The symbols and exchanges already registered for this model on this service, loaded from disk on first use
+        #  so that repeated backtests don't post them again
+        self.__registered = None
+        self.__registered_lock = threading.Lock()
+        # Held across checking, posting and registering so that threads adding the same values post them only once
+        self.__posting_locks = {'symbols': threading.Lock(), 'exchanges': threading.Lock()}
+
     def __assemble_base(self, route: str) -> str:
         """
         Assemble the sub-route specific to live posts
@@ -35,7 +48,7 @@ class Model:
         :param start_at: The start time in epoch
         :param end_at: The end time in epoch
         :param running: A boolean specifying if the model is running or not
-        :return: API response (dict)
+        :return: API response (dict), None if it was queued in background mode or Dropped if it was discarded
         """
         return self.__api.post(self.__assemble_base('/lifecycle'), {
             'message': message,
@@ -44,26 +57,138 @@ class Model:
             'running': running
         })
 
+    @property
+    def __registered_path(self) -> str:
+        # Keyed by the service too, so that symbols registered against a stand-in server are still posted to the
+        #  hosted service
+        service = hashlib.sha1(self.__api.api_url.encode()).hexdigest()[:12]
+        return os.path.join(get_data_dir(), 'registered', f'{self.__api.model_id}-{service}.json')
+
+    def __get_registered(self) -> dict:
+        """
+        The registered symbols and exchanges of this model, read from the slate data folder the first time
+        """
+        if self.__registered is None:
+            try:
+                with open(self.__registered_path, 'r') as file:
+                    stored = json.load(file)
+                self.__registered = {'symbols': set(stored['symbols']), 'exchanges': set(stored['exchanges'])}
+            except (FileNotFoundError, ValueError, KeyError, TypeError):
+                self.__registered = {'symbols': set(), 'exchanges': set()}
+        return self.__registered
+
+    def __unregistered(self, kind: str, values: list) -> list:
+        """
+        Filter values down to the ones not yet registered, keeping their order and removing duplicates
+        """
+        with self.__registered_lock:
+            registered = self.__get_registered()[kind]
+            return [value for value in dict.fromkeys(values) if value not in registered]
+
+    def __register(self, kind: str, values: list):
+        """
+        Remember values which the platform acknowledged. The file is replaced atomically so a crash never corrupts it
+        """
+        with self.__registered_lock:
+            registered = self.__get_registered()
+            registered[kind].update(values)
+            path = self.__registered_path
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + '.tmp', 'w') as file:
+                json.dump({kind_: sorted(values_) for kind_, values_ in registered.items()}, file)
+            os.replace(path + '.tmp', path)
+
+    def __post_unregistered(self, kind: str, values: list, route: str, body):
+        """
+        Post the values which aren't registered yet and register them once the platform acknowledges them. Posts
+         which were queued in background mode, dropped or rejected aren't registered, so they are sent again next time
+
+        :param body: Builds the request body from the unregistered values
+        """
+        if inspect.iscoroutinefunction(self.__api.post):
+            return self.__post_new(kind, values, route, body)
+        with self.__posting_locks[kind]:
+            return self.__post_new(kind, values, route, body)
+
+    def __post_new(self, kind: str, values: list, route: str, body):
+        new = self.__unregistered(kind, values)
+        if not new:
+            return self.__nothing_to_post()
+        response = self.__api.post(self.__assemble_base(route), body(new))
+        if inspect.iscoroutine(response):
+            return self.__register_when_acknowledged(kind, new, response)
+        if acknowledged(response):
+            self.__register(kind, new)
+        return response
+
+    async def __register_when_acknowledged(self, kind: str, values: list, response):
+        """
+        Await a post made through the async API and register the values if it was acknowledged
+        """
+        response = await response
+        if acknowledged(response):
+            self.__register(kind, values)
+        return response
+
+    def __nothing_to_post(self):
+        """
+        None, or an awaitable resolving to None for the async API so that every call can be awaited
+        """
+        if inspect.iscoroutinefunction(self.__api.post):
+            async def nothing():
+                return None
+            return nothing()
+        return None
+
+    def clear_registered(self):
+        """
+        Forget which symbols and exchanges have been registered so that the next add_symbol, add_symbols or
+         set_exchange posts them again. Use this if they were removed on the platform
+
+        :return: None
+        """
+        with self.__registered_lock:
+            self.__registered = {'symbols': set(), 'exchanges': set()}
+            try:
+                os.remove(self.__registered_path)
+            except FileNotFoundError:
+                pass
+
     # TODO add routes to remove the used symbols and exchanges
     def add_symbol(self,
                    symbol: str) -> dict:
         """
-        Add a used symbol for the live view to the platform
+        Add a used symbol for the live view to the platform. Symbols which were already added for this model are
+         skipped
 
         :param symbol: A string like 'AAPL' or 'BTC-USD'
-        :return: API response (dict)
+        :return: API response (dict), or None if the symbol was already added. The symbol is only remembered once the
+         platform acknowledges it
+         synchronously, so in background mode nothing is remembered and every call posts again
         """
-        return self.__api.post(self.__assemble_base('/used-symbol'), {
-            'symbol': symbol
-        })
+        return self.__post_unregistered('symbols', [symbol], '/used-symbol', lambda new: {'symbol': new[0]})
+
+    def add_symbols(self, symbols: list) -> dict:
+        """
+        Add many used symbols in a single request. Symbols which were already added for this model are skipped
+
+        :param symbols: A list of strings like ['AAPL', 'BTC-USD']
+        :return: API response (dict), or None if every symbol was already added. The symbols are only remembered once
+         the platform acknowledges them
+         synchronously, so in background mode nothing is remembered and every call posts again
+        """
+        return self.__post_unregistered('symbols', symbols, '/used-symbols',
+                                        lambda new: {'symbols': json.dumps(new)})
 
     def set_exchange(self, used_exchange) -> dict:
         """
-        Add an exchange to the list of used exchanges to the platform
+        Add an exchange to the list of used exchanges to the platform. Exchanges which were already added for this
+         model are skipped
 
         :param used_exchange: Exchange like 'coinbase_pro' or 'oanda'
-        :return: API response (dict)
+        :return: API response (dict), or None if the exchange was already added. The exchange is only remembered once
+         the platform acknowledges it
+         synchronously, so in background mode nothing is remembered and every call posts again
         """
-        return self.__api.post(self.__assemble_base('/used-exchange'), {
-            'exchange': used_exchange
-        })
+        return self.__post_unregistered('exchanges', [used_exchange], '/used-exchange',
+                                        lambda new: {'exchange': new[0]})
@@ -0,0 +1,113 @@
+import json
+import typing
+import uuid
+
+# The number of bytes collected before a chunk of the body is handed to the socket
+CHUNK_SIZE = 64 * 1024
+
+
+def _default(value):
+    """
+    Encode the numpy scalars which the json module doesn't understand
+    """
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class JSONStream:
+    def __init__(self, key: str, values, items_per_chunk: int = 1000):
+        """
+        Lazily encode {key: values} as compact JSON. The values are sliced items_per_chunk at a time so that lists,
+         numpy arrays and pandas series are never converted or encoded as a whole. The stream can be iterated more
+         than once, which lets a failed upload be retried
+
+        :param key: The top level key of the object
+        :param values: A list, numpy array or pandas series
+        :param items_per_chunk: The number of values encoded at a time
+        """
+        self.key = key
+        self.values = values
+        self.items_per_chunk = items_per_chunk
+        self.content_type = 'application/json'
+
+    def __slice(self, start: int) -> list:
+        end = start + self.items_per_chunk
+        if isinstance(self.values, list):
+            return self.values[start:end]
+        if hasattr(self.values, 'iloc'):
+            return self.values.iloc[start:end].tolist()
+        return self.values[start:end].tolist()
+
+    def iter_array(self) -> typing.Iterator[bytes]:
+        """
+        Encode just the values as a JSON array
+        """
+        yield b'['
+        for start in range(0, len(self.values), self.items_per_chunk):
+            encoded = json.dumps(self.__slice(start), separators=(',', ':'), default=_default)
+            # Strip the brackets so that the slices join into one array
+            yield (b',' if start else b'') + encoded[1:-1].encode()
+        yield b']'
+
+    def __iter__(self) -> typing.Iterator[bytes]:
+        yield b'{' + json.dumps(self.key).encode() + b':'
+        yield from self.iter_array()
+        yield b'}'
+
+
+class FileStream:
+    def __init__(self, path: str):
+        """
+        Read a file in chunks each time the stream is iterated. The file is only open while it is being read
+
+        :param path: The path to the file
+        """
+        self.path = path
+        self.content_type = 'application/octet-stream'
+
+    def __iter__(self) -> typing.Iterator[bytes]:
+        with open(self.path, 'rb') as file:
+            yield from iter(lambda: file.read(CHUNK_SIZE), b'')
+
+
+class MultipartBody:
+    def __init__(self, fields: list, files: dict):
+        """
+        A multipart/form-data body which is generated while it is sent instead of being built in memory
+
+        :param fields: A list of (key, value) form fields
+        :param files: A dictionary of part names to streams. A stream is any re-iterable of bytes and may have a
+         content_type attribute
+        """
+        self.fields = fields
+        self.files = files
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+
+    def __parts(self) -> typing.Iterator[bytes]:
+        boundary = self.boundary.encode()
+        for key, value in self.fields:
+            if isinstance(value, str):
+                value = value.encode()
+            yield b'--' + boundary + b'\r\nContent-Disposition: form-data; name="' + key.encode() + b'"\r\n\r\n'
+            yield value + b'\r\n'
+
+        for name, stream in self.files.items():
+            content_type = getattr(stream, 'content_type', 'application/octet-stream')
+            yield b'--' + boundary + b'\r\nContent-Disposition: form-data; name="' + name.encode() + \
+                b'"; filename="' + name.encode() + b'"\r\nContent-Type: ' + content_type.encode() + b'\r\n\r\n'
+            yield from stream
+            yield b'\r\n'
+
+        yield b'--' + boundary + b'--\r\n'
+
+    def __iter__(self) -> typing.Iterator[bytes]:
+        buffer = bytearray()
+        for part in self.__parts():
+            buffer += part
+            if len(buffer) >= CHUNK_SIZE:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
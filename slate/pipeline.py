@@ -0,0 +1,146 @@
+import collections
+import threading
+import time
+import typing
+import warnings
+
+from slate.utils import BackgroundThread, close_at_exit, forget_at_exit
+
+BLOCK = 'block'
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+
+# The number of seconds the interpreter waits on exit for queued events to be sent
+EXIT_TIMEOUT = 10
+
+
+class EventPipeline:
+    def __init__(self, send: typing.Callable, max_size: int = 10000, policy: str = BLOCK):
+        """
+        A bounded in-memory queue drained by a dedicated sender thread. This moves the HTTP round-trip off of the
+         calling thread so that reporting an event only costs an append
+
+        :param send: The function called on the sender thread with the arguments of each submitted event
+        :param max_size: The maximum number of events held in memory before the backpressure policy applies
+        :param policy: What to do when the queue is full - 'block', 'drop_oldest' or 'drop_newest'
+        """
+        if policy not in (BLOCK, DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown backpressure policy: {policy}. Use one of '{BLOCK}', '{DROP_OLDEST}' or "
+                             f"'{DROP_NEWEST}'")
+
+        self.__send = send
+        self.__max_size = max_size
+        self.__policy = policy
+
+        self.__queue = collections.deque()
+        self.__condition = threading.Condition()
+        # Events which are queued or currently being sent
+        self.__pending = 0
+        self.__closed = False
+
+        self.__thread = BackgroundThread(self.__run, 'slate-event-pipeline')
+
+        self.sent = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = None
+
+        close_at_exit(self, 'shutdown', EXIT_TIMEOUT)
+
+    def submit(self, *args) -> bool:
+        """
+        Enqueue an event to be sent in the background
+
+        :param args: The arguments passed to the send function
+        :return: False if the event was dropped, including when the pipeline shut down while this call was blocked on
+         a full queue, True otherwise
+        """
+        with self.__condition:
+            if self.__closed:
+                raise RuntimeError("Cannot submit to a pipeline that has been shut down")
+            self.__thread.ensure()
+
+            if len(self.__queue) >= self.__max_size:
+                if self.__policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                elif self.__policy == DROP_OLDEST:
+                    self.__queue.popleft()
+                    self.__pending -= 1
+                    self.dropped += 1
+                else:
+                    while len(self.__queue) >= self.__max_size and not self.__closed:
+                        self.__condition.wait()
+                    # The pipeline was shut down while this caller waited for room, so nothing would ever send the
+                    #  event
+                    if self.__closed:
+                        self.dropped += 1
+                        return False
+
+            self.__queue.append(args)
+            self.__pending += 1
+            self.__condition.notify_all()
+        return True
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while not self.__queue and not self.__closed:
+                    self.__condition.wait()
+                if not self.__queue:
+                    return
+                args = self.__queue.popleft()
+                # Wake anyone blocked on a full queue
+                self.__condition.notify_all()
+
+            try:
+                self.__send(*args)
+                self.sent += 1
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+                warnings.warn(f"Failed to send a background event: {e}")
+            finally:
+                with self.__condition:
+                    self.__pending -= 1
+                    self.__condition.notify_all()
+
+    @property
+    def depth(self) -> int:
+        """
+        The number of events waiting to be sent
+        """
+        return len(self.__queue)
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait for every queued event to be sent
+
+        :param timeout: The maximum number of seconds to wait, None waits forever
+        :return: True if the queue was drained, False if the timeout expired first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.__condition:
+            while self.__pending > 0:
+                if not self.__thread.alive:
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.__condition.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: float = None) -> bool:
+        """
+        Stop accepting events, send everything still queued and stop the sender thread
+
+        :param timeout: The maximum number of seconds to wait for the queue to drain
+        :return: True if every event was sent before shutting down
+        """
+        drained = self.flush(timeout)
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+        self.__thread.join(0 if not drained else timeout)
+        forget_at_exit(self)
+        return drained
@@ -0,0 +1,182 @@
+import threading
+import time
+import typing
+
+ORDERS = 'orders'
+LIFECYCLE = 'lifecycle'
+METRICS = 'metrics'
+LOGS = 'logs'
+# Highest priority first
+PRIORITIES = (ORDERS, LIFECYCLE, METRICS, LOGS)
+
+DELAY = 'delay'
+SAMPLE = 'sample'
+DROP = 'drop'
+
+# The last component of a route decides its class, anything not listed is lifecycle traffic
+ROUTE_PRIORITIES = {
+    'spot-market': ORDERS,
+    'spot-limit': ORDERS,
+    'spot-stop': ORDERS,
+    'update-trade': ORDERS,
+    'set-pnl': METRICS,
+    'append-pnl': METRICS,
+    'set-custom-metric': METRICS,
+    'log': LOGS,
+    'log-batch': LOGS,
+}
+
+# The fraction of the shared bucket each class leaves untouched for the classes above it. Logs are throttled
+#  once the bucket is half empty while orders can use it all
+DEFAULT_RESERVES = {
+    ORDERS: 0,
+    LIFECYCLE: 0.1,
+    METRICS: 0.25,
+    LOGS: 0.5,
+}
+
+DEFAULT_POLICIES = {
+    ORDERS: DELAY,
+    LIFECYCLE: DELAY,
+    METRICS: SAMPLE,
+    LOGS: DROP,
+}
+
+
+def priority_of(route: str) -> str:
+    """
+    Find the priority class of a route like /v1/live/spot-market
+    """
+    return ROUTE_PRIORITIES.get(route.rsplit('/', 1)[-1], LIFECYCLE)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        """
+        A bucket holding up to burst tokens which refills at rate tokens per second
+
+        :param rate: The number of tokens added each second
+        :param burst: The capacity of the bucket
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.__updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.__updated) * self.rate)
+        self.__updated = now
+
+    def wait_time(self, floor: float) -> float:
+        """
+        The number of seconds until taking a token would leave at least floor tokens
+        """
+        missing = floor + 1 - self.tokens
+        return missing / self.rate if missing > 0 else 0
+
+
+class RateLimiter:
+    def __init__(self, rate: float = 50, burst: float = 100, route_budgets: dict = None, policies: dict = None,
+                 reserves: dict = None, sample_every: int = 10, max_delay: float = 5):
+        """
+        Limit the rate of requests shared by every client of an API. Each request takes a token from a shared bucket
+         and from the bucket of its route if that route has a budget. Lower priority classes stop taking tokens
+         earlier, so under pressure logs are dropped, metrics are sampled and orders still go through
+
+        :param rate: The number of requests per second across all routes
+        :param burst: The number of requests which can be sent at once after a quiet period
+        :param route_budgets: Budgets for individual routes like {'/v1/live/log': (rate, burst)}
+        :param policies: What each class does when it is throttled - 'delay', 'sample' or 'drop'. Defaults to delaying
+         orders and lifecycle events, sampling metrics and dropping logs
+        :param reserves: The fraction of the shared bucket each class leaves for higher priority classes
+        :param sample_every: A sampled class sends one in this many throttled requests
+        :param max_delay: The longest a delayed request waits before it is sent anyway
+        """
+        self.policies = {**DEFAULT_POLICIES, **(policies or {})}
+        for priority, policy in self.policies.items():
+            if policy not in (DELAY, SAMPLE, DROP):
+                raise ValueError(f"Unknown rate limit policy for {priority}: {policy}. Use one of '{DELAY}', "
+                                 f"'{SAMPLE}' or '{DROP}'")
+        self.reserves = {**DEFAULT_RESERVES, **(reserves or {})}
+        self.sample_every = sample_every
+        self.max_delay = max_delay
+
+        self.__bucket = TokenBucket(rate, burst)
+        self.__route_buckets = {route: TokenBucket(*budget) for route, budget in (route_budgets or {}).items()}
+        self.__throttled = {priority: 0 for priority in PRIORITIES}
+        self.__lock = threading.Lock()
+
+        self.allowed = 0
+        self.delayed = 0
+        self.sampled = 0
+        self.dropped = 0
+
+    def __wait_time(self, route: str, priority: str) -> float:
+        """
+        Refill the buckets of a request and find how long it has to wait for a token
+        """
+        buckets = [(self.__bucket, self.__bucket.burst * self.reserves.get(priority, 0))]
+        route_bucket = self.__route_buckets.get(route)
+        if route_bucket is not None:
+            buckets.append((route_bucket, 0))
+        wait = 0
+        for bucket, floor in buckets:
+            bucket.refill()
+            wait = max(wait, bucket.wait_time(floor))
+        return wait
+
+    def __take(self, route: str):
+        self.__bucket.tokens -= 1
+        route_bucket = self.__route_buckets.get(route)
+        if route_bucket is not None:
+            route_bucket.tokens -= 1
+
+    def acquire(self, route: str, priority: typing.Optional[str] = None) -> bool:
+        """
+        Take a token for a request, waiting if its class is delayed
+
+        :param route: The full route like /v1/live/log
+        :param priority: The priority class, found from the route by default
+        :return: True if the request should be sent, False if it was dropped
+        """
+        priority = priority or priority_of(route)
+        policy = self.policies.get(priority, DELAY)
+        waited = 0
+        with self.__lock:
+            while True:
+                wait = self.__wait_time(route, priority)
+                if wait == 0:
+                    self.__take(route)
+                    self.allowed += 1
+                    if waited:
+                        self.delayed += 1
+                    return True
+
+                if policy == DELAY:
+                    if waited >= self.max_delay:
+                        # Sending late is better than losing an order, the service may still throttle it
+                        self.__take(route)
+                        self.allowed += 1
+                        self.delayed += 1
+                        return True
+                    wait = min(wait, self.max_delay - waited)
+                    # Other classes may take tokens while this one waits
+                    self.__lock.release()
+                    try:
+                        time.sleep(wait)
+                    finally:
+                        self.__lock.acquire()
+                    waited += wait
+                    continue
+
+                self.__throttled[priority] = self.__throttled.get(priority, 0) + 1
+                # A sampled request ignores its reserve but still needs a token
+                if policy == SAMPLE and self.__throttled[priority] % self.sample_every == 1 % self.sample_every and \
+                        self.__wait_time(route, ORDERS) == 0:
+                    self.__take(route)
+                    self.allowed += 1
+                    self.sampled += 1
+                    return True
+                self.dropped += 1
+                return False
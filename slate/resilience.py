@@ -0,0 +1,92 @@
+import random
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 3, backoff: float = 0.1, max_backoff: float = 5,
+                 statuses: tuple = (429, 500, 502, 503, 504)):
+        """
+        Describe how failed requests are retried. Delays grow exponentially from backoff and are fully jittered so
+         that many clients recovering from the same outage don't retry in lockstep
+
+        :param max_attempts: The total number of attempts, including the first one
+        :param backoff: The base delay in seconds
+        :param max_backoff: The largest delay in seconds
+        :param statuses: Response status codes which are retried
+        """
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+
+    def delay(self, attempt: int) -> float:
+        """
+        The number of seconds to wait before the next attempt
+
+        :param attempt: The number of attempts made so far
+        :return: float
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        """
+        Stop sending requests to a service which keeps failing. After failure_threshold consecutive failures the
+         circuit opens and requests fail immediately. Once reset_timeout seconds have passed a single trial request
+         is let through, closing the circuit if it succeeds
+
+        :param failure_threshold: The number of consecutive failures which opens the circuit
+        :param reset_timeout: The number of seconds to stay open before trying again
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.__lock = threading.Lock()
+        self.__failures = 0
+        self.__opened_at = None
+        self.__trial_running = False
+        self.state = CLOSED
+
+    def allow(self) -> bool:
+        """
+        Check if a request may be sent right now
+
+        :return: bool
+        """
+        with self.__lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.__opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self.__trial_running:
+                self.__trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.__lock:
+            self.__failures = 0
+            self.__trial_running = False
+            self.state = CLOSED
+
+    def release(self):
+        """
+        Finish a request which said nothing about the health of the service, such as one which was throttled or
+         which failed before reaching it. A trial request ending this way lets the next request be the trial instead
+        """
+        with self.__lock:
+            self.__trial_running = False
+
+    def record_failure(self):
+        with self.__lock:
+            self.__failures += 1
+            self.__trial_running = False
+            if self.state == HALF_OPEN or self.__failures >= self.failure_threshold:
+                self.state = OPEN
+                self.__opened_at = time.monotonic()
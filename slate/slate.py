@@ -1,67 +1,266 @@
-import asyncio
+import concurrent.futures
+import threading
 import time
 import typing
 
 import slate.utils as utils
 from slate.api import API
-
-from slate.integrations import Integrations
+from slate.loop import BackgroundLoop
+from slate.resilience import RetryPolicy
+from slate.telemetry import PrometheusExporter, StatsLogger
 from slate.live.live import Live
 from slate.model.model import Model
-from slate.backtest.backtest import Backtest
 
 
 class Slate:
-    def __init__(self, model_id: str = None, enable_async=False):
+    def __init__(self, model_id: str = None, enable_async=False, async_workers: int = None, pool_size: int = 10,
+                 preconnect: bool = False, background: bool = False, queue_size: int = 10000,
+                 backpressure: str = 'block', batch: bool = False, batch_window: float = 0.01, batch_size: int = 100,
+                 api_url: str = None, spool_dir: str = None, spool_fsync: str = 'interval', spool_only: bool = False,
+                 timeout: float = 30, route_timeouts: dict = None, deadline: float = None, max_retries: int = 2,
+                 compression: str = None, compression_level: int = None, compression_threshold: int = 1024,
+                 rate_limit: float = None, rate_burst: float = None, route_budgets: dict = None,
+                 rate_limit_policies: dict = None):
         """
         Initialize a new slate instance
 
         :param enable_async: Enable this to allow submission to the event loop
+        :param async_workers: The number of threads which run blocking callables passed to submit
+        :param pool_size: The number of keep-alive connections shared by live, model, backtest and integrations
+        :param preconnect: Connect to the events service during construction instead of on the first event
+        :param background: Send live & model events from a background thread so reporting never blocks the caller
+        :param queue_size: The maximum number of background events held in memory
+        :param backpressure: What to do when the background queue is full - 'block', 'drop_oldest' or 'drop_newest'
+        :param batch: Coalesce events posted within batch_window seconds of each other into a single request. Without
+         background, each post waits for its batch, so this only helps when several threads post at once
+        :param batch_window: The number of seconds to wait for more events before sending a batch
+        :param batch_size: The maximum number of events sent in one batch
+        :param api_url: Override the events service url, for example to point at a local stand-in server
+        :param spool_dir: A folder to hold events on disk while the events service is unreachable. They are replayed
+         in order once it comes back
+        :param spool_fsync: When to flush the spool to disk - 'always', 'interval' or 'never'
+        :param spool_only: Only write events to spool_dir and leave sending them to a slate.Uploader process. Use
+         this in multiprocessing workers so they never open connections or wait on the network. File uploads are
+         written to spool_dir as well
+        :param timeout: The number of seconds to wait on the events service before giving up on an attempt
+        :param route_timeouts: Per-route overrides of timeout like {'/v1/live/log': 5}
+        :param deadline: The total number of seconds a request may take across all retries
+        :param max_retries: The number of times a failed request is retried with exponential backoff
+        :param compression: Compress request bodies with 'gzip', or 'zstd' if the zstandard package is installed
+        :param compression_level: The compression level, defaults to 6 for gzip and 3 for zstd
+        :param compression_threshold: Bodies smaller than this many bytes are sent uncompressed
+        :param rate_limit: The maximum number of posts per second across live, model, backtest and integrations.
+         Orders are prioritized over lifecycle events, metrics and logs
+        :param rate_burst: The number of posts which can be sent at once, defaults to twice rate_limit
+        :param route_budgets: Budgets for individual routes like {'/v1/live/log': (rate, burst)}
+        :param rate_limit_policies: Override what a priority class does when throttled - 'delay', 'sample' or 'drop'
+         like {'logs': 'sample'}
         """
         self.model_id, self.__api_key, self.__api_pass = utils.load_auth()
         if model_id is not None:
             self.model_id = model_id
 
-        self.__api = API(self.model_id, self.__api_key, self.__api_pass)
+        self.__api = API(self.model_id, self.__api_key, self.__api_pass, pool_size=pool_size,
+                         preconnect=preconnect, api_url=api_url, timeout=timeout,
+                         route_timeouts=route_timeouts, deadline=deadline,
+                         retry=RetryPolicy(max_attempts=max_retries + 1))
+        if compression is not None:
+            self.__api.enable_compression(compression, level=compression_level, threshold=compression_threshold)
+        if rate_limit is not None:
+            self.__api.enable_rate_limit(rate_limit, rate_burst or rate_limit * 2, route_budgets=route_budgets,
+                                         policies=rate_limit_policies)
+        if spool_dir is not None:
+            self.__api.enable_spool(spool_dir, fsync=spool_fsync, spool_only=spool_only)
+        if batch:
+            self.__api.enable_batching(window=batch_window, max_size=batch_size)
+        if background:
+            self.__api.enable_background(max_size=queue_size, policy=backpressure)
 
         self.live = Live(self.__api)
         self.model = Model(self.__api)
-        self.backtest = Backtest(self.__api)
-        self.integrations = Integrations(self, self.__api)
+        # Backtest and the integrations pull in pandas, numpy and the backtesting frameworks, so a live bot which
+        #  never touches them doesn't pay for importing them
+        self.__backtest = None
+        self.__integrations = None
+        self.__lazy_lock = threading.Lock()
 
         self.__settings = {
             'enable_async': enable_async
         }
+        # The loop runs on its own daemon thread so that constructing slate never blocks
         self.__event_loop = None
+        self.__exporters = []
         if enable_async:
-            self.__event_loop = asyncio.get_event_loop()
-            self.__event_loop.run_forever()
+            self.__event_loop = BackgroundLoop(workers=async_workers)
+
+    @property
+    def backtest(self):
+        """
+        The backtest client, created on first use
+
+        :return: slate.backtest.backtest.Backtest
+        """
+        if self.__backtest is None:
+            with self.__lazy_lock:
+                if self.__backtest is None:
+                    from slate.backtest.backtest import Backtest
+                    self.__backtest = Backtest(self.__api)
+        return self.__backtest
 
-    def submit(self, callable_: typing.Callable, **kwargs):
+    @property
+    def integrations(self):
+        """
+        The bt, backtesting.py and jesse integrations, created on first use
+
+        :return: slate.integrations.Integrations
+        """
+        if self.__integrations is None:
+            with self.__lazy_lock:
+                if self.__integrations is None:
+                    from slate.integrations import Integrations
+                    self.__integrations = Integrations(self, self.__api)
+        return self.__integrations
+
+    def submit(self, callable_: typing.Callable, *args, **kwargs) -> concurrent.futures.Future:
         """
         Submit a new job into the slate-managed event loop. Ensure that the enable_async is == True on the
-         initialization
+         initialization. Coroutine functions run on the loop while blocking functions run in its thread pool
 
-        :param callable_: The function to submit to the event loop
+        :param callable_: The function, coroutine function or coroutine to submit to the event loop
+        :param args: Positional arguments for the function
         :param kwargs: A key/value set of arguments for the function to evaluate
-        :return:
+        :return: A future holding the result of the job
         """
         if self.__event_loop is not None:
-            self.__event_loop.create_task(self.__execute(callable_, kwargs))
+            return self.__event_loop.submit(callable_, *args, **kwargs)
         else:
-            raise Exception("Must set enable_sync to True to submit to the event loop")
+            raise Exception("Must set enable_async to True to submit to the event loop")
 
-    @staticmethod
-    async def __execute(callable_: typing.Callable, kwargs: dict):
+    def add_hook(self, hook):
         """
-        Execute the function in the event loop
+        Call a hook around every request and span made by this slate instance, see slate.tracing for ready-made span
+         and Chrome trace hooks
 
-        :param callable_: The function to submit to the event loop
-        :param kwargs: A key/value set of arguments for the function to evaluate
-        :return:
+        :param hook: A slate.tracing.Hook or any object with before_request, after_response or on_error
+        :return: None
+        """
+        self.__api.add_hook(hook)
+
+    def remove_hook(self, hook):
+        self.__api.remove_hook(hook)
+
+    def span(self, name: str, **attributes):
+        """
+        Report a named piece of work to the hooks. Requests made inside it on the same thread become its children:
+
+            with slate.span('rebalance', symbols=len(symbols)):
+                ...
+
+        :param name: A name like 'strategy.rebalance'
+        :param attributes: Anything else worth recording
+        """
+        return self.__api.span(name, **attributes)
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait for all background events to be sent
+
+        :param timeout: The maximum number of seconds to wait, None waits forever
+        :return: True if everything was sent
+        """
+        return self.__api.flush(timeout)
+
+    def close(self, timeout: float = None):
         """
-        return callable_(**kwargs)
+        Finish submitted jobs, send any buffered PNL points, metrics and log lines and any background events, and
+         release the connections held by this slate instance
+
+        :param timeout: The maximum number of seconds to wait for submitted jobs and again for background events.
+         Jobs still running after the timeout are cancelled
+        :return: None
+        """
+        if self.__event_loop is not None:
+            self.__event_loop.shutdown(timeout)
+        self.live.close()
+        for exporter in self.__exporters:
+            exporter.stop()
+        self.__exporters = []
+        self.__api.close(timeout)
+
+    @property
+    def counters(self) -> dict:
+        """
+        Transport counters such as requests, retries, timeouts and short-circuited requests, the state of the circuit
+         breaker, the bytes saved by compression and the posts throttled by the rate limiter
+
+        :return: dict
+        """
+        counters = {**self.__api.counters, 'circuit_state': self.__api.breaker.state}
+        compressor = self.__api.compressor
+        if compressor is not None:
+            counters['compressed_bodies'] = compressor.bodies
+            counters['compression_bytes_in'] = compressor.bytes_in
+            counters['compression_bytes_out'] = compressor.bytes_out
+            counters['compression_bytes_saved'] = compressor.bytes_saved
+        limiter = self.__api.rate_limiter
+        if limiter is not None:
+            counters['rate_limit_delayed'] = limiter.delayed
+            counters['rate_limit_sampled'] = limiter.sampled
+            counters['rate_limit_dropped'] = limiter.dropped
+        return counters
 
     @property
     def now(self):
         return time.time()
+
+    def __queue_depths(self) -> dict:
+        """
+        The number of events waiting in each background queue
+        """
+        depths = {}
+        if self.__api.pipeline is not None:
+            depths['pipeline'] = self.__api.pipeline.depth
+        if self.__api.batcher is not None:
+            depths['batcher'] = self.__api.batcher.depth
+        if self.__api.spool is not None:
+            depths['spool_bytes'] = self.__api.spool.size
+        return depths
+
+    def stats(self) -> dict:
+        """
+        Client telemetry: per-route request counts, errors, retries, request and response bytes and latency
+         percentiles, along with the depth of any background queues and the transport counters
+
+        :return: A dictionary like {'routes': {'/v1/live/event': {'requests': 10, 'latency_p95': 0.03, ...}},
+         'queues': {'pipeline': 0}, 'counters': {...}}
+        """
+        return {
+            'routes': self.__api.telemetry.snapshot(),
+            'queues': self.__queue_depths(),
+            'counters': self.counters
+        }
+
+    def serve_metrics(self, port: int = 9464, host: str = '127.0.0.1') -> PrometheusExporter:
+        """
+        Serve the stats in the Prometheus text format at http://host:port/metrics until close is called
+
+        :param port: The port to listen on, 0 picks a free port
+        :param host: The interface to listen on
+        :return: The PrometheusExporter
+        """
+        exporter = PrometheusExporter(lambda: self.__api.telemetry.prometheus({'queue_depth': self.__queue_depths()}),
+                                      host=host, port=port)
+        self.__exporters.append(exporter)
+        return exporter
+
+    def log_stats(self, interval: float = 60, logger=None) -> StatsLogger:
+        """
+        Log the stats as JSON every interval seconds until close is called
+
+        :param interval: The number of seconds between dumps
+        :param logger: Where to log, defaults to the 'slate' logger
+        :return: The StatsLogger
+        """
+        stats_logger = StatsLogger(self.stats, interval=interval, logger=logger)
+        self.__exporters.append(stats_logger)
+        return stats_logger
@@ -0,0 +1,374 @@
+import json
+import os
+import threading
+import time
+import typing
+import warnings
+
+FSYNC_ALWAYS = 'always'
+FSYNC_INTERVAL = 'interval'
+FSYNC_NEVER = 'never'
+
+# Segments still being written by a process end in .open and are renamed to .seg once they are complete
+OPEN_SUFFIX = '.open'
+CLOSED_SUFFIX = '.seg'
+ACK_SUFFIX = '.ack'
+LOCK_NAME = 'replay.lock'
+# The encoded bodies of spooled file uploads live in this folder inside the spool, the records only name them
+BODIES_DIR = 'bodies'
+BODY_SUFFIX = '.body'
+
+# The replay lock file only tells processes apart, so threads of one process replaying the same directory also share
+#  one of these. Keyed by pid too so that a child forked mid-replay doesn't inherit a lock nobody will release
+_replay_locks = {}
+_replay_locks_lock = threading.Lock()
+
+
+def _replay_lock(directory: str) -> threading.Lock:
+    """
+    The lock held by whichever thread of this process is replaying a spool directory
+    """
+    with _replay_locks_lock:
+        return _replay_locks.setdefault((directory, os.getpid()), threading.Lock())
+
+
+def _pid_alive(pid: int) -> bool:
+    """
+    Check if a process is still running
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        # The process exists but belongs to someone else, or the platform can't tell
+        return True
+    return True
+
+
+class Spool:
+    def __init__(self, directory: str, fsync: str = FSYNC_INTERVAL, fsync_interval: float = 1,
+                 segment_size: int = 4 * 1024 * 1024, max_size: int = 256 * 1024 * 1024):
+        """
+        An append-only on-disk log of events that couldn't be sent. Events are written as JSON lines into segment
+         files named by creation time and pid, so several processes can write to the same directory and a single
+         replayer can drain them in order. A torn final line left by a crash is ignored on replay
+
+        :param directory: The folder holding the segment files
+        :param fsync: When to flush appends to disk - 'always', 'interval' or 'never'
+        :param fsync_interval: The number of seconds between flushes when fsync='interval'
+        :param segment_size: The size in bytes after which a new segment file is started
+        :param max_size: The maximum total size of the spool in bytes. Appends beyond this are dropped
+        """
+        if fsync not in (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER):
+            raise ValueError(f"Unknown fsync policy: {fsync}. Use one of '{FSYNC_ALWAYS}', '{FSYNC_INTERVAL}' or "
+                             f"'{FSYNC_NEVER}'")
+
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.__fsync = fsync
+        self.__fsync_interval = fsync_interval
+        self.__segment_size = segment_size
+        self.__max_size = max_size
+
+        self.__lock = threading.Lock()
+        self.__file = None
+        self.__file_pid = None
+        self.__file_path = None
+        self.__last_sync = 0
+        # Wakes a replayer waiting for new records
+        self.appended = threading.Event()
+
+        self.written = 0
+        self.replayed = 0
+        self.dropped = 0
+
+        self.__recover()
+        # Checked on every append instead of listing the directory, this is refreshed whenever a segment rotates
+        self.__size = self.size
+        self.__pending = self.__has_unreplayed()
+
+    def __recover(self):
+        """
+        Close out any segments left open by processes that have exited
+        """
+        for name in os.listdir(self.directory):
+            if name.endswith(OPEN_SUFFIX):
+                pid = int(name.split('-')[1].split('.')[0])
+                if pid != os.getpid() and not _pid_alive(pid):
+                    path = os.path.join(self.directory, name)
+                    os.replace(path, path[:-len(OPEN_SUFFIX)] + CLOSED_SUFFIX)
+
+    def __segments(self) -> list:
+        """
+        All segment files in the order they were created
+
+        :return: A list of file names
+        """
+        return sorted(name for name in os.listdir(self.directory)
+                      if name.endswith(OPEN_SUFFIX) or name.endswith(CLOSED_SUFFIX))
+
+    @property
+    def size(self) -> int:
+        """
+        The total size of every segment in bytes
+        """
+        total = 0
+        for name in self.__segments():
+            try:
+                total += os.path.getsize(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+        return total
+
+    @property
+    def pending(self) -> bool:
+        """
+        True if records have been appended since the spool was last drained
+        """
+        return self.__pending
+
+    def __has_unreplayed(self) -> bool:
+        """
+        Check the segment files for records which have not been replayed
+        """
+        for name in self.__segments():
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getsize(path) > self.__read_ack(path):
+                    return True
+            except FileNotFoundError:
+                pass
+        return False
+
+    def __open_segment(self):
+        """
+        Start a new segment for this process, closing the current one
+        """
+        self.__close_segment()
+        name = f'{time.time_ns():020d}-{os.getpid()}{OPEN_SUFFIX}'
+        self.__file_path = os.path.join(self.directory, name)
+        self.__file = open(self.__file_path, 'ab')
+        self.__file_pid = os.getpid()
+
+    def __close_segment(self):
+        """
+        Flush the current segment and mark it complete
+        """
+        if self.__file is None:
+            return
+        # A forked child must not close or rename its parent's segment
+        if self.__file_pid == os.getpid():
+            self.__file.flush()
+            os.fsync(self.__file.fileno())
+            self.__file.close()
+            os.replace(self.__file_path, self.__file_path[:-len(OPEN_SUFFIX)] + CLOSED_SUFFIX)
+        self.__file = None
+        self.__file_path = None
+
+    def append(self, record: dict) -> bool:
+        """
+        Write a record to the end of the spool
+
+        :param record: Any JSON serializable dictionary
+        :return: False if the record was dropped because the spool is full
+        """
+        line = json.dumps(record, default=str).encode() + b'\n'
+        with self.__lock:
+            if self.__file is None or self.__file_pid != os.getpid() or self.__file.tell() >= self.__segment_size:
+                self.__open_segment()
+                self.__size = self.size
+
+            if self.__size + len(line) > self.__max_size:
+                self.dropped += 1
+                warnings.warn(f"The spool at {self.directory} is full, dropping an event")
+                return False
+
+            self.__file.write(line)
+            self.__file.flush()
+            now = time.monotonic()
+            if self.__fsync == FSYNC_ALWAYS or \
+                    (self.__fsync == FSYNC_INTERVAL and now - self.__last_sync >= self.__fsync_interval):
+                os.fsync(self.__file.fileno())
+                self.__last_sync = now
+            self.written += 1
+            self.__size += len(line)
+            self.__pending = True
+        self.appended.set()
+        return True
+
+    @staticmethod
+    def __ack_path(path: str) -> str:
+        """
+        The cursor file for a segment. This doesn't change when an open segment is closed
+        """
+        return os.path.splitext(path)[0] + ACK_SUFFIX
+
+    def __read_ack(self, path: str) -> int:
+        """
+        Read the byte offset up to which a segment has been replayed
+        """
+        try:
+            with open(self.__ack_path(path), 'r') as file:
+                return int(file.read() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def __write_ack(self, path: str, offset: int):
+        """
+        Atomically record the replayed offset of a segment
+        """
+        ack = self.__ack_path(path)
+        with open(ack + '.tmp', 'w') as file:
+            file.write(str(offset))
+        os.replace(ack + '.tmp', ack)
+
+    def __acquire_replay(self) -> bool:
+        """
+        Make sure only one process replays the spool at a time
+        """
+        lock = os.path.join(self.directory, LOCK_NAME)
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                with open(lock, 'r') as file:
+                    owner = int(file.read() or 0)
+            except (FileNotFoundError, ValueError):
+                owner = 0
+            if owner == os.getpid():
+                return True
+            if owner and _pid_alive(owner):
+                return False
+            # The owner is gone, take the lock over
+            with open(lock, 'w') as file:
+                file.write(str(os.getpid()))
+            return True
+        with os.fdopen(fd, 'w') as file:
+            file.write(str(os.getpid()))
+        return True
+
+    def replay(self, send: typing.Callable[[dict], typing.Any]) -> int:
+        """
+        Send every spooled record in order. Replay stops at the first record that fails to send and resumes from it
+         next time
+
+        :param send: Called with each record, must raise if the record was not delivered
+        :return: The number of records sent, 0 if another thread or process is already replaying
+        """
+        lock = _replay_lock(self.directory)
+        if not lock.acquire(blocking=False):
+            return 0
+        try:
+            if not self.__acquire_replay():
+                return 0
+            return self.__replay(send)
+        finally:
+            lock.release()
+
+    def __replay(self, send: typing.Callable[[dict], typing.Any]) -> int:
+        self.appended.clear()
+
+        sent = 0
+        for name in self.__segments():
+            path = os.path.join(self.directory, name)
+            offset = self.__read_ack(path)
+            try:
+                file = open(path, 'rb')
+            except FileNotFoundError:
+                continue
+            with file:
+                file.seek(offset)
+                for line in iter(file.readline, b''):
+                    if not line.endswith(b'\n'):
+                        # Still being written, or torn by a crash
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        record = None
+                    if record is not None:
+                        send(record)
+                        sent += 1
+                        self.replayed += 1
+                    offset += len(line)
+                    self.__write_ack(path, offset)
+            self.compact()
+
+        # Anything appended while replaying will be picked up on the next pass
+        if not self.appended.is_set():
+            self.__pending = False
+        return sent
+
+    def compact(self):
+        """
+        Delete segments which are complete and have been fully replayed
+        """
+        for name in self.__segments():
+            if not name.endswith(CLOSED_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if self.__read_ack(path) >= os.path.getsize(path):
+                    os.remove(path)
+                    os.remove(self.__ack_path(path))
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        """
+        Close this process's segment and give up the replay lock if this process holds it
+        """
+        with self.__lock:
+            self.__close_segment()
+
+        lock = os.path.join(self.directory, LOCK_NAME)
+        try:
+            with open(lock, 'r') as file:
+                owner = int(file.read() or 0)
+            if owner == os.getpid():
+                os.remove(lock)
+        except (FileNotFoundError, ValueError):
+            pass
+
+
+class SpoolReplayer:
+    def __init__(self, spool: Spool, send: typing.Callable[[dict], typing.Any], retry_interval: float = 5):
+        """
+        Drain a spool on a daemon thread, retrying after retry_interval seconds whenever a send fails
+
+        :param spool: The spool to drain
+        :param send: Called with each record, must raise if the record was not delivered
+        :param retry_interval: The number of seconds to wait after a failure or when the spool is empty
+        """
+        self.__spool = spool
+        self.__send = send
+        self.__retry_interval = retry_interval
+        self.__stopped = threading.Event()
+        self.__thread = None
+        self.last_error = None
+
+    def start(self) -> 'SpoolReplayer':
+        if self.__thread is None or not self.__thread.is_alive():
+            self.__stopped.clear()
+            self.__thread = threading.Thread(target=self.__run, name='slate-spool-replayer', daemon=True)
+            self.__thread.start()
+        return self
+
+    def __run(self):
+        while not self.__stopped.is_set():
+            try:
+                self.__spool.replay(self.__send)
+                self.last_error = None
+                # Nothing left, wait for something to be spooled
+                self.__spool.appended.wait(self.__retry_interval)
+            except Exception as e:
+                self.last_error = e
+                self.__stopped.wait(self.__retry_interval)
+
+    def stop(self, timeout: float = None):
+        self.__stopped.set()
+        self.__spool.appended.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout)
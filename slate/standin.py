@@ -0,0 +1,351 @@
+"""
+A local stand-in for the events service, for pointing slate at during tests and load tests
+
+    python -m slate.standin serve --port 8080 --latency 0.02 --error-rate 0.01 --record journal.jsonl
+    SLATE_API_URL=http://127.0.0.1:8080 python my_model.py
+    python -m slate.standin replay journal.jsonl --target http://127.0.0.1:8080 --rate 500 --concurrency 8
+"""
+import argparse
+import base64
+import gzip
+import json
+import random
+import threading
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Every route the events service accepts a POST on
+ROUTES = frozenset([
+    '/log',
+    '/v1/batch',
+    '/v1/live/event',
+    '/v1/live/set-pnl',
+    '/v1/live/append-pnl',
+    '/v1/live/set-custom-metric',
+    '/v1/live/auto-pnl',
+    '/v1/live/spot-market',
+    '/v1/live/spot-limit',
+    '/v1/live/spot-stop',
+    '/v1/live/update-trade',
+    '/v1/live/update-annotation',
+    '/v1/live/screener-result',
+    '/v1/live/log',
+    '/v1/live/log-batch',
+    '/v1/model/lifecycle',
+    '/v1/model/used-symbol',
+    '/v1/model/used-symbols',
+    '/v1/model/used-exchange',
+    '/v1/backtest/result',
+    '/v1/backtest/result-chunk',
+    '/v1/backtest/status',
+])
+
+# Headers kept in the journal. Credentials are left out so journals can be shared
+JOURNAL_HEADERS = ('Content-Type', 'Content-Encoding', 'Idempotency-Key', 'time', 'model_id')
+
+
+class StandInServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0, jitter: float = 0,
+                 error_rate: float = 0, error_status: int = 503, journal: str = None, seed: int = None):
+        """
+        A local stand-in for the events service. Every known route answers with an empty body and the batch route
+         answers with one empty result per event. Point an API at it with Slate(api_url=server.url) or by setting
+         the SLATE_API_URL environment variable
+
+        :param host: The interface to listen on
+        :param port: The port to listen on, 0 picks a free port
+        :param latency: The number of seconds added to every response
+        :param jitter: A random number of seconds up to this is added on top of latency
+        :param error_rate: The fraction of requests answered with error_status instead of succeeding
+        :param error_status: The status code of injected failures
+        :param journal: Append every request to this file as a JSON line so it can be replayed later
+        :param seed: Seed the jitter and error injection so runs are repeatable
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+        self.requests = 0
+        self.events = 0
+        self.errors = 0
+        self.bytes_received = 0
+        self.bytes_on_wire = 0
+        self.__lock = threading.Lock()
+        self.__random = random.Random(seed)
+        self.__journal = open(journal, 'a') if journal is not None else None
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive so that clients can reuse their pooled connections
+            protocol_version = 'HTTP/1.1'
+            # The headers and body of a response are written separately, without this every response waits on the
+            #  client's delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, format_, *args):
+                pass
+
+            def do_GET(self):
+                self.__respond(200, {})
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_POST(self):
+                raw = self.__read_body()
+                route = self.path.split('?')[0]
+                if route not in ROUTES:
+                    self.__respond(404, {'error': f'Unknown route {route}'})
+                    return
+
+                delay, fail = server.inject()
+                if server.journal_enabled:
+                    server.write_journal(self.command, self.path, self.headers, raw)
+                if delay:
+                    time.sleep(delay)
+                if fail:
+                    self.__respond(server.error_status, {'error': 'Injected failure'})
+                    return
+
+                body = self.__decode(raw)
+                events = 1
+                response = {}
+                if route == '/v1/batch':
+                    events = len(json.loads(body)['events'])
+                    response = {'results': [{} for _ in range(events)]}
+                server.record(len(body), events, wire_size=len(raw))
+                self.__respond(200, response)
+
+            def __read_body(self) -> bytes:
+                if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+                    chunks = []
+                    while True:
+                        size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                        if size == 0:
+                            self.rfile.readline()
+                            break
+                        chunks.append(self.rfile.read(size))
+                        self.rfile.readline()
+                    body = b''.join(chunks)
+                else:
+                    body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                return body
+
+            def __decode(self, body: bytes) -> bytes:
+                encoding = self.headers.get('Content-Encoding')
+                if encoding == 'gzip':
+                    return gzip.decompress(body)
+                elif encoding == 'zstd':
+                    import zstandard
+                    return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+                return body
+
+            def __respond(self, status: int, body: dict):
+                encoded = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+        self.__server = ThreadingHTTPServer((host, port), Handler)
+        self.__server.daemon_threads = True
+        self.__thread = None
+
+    def inject(self) -> typing.Tuple[float, bool]:
+        """
+        Decide the artificial delay of a request and whether it fails
+
+        :return: The delay in seconds and True if the request should fail
+        """
+        with self.__lock:
+            delay = self.latency + (self.__random.uniform(0, self.jitter) if self.jitter else 0)
+            fail = self.error_rate > 0 and self.__random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return delay, fail
+
+    @property
+    def journal_enabled(self) -> bool:
+        return self.__journal is not None
+
+    def write_journal(self, method: str, path: str, headers, body: bytes):
+        """
+        Append a request to the journal exactly as it arrived
+        """
+        entry = json.dumps({
+            'time': time.time(),
+            'method': method,
+            'path': path,
+            'headers': {name: headers[name] for name in JOURNAL_HEADERS if name in headers},
+            'body': base64.b64encode(body).decode()
+        })
+        with self.__lock:
+            self.__journal.write(entry + '\n')
+            self.__journal.flush()
+
+    def record(self, size: int, events: int, wire_size: int = None):
+        """
+        Count a received request
+
+        :param size: The size of the decompressed request body in bytes
+        :param events: The number of events in the request
+        :param wire_size: The size of the body as it was sent, before decompression
+        """
+        with self.__lock:
+            self.requests += 1
+            self.events += events
+            self.bytes_received += size
+            self.bytes_on_wire += size if wire_size is None else wire_size
+
+    @property
+    def url(self) -> str:
+        host, port = self.__server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'StandInServer':
+        """
+        Serve requests on a daemon thread
+
+        :return: This server
+        """
+        self.__thread = threading.Thread(target=self.__server.serve_forever, name='slate-standin', daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving and release the port
+        """
+        self.__server.shutdown()
+        self.__server.server_close()
+        if self.__journal is not None:
+            self.__journal.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def read_journal(path: str) -> typing.List[dict]:
+    """
+    Load the requests recorded by a StandInServer
+    """
+    with open(path, 'r') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def replay(journal: typing.List[dict], target: str, rate: float = None, concurrency: int = 8,
+           repeat: int = 1, headers: dict = None) -> dict:
+    """
+    Fire recorded requests at a target in their original order to measure the throughput it sustains
+
+    :param journal: The entries returned by read_journal
+    :param target: The base url like http://127.0.0.1:8080
+    :param rate: The number of requests started per second, None sends as fast as the workers allow
+    :param concurrency: The number of requests in flight at once
+    :param repeat: The number of times to go through the journal
+    :param headers: Extra headers for every request such as credentials
+    :return: The number of requests sent and failed, the duration, the achieved rate and latency percentiles
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    from slate.telemetry import LatencyHistogram
+
+    session = requests.Session()
+    session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=concurrency))
+    session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=concurrency))
+    latency = LatencyHistogram()
+    lock = threading.Lock()
+    failed = [0]
+    entries = [entry for _ in range(repeat) for entry in journal]
+
+    def send(entry: dict):
+        started = time.perf_counter()
+        try:
+            response = session.request(entry['method'], target.rstrip('/') + entry['path'],
+                                       headers={**entry['headers'], **(headers or {})},
+                                       data=base64.b64decode(entry['body']), timeout=30)
+            ok = response.status_code < 400
+        except requests.exceptions.RequestException:
+            ok = False
+        with lock:
+            latency.record(time.perf_counter() - started)
+            if not ok:
+                failed[0] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='slate-replay') as executor:
+        for i, entry in enumerate(entries):
+            if rate:
+                # Pace against the start time so that a slow submit doesn't lower the rate for the rest of the run
+                wait = started + i / rate - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+            executor.submit(send, entry)
+    duration = time.perf_counter() - started
+    session.close()
+
+    return {
+        'sent': len(entries),
+        'failed': failed[0],
+        'duration': duration,
+        'rate': len(entries) / duration if duration else None,
+        'latency_p50': latency.percentile(0.5),
+        'latency_p95': latency.percentile(0.95),
+        'latency_p99': latency.percentile(0.99)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m slate.standin',
+                                     description='A local stand-in for the slate events service')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help='Serve the events routes locally')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8080)
+    serve.add_argument('--latency', type=float, default=0, help='Seconds added to every response')
+    serve.add_argument('--jitter', type=float, default=0, help='Up to this many random seconds added on top')
+    serve.add_argument('--error-rate', type=float, default=0, help='The fraction of requests which fail')
+    serve.add_argument('--error-status', type=int, default=503, help='The status code of failed requests')
+    serve.add_argument('--record', help='Journal every request to this file')
+    serve.add_argument('--seed', type=int, help='Seed the latency and error injection')
+
+    replay_ = commands.add_parser('replay', help='Send a recorded journal to a server')
+    replay_.add_argument('journal')
+    replay_.add_argument('--target', required=True, help='The base url like http://127.0.0.1:8080')
+    replay_.add_argument('--rate', type=float, help='Requests per second, defaults to as fast as possible')
+    replay_.add_argument('--concurrency', type=int, default=8, help='The number of requests in flight at once')
+    replay_.add_argument('--repeat', type=int, default=1, help='The number of passes through the journal')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        server = StandInServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                               error_rate=args.error_rate, error_status=args.error_status, journal=args.record,
+                               seed=args.seed)
+        print(f'Serving the slate events routes at {server.url}, set SLATE_API_URL={server.url} to use it')
+        server.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.stop()
+            print(f'Received {server.requests} requests with {server.events} events, injected {server.errors} '
+                  f'failures')
+    else:
+        print(json.dumps(replay(read_journal(args.journal), args.target, rate=args.rate,
+                                concurrency=args.concurrency, repeat=args.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
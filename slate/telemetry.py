@@ -0,0 +1,217 @@
+import bisect
+import json
+import logging
+import threading
+import typing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds in seconds of the latency buckets, roughly doubling from 1ms to 1 minute
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class LatencyHistogram:
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        """
+        A fixed bucket histogram. Recording is a binary search and an increment so it can sit on every request
+        """
+        self.buckets = buckets
+        # The final count is for anything slower than the largest bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def percentile(self, q: float) -> typing.Optional[float]:
+        """
+        Estimate a percentile by interpolating inside the bucket it falls in
+
+        :param q: The percentile between 0 and 1 like 0.95
+        :return: The estimated latency in seconds, or None if nothing was recorded
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency = LatencyHistogram()
+
+    def to_dict(self) -> dict:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'latency_p50': self.latency.percentile(0.5),
+            'latency_p95': self.latency.percentile(0.95),
+            'latency_p99': self.latency.percentile(0.99),
+            'latency_mean': self.latency.sum / self.latency.count if self.latency.count else None
+        }
+
+
+class Telemetry:
+    def __init__(self):
+        """
+        Per-route request statistics collected by the API
+        """
+        self.__lock = threading.Lock()
+        self.__routes = {}
+
+    def record(self, route: str, seconds: float, bytes_sent: int = 0, bytes_received: int = 0, error: bool = False,
+               retries: int = 0):
+        """
+        Record a finished request including all of its retries
+
+        :param route: The route like /v1/live/event
+        :param seconds: The time from the first attempt to the final response or error
+        :param bytes_sent: The size of the request bodies sent across all attempts
+        :param bytes_received: The size of the final response body
+        :param error: If the request failed or ended with an error status
+        :param retries: The number of attempts after the first
+        """
+        with self.__lock:
+            stats = self.__routes.get(route)
+            if stats is None:
+                stats = self.__routes[route] = RouteStats()
+            stats.requests += 1
+            stats.errors += error
+            stats.retries += retries
+            stats.bytes_sent += bytes_sent
+            stats.bytes_received += bytes_received
+            stats.latency.record(seconds)
+
+    def snapshot(self) -> dict:
+        """
+        The statistics of every route
+
+        :return: A dictionary like {'/v1/live/event': {'requests': 10, 'latency_p50': 0.02, ...}}
+        """
+        with self.__lock:
+            return {route: stats.to_dict() for route, stats in self.__routes.items()}
+
+    def prometheus(self, gauges: dict = None) -> str:
+        """
+        Render the statistics in the Prometheus text exposition format
+
+        :param gauges: Extra values like queue depths, {'queue_depth': {'pipeline': 3}} becomes
+         slate_queue_depth{name="pipeline"} 3
+        :return: str
+        """
+        with self.__lock:
+            routes = list(self.__routes.items())
+            lines = []
+            for name, kind, help_, value in (
+                    ('slate_requests_total', 'counter', 'Requests sent', lambda s: s.requests),
+                    ('slate_request_errors_total', 'counter', 'Requests which failed', lambda s: s.errors),
+                    ('slate_request_retries_total', 'counter', 'Retried attempts', lambda s: s.retries),
+                    ('slate_request_bytes_total', 'counter', 'Request body bytes', lambda s: s.bytes_sent),
+                    ('slate_response_bytes_total', 'counter', 'Response body bytes', lambda s: s.bytes_received)):
+                lines.append(f'# HELP {name} {help_}')
+                lines.append(f'# TYPE {name} {kind}')
+                lines.extend(f'{name}{{route="{route}"}} {value(stats)}' for route, stats in routes)
+
+            lines.append('# HELP slate_request_duration_seconds Request latency including retries')
+            lines.append('# TYPE slate_request_duration_seconds histogram')
+            for route, stats in routes:
+                cumulative = 0
+                for bound, count in zip(stats.latency.buckets, stats.latency.counts):
+                    cumulative += count
+                    lines.append(f'slate_request_duration_seconds_bucket{{route="{route}",le="{bound}"}} '
+                                 f'{cumulative}')
+                lines.append(f'slate_request_duration_seconds_bucket{{route="{route}",le="+Inf"}} '
+                             f'{stats.latency.count}')
+                lines.append(f'slate_request_duration_seconds_sum{{route="{route}"}} {stats.latency.sum}')
+                lines.append(f'slate_request_duration_seconds_count{{route="{route}"}} {stats.latency.count}')
+
+        for gauge, values in (gauges or {}).items():
+            lines.append(f'# TYPE slate_{gauge} gauge')
+            lines.extend(f'slate_{gauge}{{name="{name}"}} {value}' for name, value in values.items())
+        return '\n'.join(lines) + '\n'
+
+
+class PrometheusExporter:
+    def __init__(self, render: typing.Callable[[], str], host: str = '127.0.0.1', port: int = 9464):
+        """
+        Serve metrics in the Prometheus text format at /metrics from a daemon thread
+
+        :param render: Produces the metrics text on every scrape
+        :param host: The interface to listen on
+        :param port: The port to listen on, 0 picks a free port
+        """
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format_, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.__server = ThreadingHTTPServer((host, port), Handler)
+        self.__server.daemon_threads = True
+        self.__thread = threading.Thread(target=self.__server.serve_forever, name='slate-metrics', daemon=True)
+        self.__thread.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self.__server.server_address[:2]
+        return f'http://{host}:{port}/metrics'
+
+    def stop(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+
+
+class StatsLogger:
+    def __init__(self, stats: typing.Callable[[], dict], interval: float = 60, logger: logging.Logger = None,
+                 level: int = logging.INFO):
+        """
+        Log a JSON dump of the stats every interval seconds from a daemon thread
+
+        :param stats: Produces the stats to log
+        :param interval: The number of seconds between dumps
+        :param logger: Where to log, defaults to the 'slate' logger
+        :param level: The level the dumps are logged at
+        """
+        self.__stats = stats
+        self.__interval = interval
+        self.__logger = logger or logging.getLogger('slate')
+        self.__level = level
+        self.__stopped = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, name='slate-stats-logger', daemon=True)
+        self.__thread.start()
+
+    def __run(self):
+        while not self.__stopped.wait(self.__interval):
+            try:
+                self.__logger.log(self.__level, 'slate stats %s', json.dumps(self.__stats(), default=str))
+            except Exception:
+                self.__logger.exception('Failed to collect slate stats')
+
+    def stop(self):
+        self.__stopped.set()
@@ -0,0 +1,281 @@
+import collections
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+import typing
+import uuid
+
+REQUEST = 'request'
+SPAN = 'span'
+
+OK = 'ok'
+ERROR = 'error'
+
+# Context variables are separate for every thread and every asyncio task, so concurrent calls don't adopt each other
+_current = contextvars.ContextVar('slate_call', default=None)
+
+
+class CallInfo:
+    def __init__(self, name: str, kind: str = REQUEST, route: str = None, method: str = None,
+                 attributes: dict = None):
+        """
+        What hooks are told about a request, or about a named span of work such as encoding a backtest result.
+         Spans opened on the same thread or asyncio task nest, so a request made inside a span has it as its parent
+
+        :param name: 'POST /v1/live/event' for requests or the span name
+        :param kind: 'request' or 'span'
+        :param route: The route of a request
+        :param method: The HTTP method of a request
+        :param attributes: Anything else worth recording
+        """
+        self.name = name
+        self.kind = kind
+        self.route = route
+        self.method = method
+        self.attributes = attributes or {}
+
+        self.id = uuid.uuid4().hex[:16]
+        self.parent = _current.get()
+        self.trace_id = self.parent.trace_id if self.parent is not None else uuid.uuid4().hex
+        self.thread_id = threading.get_ident()
+        self.started = time.time()
+        self.__started = time.perf_counter()
+
+        self.duration = None
+        self.payload_size = 0
+        self.serialization_time = 0
+        self.network_time = 0
+        self.attempts = 0
+        self.status_code = None
+        self.outcome = None
+        self.error = None
+
+    def enter(self):
+        """
+        Make this the parent of calls started on this thread or task
+        """
+        _current.set(self)
+
+    def exit(self, error: BaseException = None):
+        """
+        Finish the call and restore its parent
+        """
+        self.duration = time.perf_counter() - self.__started
+        self.error = error
+        if self.outcome is None:
+            self.outcome = ERROR if error is not None or (self.status_code or 0) >= 400 else OK
+        _current.set(self.parent)
+
+
+class Hook:
+    """
+    Receives every call made by an API. Override any of the methods, they are called on the thread making the call
+     so they should be quick
+    """
+
+    def before_request(self, call: CallInfo):
+        pass
+
+    def after_response(self, call: CallInfo):
+        pass
+
+    def on_error(self, call: CallInfo):
+        pass
+
+
+class Traced:
+    """
+    Hooks and spans for an API client. The client reports each request with _start_request and _finish_request
+    """
+
+    # Replaced rather than appended to so that a call iterating the hooks never sees the list change
+    _hooks = []
+
+    def add_hook(self, hook: Hook):
+        """
+        Call a hook around every request and span. Hooks get the route, payload size, serialization and network time
+         and the outcome of each call, see slate.tracing for ready-made span and Chrome trace hooks
+
+        :param hook: An object with any of before_request, after_response and on_error
+        :return: None
+        """
+        self._hooks = self._hooks + [hook]
+
+    def remove_hook(self, hook: Hook):
+        self._hooks = [existing for existing in self._hooks if existing is not hook]
+
+    def _hook_failed(self, error: Exception):
+        """
+        Called when a hook raises. A broken hook must never break reporting, so the error goes no further
+        """
+
+    def _notify(self, event: str, call: CallInfo):
+        for hook in self._hooks:
+            method = getattr(hook, event, None)
+            if method is None:
+                continue
+            try:
+                method(call)
+            except Exception as e:
+                self._hook_failed(e)
+
+    def __start(self, call: CallInfo) -> CallInfo:
+        self._notify('before_request', call)
+        call.enter()
+        return call
+
+    def __finish(self, call: CallInfo, error: BaseException = None):
+        call.exit(error)
+        self._notify('on_error' if call.outcome == ERROR else 'after_response', call)
+
+    def _start_request(self, method: str, route: str) -> typing.Optional[CallInfo]:
+        """
+        Tell the hooks a request is starting
+
+        :return: The call to fill in and pass to _finish_request, None if there are no hooks
+        """
+        if not self._hooks:
+            return None
+        return self.__start(CallInfo(f'{method.upper()} {route}', route=route, method=method))
+
+    def _finish_request(self, call: CallInfo, error: BaseException = None):
+        """
+        Tell the hooks a request finished, after filling in its status code, sizes and timings
+        """
+        self.__finish(call, error)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Report a named piece of work to the hooks. Requests made inside it on the same thread or asyncio task become
+         its children
+
+        :param name: A name like 'backtest.result'
+        :param attributes: Anything else worth recording
+        """
+        if not self._hooks:
+            yield None
+            return
+        call = self.__start(CallInfo(name, kind=SPAN, attributes=attributes))
+        error = None
+        try:
+            yield call
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.__finish(call, error)
+
+
+class SpanHook(Hook):
+    def __init__(self, export: typing.Callable[[dict], typing.Any] = None, max_spans: int = 10000):
+        """
+        Turn calls into spans shaped like OpenTelemetry's JSON span representation so they can be forwarded to a
+         collector
+
+        :param export: Called with each finished span, by default spans are kept in self.spans
+        :param max_spans: The number of spans kept when no export function is given
+        """
+        self.__export = export
+        self.spans = collections.deque(maxlen=max_spans)
+
+    @staticmethod
+    def to_span(call: CallInfo) -> dict:
+        attributes = {
+            'slate.kind': call.kind,
+            'slate.payload_size': call.payload_size,
+            'slate.serialization_time': call.serialization_time,
+            'slate.network_time': call.network_time,
+            **call.attributes
+        }
+        if call.kind == REQUEST:
+            attributes.update({
+                'http.method': call.method.upper(),
+                'http.route': call.route,
+                'http.status_code': call.status_code,
+                'slate.attempts': call.attempts
+            })
+        start = int(call.started * 1e9)
+        return {
+            'name': call.name,
+            'trace_id': call.trace_id,
+            'span_id': call.id,
+            'parent_span_id': call.parent.id if call.parent is not None else None,
+            'kind': 'SPAN_KIND_CLIENT' if call.kind == REQUEST else 'SPAN_KIND_INTERNAL',
+            'start_time_unix_nano': start,
+            'end_time_unix_nano': start + int(call.duration * 1e9),
+            'attributes': attributes,
+            'status': {
+                'code': 'STATUS_CODE_OK' if call.outcome == OK else 'STATUS_CODE_ERROR',
+                'message': '' if call.error is None else repr(call.error)
+            }
+        }
+
+    def __finish(self, call: CallInfo):
+        span = self.to_span(call)
+        if self.__export is not None:
+            self.__export(span)
+        else:
+            self.spans.append(span)
+
+    def after_response(self, call: CallInfo):
+        self.__finish(call)
+
+    def on_error(self, call: CallInfo):
+        self.__finish(call)
+
+
+class ChromeTraceHook(Hook):
+    def __init__(self, path: str):
+        """
+        Record calls as Chrome trace events. Open the file written by save in chrome://tracing or Perfetto to see
+         nested spans per thread, with the serialization and network share of each request in its arguments
+
+        :param path: Where save writes the trace
+        """
+        self.path = path
+        self.__lock = threading.Lock()
+        self.events = []
+
+    def __finish(self, call: CallInfo):
+        event = {
+            'name': call.name,
+            'cat': call.kind,
+            'ph': 'X',
+            'ts': call.started * 1e6,
+            'dur': call.duration * 1e6,
+            'pid': os.getpid(),
+            'tid': call.thread_id,
+            'args': {
+                'outcome': call.outcome,
+                'status_code': call.status_code,
+                'payload_size': call.payload_size,
+                'serialization_ms': call.serialization_time * 1e3,
+                'network_ms': call.network_time * 1e3,
+                'attempts': call.attempts,
+                'error': None if call.error is None else repr(call.error),
+                **call.attributes
+            }
+        }
+        with self.__lock:
+            self.events.append(event)
+
+    def after_response(self, call: CallInfo):
+        self.__finish(call)
+
+    def on_error(self, call: CallInfo):
+        self.__finish(call)
+
+    def save(self, path: str = None):
+        """
+        Write the trace events recorded so far as JSON
+
+        :param path: Override the path given on construction
+        """
+        with self.__lock:
+            events = list(self.events)
+        with open(path or self.path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file, default=str)
@@ -0,0 +1,95 @@
+import multiprocessing
+import typing
+
+import slate.utils as utils
+from slate.api import API, UNAVAILABLE_ERRORS
+from slate.exceptions import APIException
+from slate.resilience import RetryPolicy
+
+
+def _upload(directory: str, stop, poll_interval: float, model_id: typing.Optional[str], api_url: str,
+            pool_size: int, timeout: float, max_retries: int):
+    """
+    The body of the uploader process. This is module level so that it works with every multiprocessing start method
+    """
+    loaded_model_id, api_key, api_pass = utils.load_auth()
+    api = API(model_id or loaded_model_id, api_key, api_pass, pool_size=pool_size, api_url=api_url,
+              timeout=timeout, retry=RetryPolicy(max_attempts=max_retries + 1))
+    # The uploader only drains, it never posts anything of its own
+    api.enable_spool(directory, spool_only=True)
+
+    stopping = False
+    while True:
+        try:
+            api.drain_spool()
+        except (APIException, *UNAVAILABLE_ERRORS):
+            # The failed event stays in the spool and is retried on the next pass
+            if stopping:
+                break
+        if stopping:
+            break
+        # One last pass once asked to stop picks up anything the workers wrote at the end
+        stopping = stop.wait(poll_interval)
+    api.close()
+
+
+class Uploader:
+    def __init__(self, spool_dir: str, model_id: str = None, poll_interval: float = 0.5, api_url: str = None,
+                 pool_size: int = 10, timeout: float = 30, max_retries: int = 2):
+        """
+        A single process which sends the events written by many worker processes. Workers construct
+         Slate(spool_dir=spool_dir, spool_only=True) so that reporting is only a local file append, and the uploader
+         replays their spool segments in order over its own connection pool. The number of connections to the events
+         service stays the same however many workers there are
+
+        :param spool_dir: The spool folder shared with the workers
+        :param model_id: The model id to send events for when a record doesn't carry its own, defaults to the one loaded
+         with the credentials. Records spooled by Slate keep the model id they were posted for
+        :param poll_interval: The number of seconds between checks for new events
+        :param api_url: Override the events service url, for example to point at a local stand-in server
+        :param pool_size: The number of keep-alive connections held open by the uploader
+        :param timeout: The number of seconds to wait on the events service before giving up on an attempt
+        :param max_retries: The number of times a failed request is retried before waiting for the next poll
+        """
+        self.__stop = multiprocessing.Event()
+        self.__process = multiprocessing.Process(
+            target=_upload,
+            args=(spool_dir, self.__stop, poll_interval, model_id, api_url, pool_size, timeout, max_retries),
+            name='slate-uploader',
+            daemon=True
+        )
+
+    @property
+    def pid(self) -> typing.Optional[int]:
+        return self.__process.pid
+
+    def start(self) -> 'Uploader':
+        """
+        Start the uploader process
+
+        :return: This uploader
+        """
+        self.__process.start()
+        return self
+
+    def stop(self, timeout: float = None) -> bool:
+        """
+        Send everything the workers have spooled and stop. Call this once the workers have finished
+
+        :param timeout: The maximum number of seconds to wait, None waits forever. The process is terminated if it
+         is still running after the timeout and its unsent events stay in the spool for the next uploader
+        :return: True if the uploader finished on its own
+        """
+        self.__stop.set()
+        self.__process.join(timeout)
+        if self.__process.is_alive():
+            self.__process.terminate()
+            self.__process.join()
+            return False
+        return True
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -1,5 +1,11 @@
+import atexit
+import itertools
 import json
 import os
+import sys
+import threading
+import typing
+import weakref
 
 
 def load_auth():
@@ -29,6 +35,16 @@ def load_auth():
         return model, api_key, api_pass
 
 
+def get_api_url(api_url: str = None) -> str:
+    """
+    Choose the events service url: an explicit url first, then the SLATE_API_URL environment variable, then the
+     hosted service. Setting the variable points an unmodified model at a local stand-in server
+
+    :param api_url: The url passed to the API, if any
+    """
+    return api_url or os.getenv('SLATE_API_URL') or 'https://events.blankly.finance'
+
+
 def assemble_base(base_route: str, route: str) -> str:
     """
     Simple utility to append two route strings
@@ -40,3 +56,138 @@ def assemble_base(base_route: str, route: str) -> str:
     TODO this can validate that it is a valid path
     """
     return base_route + route
+
+
+def form_fields(data: dict) -> list:
+    """
+    Flatten a request body into the (key, value) pairs sent as form fields. This matches how requests encodes a data
+     dictionary: None values are skipped and iterable values are expanded into repeated keys
+
+    :param data: The body dictionary
+    :return: A list of (key, str) tuples
+    """
+    fields = []
+    for key, values in data.items():
+        if isinstance(values, (str, bytes)) or not hasattr(values, '__iter__'):
+            values = [values]
+        for value in values:
+            if value is None:
+                continue
+            if not isinstance(value, (str, bytes)):
+                value = str(value)
+            fields.append((key, value))
+    return fields
+
+
+def get_data_dir() -> str:
+    """
+    The folder where slate keeps local state such as upload manifests. This is created if it doesn't exist
+
+    # linux: ~/.local/share/blankly/slate
+    # macOS: ~/Library/Application Support/blankly/slate
+    # windows: C:/Users/<USER>/AppData/Roaming/blankly/slate
+    """
+    home = os.path.expanduser('~')
+    if sys.platform == 'win32':
+        base = os.path.join(home, 'AppData', 'Roaming')
+    elif sys.platform == 'darwin':
+        base = os.path.join(home, 'Library', 'Application Support')
+    elif sys.platform.startswith('linux'):
+        base = os.path.join(home, '.local', 'share')
+    else:
+        base = home
+    path = os.path.join(base, 'blankly', 'slate')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class BackgroundThread:
+    def __init__(self, target: typing.Callable[[], typing.Any], name: str):
+        """
+        A daemon thread which is started on first use, and started again in a process forked from the one that
+         started it since the fork only copies the calling thread
+
+        :param target: The function run on the thread
+        :param name: The name of the thread
+        """
+        self.__target = target
+        self.__name = name
+        self.__thread = None
+        self.__pid = None
+
+    def ensure(self):
+        """
+        Start the thread if it isn't running in this process
+        """
+        if self.__thread is None or self.__pid != os.getpid():
+            self.__thread = threading.Thread(target=self.__target, name=self.__name, daemon=True)
+            self.__pid = os.getpid()
+            self.__thread.start()
+
+    @property
+    def alive(self) -> bool:
+        """
+        True if the thread was started by this process and hasn't finished
+        """
+        return self.__thread is not None and self.__pid == os.getpid() and self.__thread.is_alive()
+
+    @property
+    def current(self) -> bool:
+        """
+        True when called on this thread
+        """
+        return self.__thread is not None and threading.current_thread() is self.__thread
+
+    def join(self, timeout: float = None):
+        """
+        Wait for the thread to finish. A thread belonging to the parent of a forked process is ignored
+        """
+        if self.__thread is not None and self.__pid == os.getpid():
+            self.__thread.join(timeout)
+
+
+# Objects to close when the interpreter exits, by registration order. Held weakly so that registering for exit doesn't
+#  keep every buffer and pipeline alive
+_exit_closers = {}
+_exit_order = itertools.count()
+_exit_lock = threading.Lock()
+
+
+def close_at_exit(owner, method: str = 'close', *args):
+    """
+    Call owner.method(*args) when the interpreter exits, unless owner has been garbage collected or forget_at_exit was
+     called first. The newest owners are closed first, so a buffer sends its last batch into a pipeline before the
+     pipeline created ahead of it shuts down
+
+    :param owner: The object to close
+    :param method: The name of the method to call
+    :param args: Passed to the method
+    """
+    key = next(_exit_order)
+
+    def forget(_):
+        with _exit_lock:
+            _exit_closers.pop(key, None)
+
+    with _exit_lock:
+        _exit_closers[key] = (weakref.ref(owner, forget), method, args)
+
+
+def forget_at_exit(owner):
+    """
+    Stop closing owner at exit, for when it has been closed already
+    """
+    with _exit_lock:
+        for key, (ref, _, _) in list(_exit_closers.items()):
+            if ref() is owner:
+                del _exit_closers[key]
+
+
+@atexit.register
+def _close_at_exit():
+    with _exit_lock:
+        closers = [closer for _, closer in sorted(_exit_closers.items(), reverse=True)]
+    for ref, method, args in closers:
+        owner = ref()
+        if owner is not None:
+            getattr(owner, method)(*args)
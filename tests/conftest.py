@@ -0,0 +1,20 @@
+import pytest
+
+from slate.standin import StandInServer
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """
+    A stand-in events service, with credentials in the environment and the working and home directories pointed at
+     a temporary folder so nothing is read from or written to the real ones
+    """
+    monkeypatch.chdir(tmp_path)
+    # Registered symbols and chunk manifests are kept in the data folder under the home directory
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('USERPROFILE', str(tmp_path))
+    monkeypatch.setenv('SLATE_MODEL_ID', 'model')
+    monkeypatch.setenv('SLATE_API_KEY', 'key')
+    monkeypatch.setenv('SLATE_API_PASS', 'pass')
+    with StandInServer() as server:
+        yield server
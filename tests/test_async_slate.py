@@ -0,0 +1,123 @@
+"""
+Every method of the AsyncSlate clients against a stand-in events service. The clients are shared with Slate, so this
+ catches methods which only work with the blocking API
+"""
+import asyncio
+import inspect
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from slate.aio import AsyncSlate
+from slate.backtest.backtest import Backtest
+from slate.live.live import Live
+from slate.model.model import Model
+from slate.tracing import SpanHook
+
+ACCOUNT_VALUES = [{'time': 1650000000 + i, 'value': 100 + i} for i in range(10)]
+TRADES = [{'time': 1650000000, 'symbol': 'BTC-USD', 'side': 'buy', 'size': 1, 'price': 100, 'id': 'a'}]
+
+# Awaited and expected to be acknowledged by the stand-in
+AWAITABLE = {
+    'live': [
+        ('event', ({'symbol': 'BTC-USD'}, {'id': 'a'}, 'custom'), {}),
+        ('log', ('started', 'stdout'), {}),
+        ('log_batch', ([{'line': 'started', 'type': 'stdout', 'time': 1650000000.0}],), {}),
+        ('screener_result', ({'BTC-USD': {'score': 1}},), {}),
+        ('set_auto_pnl', (True,), {}),
+        ('set_custom_metric', ('sharpe', 1.5, 'Sharpe'), {}),
+        ('set_pnl', ([{'time': 1650000000, 'value': 1}],), {}),
+        ('spot_limit', ('BTC-USD', 'coinbase', 'a', 'buy', 100), {'size': 1}),
+        ('spot_market', ('BTC-USD', 'coinbase', 'b', 'buy'), {'size': 1}),
+        ('spot_stop', ('BTC-USD', 'coinbase', 'c', 'sell', 90, 95), {'size': 1}),
+        ('update_annotation', ('a', 'note'), {}),
+        ('update_trade', ('a',), {'status': 'done'}),
+    ],
+    'model': [
+        ('add_symbol', ('BTC-USD',), {}),
+        ('add_symbols', (['ETH-USD', 'SOL-USD'],), {}),
+        ('set_exchange', ('coinbase',), {}),
+        ('set_lifecycle', ('running',), {'running': True}),
+    ],
+    'backtest': [
+        ('result', (['BTC-USD'], 'USD', 1650000000, 1650000010, ACCOUNT_VALUES, TRADES, 'coinbase'), {}),
+        ('status', (True, 'done', 'finished', 1.5, 'backtest'), {}),
+        ('log', ('started', 'stdout', 'backtest'), {}),
+    ],
+}
+
+# The buffered helpers send from background threads, which can't await the async API
+SYNC_ONLY = {
+    'live': [
+        ('append_pnl', (1650000000, 1), {}),
+        ('configure_pnl_stream', (), {}),
+        ('publish_metric', ('sharpe', 1.5, 'Sharpe'), {}),
+        ('configure_metric_publisher', (), {}),
+        ('log_handler', (), {}),
+        ('capture_output', (), {}),
+        ('configure_log_buffer', (), {}),
+    ],
+    'backtest': [
+        ('result', (['BTC-USD'], 'USD', 1650000000, 1650000010, ACCOUNT_VALUES, TRADES, 'coinbase'),
+         {'chunk_size': 5}),
+    ],
+}
+
+# Local bookkeeping which doesn't post anything
+LOCAL = {
+    'live': ['flush_pnl', 'flush_metrics', 'close'],
+    'model': ['clear_registered'],
+    'backtest': ['generate_new_backtest_id'],
+}
+
+CLIENTS = {'live': Live, 'model': Model, 'backtest': Backtest}
+
+
+@pytest.mark.parametrize('client', CLIENTS)
+def test_every_method_is_covered(client):
+    public = {name for name, _ in inspect.getmembers(CLIENTS[client], inspect.isfunction) if not name.startswith('_')}
+    covered = {call[0] for call in AWAITABLE.get(client, []) + SYNC_ONLY.get(client, [])} | set(LOCAL.get(client, []))
+    assert public == covered
+
+
+def test_awaitable_methods(server):
+    async def run():
+        async with AsyncSlate(api_url=server.url) as slate:
+            for client, calls in AWAITABLE.items():
+                for name, args, kwargs in calls:
+                    pending = getattr(getattr(slate, client), name)(*args, **kwargs)
+                    assert inspect.isawaitable(pending), f'{client}.{name}'
+                    response = await pending
+                    assert 'error' not in response, f'{client}.{name}: {response}'
+
+    asyncio.run(run())
+    assert server.requests == sum(len(calls) for calls in AWAITABLE.values())
+
+
+def test_sync_only_methods_raise(server):
+    async def run():
+        async with AsyncSlate(api_url=server.url) as slate:
+            for client, calls in SYNC_ONLY.items():
+                for name, args, kwargs in calls:
+                    with pytest.raises(TypeError):
+                        getattr(getattr(slate, client), name)(*args, **kwargs)
+            slate.live.flush_pnl()
+            slate.live.flush_metrics()
+
+    asyncio.run(run())
+    assert server.requests == 0
+
+
+def test_backtest_result_request_nests_in_its_span(server):
+    hook = SpanHook()
+
+    async def run():
+        async with AsyncSlate(api_url=server.url) as slate:
+            slate.add_hook(hook)
+            await slate.backtest.result(['BTC-USD'], 'USD', 1650000000, 1650000010, ACCOUNT_VALUES, TRADES,
+                                        'coinbase')
+
+    asyncio.run(run())
+    spans = {span['name']: span for span in hook.spans}
+    assert spans['POST /v1/backtest/result']['parent_span_id'] == spans['backtest.result']['span_id']
@@ -0,0 +1,54 @@
+"""
+Coalescing concurrent posts into multi-event requests
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from slate.batch import RequestBatcher
+from slate.slate import Slate
+
+
+def test_each_caller_gets_its_own_result():
+    batcher = RequestBatcher(lambda events: [event['value'] * 2 for event in events], window=0.05)
+    start = threading.Barrier(10)
+
+    def submit(value):
+        start.wait()
+        return batcher.submit({'value': value}, blocking=True).result(5)
+
+    with ThreadPoolExecutor(10) as executor:
+        results = list(executor.map(submit, range(10)))
+
+    assert results == [value * 2 for value in range(10)]
+    assert batcher.events == 10 and batcher.batches < 10
+
+
+def test_failed_batch_fails_every_caller():
+    def send_batch(events):
+        raise ConnectionError('unavailable')
+
+    batcher = RequestBatcher(send_batch, window=0.05)
+    futures = [batcher.submit({'value': value}) for value in range(3)]
+    for future in futures:
+        with pytest.raises(ConnectionError):
+            future.result(5)
+    assert batcher.errors == 1
+
+
+def test_concurrent_posts_share_requests(server):
+    slate = Slate(api_url=server.url, batch=True, batch_window=0.05)
+    start = threading.Barrier(10)
+
+    def log(index):
+        start.wait()
+        return slate.live.log(f'line {index}', 'stdout')
+
+    with ThreadPoolExecutor(10) as executor:
+        responses = list(executor.map(log, range(10)))
+    slate.close(5)
+
+    assert all('error' not in response for response in responses)
+    assert server.events == 10 and server.requests < 10
+    assert server.errors == 0
@@ -0,0 +1,22 @@
+"""
+Request body compression
+"""
+import gzip
+import os
+
+from slate.compression import Compressor, GZIP
+
+
+def test_compresses_repetitive_bodies():
+    compressor = Compressor(GZIP, threshold=0)
+    body = b'symbol=BTC-USD&side=buy&' * 100
+    compressed = compressor.compress(body)
+    assert gzip.decompress(compressed) == body
+    assert compressor.bytes_saved > 0
+
+
+def test_sends_bodies_which_dont_shrink_as_they_are():
+    compressor = Compressor(GZIP, threshold=0)
+    assert compressor.compress(b'symbol=BTC-USD&side=buy') is None
+    assert compressor.compress(os.urandom(4096)) is None
+    assert compressor.bytes_saved == 0
@@ -0,0 +1,13 @@
+"""
+The vectorized integration conversions against the row at a time references in benchmarks.equivalence
+"""
+import pytest
+
+pytest.importorskip('pandas')
+
+from benchmarks.equivalence import CHECKS
+
+
+@pytest.mark.parametrize('check', CHECKS)
+def test_conversion_matches_reference(check):
+    assert CHECKS[check]() == []
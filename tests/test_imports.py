@@ -0,0 +1,19 @@
+"""
+The import time budgets from benchmarks.imports. Set SLATE_IMPORT_BUDGET_SCALE to loosen them on a slow machine, the
+ modules a scenario must not import are checked regardless
+"""
+import os
+
+import pytest
+
+from benchmarks.imports import SCENARIOS, measure
+
+SCALE = float(os.environ.get('SLATE_IMPORT_BUDGET_SCALE', 1))
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS, ids=[scenario.name for scenario in SCENARIOS])
+def test_import_budget(scenario):
+    result = measure(scenario, runs=3)
+    assert 'error' not in result, result.get('error')
+    assert result['imported'] == []
+    assert result['time'] <= scenario.budget * SCALE
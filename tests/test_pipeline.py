@@ -0,0 +1,79 @@
+"""
+The background event pipeline and its backpressure policies
+"""
+import threading
+
+from slate.pipeline import EventPipeline, BLOCK, DROP_OLDEST, DROP_NEWEST
+from slate.slate import Slate
+
+
+class GatedSend:
+    """
+    A send function which holds the first event until the gate opens, so the queue fills up behind it
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.sending = threading.Event()
+        self.gate = threading.Event()
+
+    def __call__(self, event):
+        self.sending.set()
+        self.gate.wait(5)
+        self.sent.append(event)
+
+
+def fill(policy):
+    send = GatedSend()
+    pipeline = EventPipeline(send, max_size=2, policy=policy)
+    assert pipeline.submit(0)
+    assert send.sending.wait(5)
+    assert pipeline.submit('a') and pipeline.submit('b')
+    assert pipeline.depth == 2
+    return send, pipeline
+
+
+def test_drop_newest_rejects_the_new_event():
+    send, pipeline = fill(DROP_NEWEST)
+    assert not pipeline.submit('c')
+    send.gate.set()
+    assert pipeline.shutdown(5)
+    assert send.sent == [0, 'a', 'b']
+    assert pipeline.dropped == 1 and pipeline.sent == 3
+
+
+def test_drop_oldest_evicts_the_oldest_queued_event():
+    send, pipeline = fill(DROP_OLDEST)
+    assert pipeline.submit('c')
+    send.gate.set()
+    assert pipeline.shutdown(5)
+    assert send.sent == [0, 'b', 'c']
+    assert pipeline.dropped == 1 and pipeline.sent == 3
+
+
+def test_block_waits_for_room():
+    send, pipeline = fill(BLOCK)
+    submitted = threading.Event()
+
+    def submit():
+        pipeline.submit('c')
+        submitted.set()
+
+    thread = threading.Thread(target=submit)
+    thread.start()
+    assert not submitted.wait(0.1)
+
+    send.gate.set()
+    assert submitted.wait(5)
+    thread.join()
+    assert pipeline.shutdown(5)
+    assert send.sent == [0, 'a', 'b', 'c']
+    assert pipeline.dropped == 0
+
+
+def test_background_slate_delivers_every_event(server):
+    slate = Slate(api_url=server.url, background=True, queue_size=4, backpressure=BLOCK)
+    for i in range(20):
+        slate.live.log(f'line {i}', 'stdout')
+    slate.close(5)
+    assert server.requests == server.events == 20
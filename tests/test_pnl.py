@@ -0,0 +1,35 @@
+"""
+The PNL ring buffer and its resyncs
+"""
+import json
+import time
+
+from slate.live.pnl import PnlStream
+
+
+def test_resync_never_overwrites_with_an_evicted_buffer():
+    appended, overwritten = [], []
+    stream = PnlStream(lambda values: appended.extend(json.loads(values)) or {},
+                       lambda values: overwritten.append(json.loads(values)) or {},
+                       capacity=5, resync_interval=0)
+    for i in range(12):
+        stream.append(i, i)
+    stream.close()
+
+    assert max(len(values) for values in overwritten) <= 5
+    assert overwritten[-1][0]['time'] == 0
+    # Every point still reaches the platform exactly once, through set-pnl or append-pnl
+    assert sorted(point['time'] for point in appended + overwritten[-1]) == list(range(12))
+
+
+def test_points_held_back_are_sent_by_the_timer():
+    appended = []
+    stream = PnlStream(lambda values: appended.extend(json.loads(values)) or {}, lambda values: {},
+                       flush_interval=0.1, resync_interval=None)
+    for i in range(3):
+        stream.append(i, i)
+    deadline = time.monotonic() + 2
+    while len(appended) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [point['time'] for point in appended] == [0, 1, 2]
+    stream.close()
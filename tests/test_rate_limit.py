@@ -0,0 +1,20 @@
+"""
+The shared rate limiter in front of the events service
+"""
+import time
+
+from slate import Slate
+
+
+def test_background_posts_are_delayed_on_the_sender_thread(server):
+    slate = Slate(api_url=server.url, background=True, rate_limit=20, rate_burst=5)
+    started = time.perf_counter()
+    for i in range(15):
+        slate.live.spot_market('BTC-USD', 'coinbase', str(i), 'buy', size=1)
+    # The orders are over the burst, so the limiter delays them, but not in the trading loop
+    assert time.perf_counter() - started < 0.2
+
+    assert slate.flush(timeout=10)
+    assert server.requests == 15
+    assert time.perf_counter() - started >= 0.4
+    slate.close()
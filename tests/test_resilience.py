@@ -0,0 +1,51 @@
+"""
+Retries, backoff and the circuit breaker in front of the events service
+"""
+import collections
+import time
+
+import pytest
+
+from slate.api import API
+from slate.exceptions import CircuitOpenException
+from slate.resilience import CircuitBreaker, RetryPolicy, CLOSED, OPEN, HALF_OPEN
+from slate.standin import StandInServer, read_journal
+
+
+def test_breaker_opens_and_recovers_through_half_open():
+    with StandInServer(error_rate=1, error_status=503) as server:
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.2)
+        api = API('model', 'key', 'pass', api_url=server.url, retry=RetryPolicy(max_attempts=1), breaker=breaker)
+        for _ in range(3):
+            assert api.post('/v1/live/event', {}).status_code == 503
+        assert breaker.state == OPEN
+
+        # Short-circuited without reaching the service
+        with pytest.raises(CircuitOpenException):
+            api.post('/v1/live/event', {})
+        assert server.errors == 3 and server.requests == 0
+
+        time.sleep(0.25)
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        breaker.release()
+
+        server.error_rate = 0
+        assert api.post('/v1/live/event', {}).status_code == 200
+        assert breaker.state == CLOSED
+        api.close()
+
+
+def test_retries_reuse_the_idempotency_key(tmp_path):
+    journal = str(tmp_path / 'journal.jsonl')
+    with StandInServer(error_rate=0.5, error_status=503, journal=journal, seed=7) as server:
+        api = API('model', 'key', 'pass', api_url=server.url, retry=RetryPolicy(max_attempts=20, backoff=0.001),
+                  breaker=CircuitBreaker(failure_threshold=1000))
+        for i in range(10):
+            assert api.post('/v1/live/event', {'index': i}).status_code == 200
+        api.close()
+
+    attempts = collections.Counter(entry['headers']['Idempotency-Key'] for entry in read_journal(journal))
+    # One key per post however many attempts it took, and the injected failures were retried
+    assert len(attempts) == 10
+    assert sum(attempts.values()) == 10 + server.errors > 10
@@ -0,0 +1,68 @@
+"""
+The on-disk spool and its replay
+"""
+import base64
+import collections
+import socket
+import threading
+import time
+import urllib.parse
+
+from slate.api import API
+from slate.resilience import CircuitBreaker, RetryPolicy
+from slate.spool import Spool
+from slate.standin import StandInServer, read_journal
+
+
+def test_replays_in_order_after_an_outage(tmp_path):
+    # Take a free port and leave nothing listening on it, as if the service were down
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+
+    api = API('model', 'key', 'pass', api_url=f'http://127.0.0.1:{port}', retry=RetryPolicy(max_attempts=1),
+              breaker=CircuitBreaker(reset_timeout=0))
+    api.enable_spool(str(tmp_path / 'spool'), retry_interval=60)
+    for i in range(5):
+        assert api.post('/v1/live/event', {'index': i}) is None
+    assert api.spool.pending
+
+    journal = str(tmp_path / 'journal.jsonl')
+    with StandInServer(port=port, journal=journal):
+        api.drain_spool()
+        api.post('/v1/live/event', {'index': 5})
+    api.close()
+
+    entries = read_journal(journal)
+    keys = [entry['headers']['Idempotency-Key'] for entry in entries]
+    assert len(set(keys)) == len(keys) == 6
+    bodies = [urllib.parse.parse_qs(base64.b64decode(entry['body']).decode()) for entry in entries]
+    assert [int(body['index'][0]) for body in bodies] == list(range(6))
+
+
+def test_concurrent_replays_send_each_record_once(tmp_path):
+    spool = Spool(str(tmp_path))
+    for i in range(20):
+        spool.append({'index': i})
+
+    sent = collections.Counter()
+    started = threading.Barrier(2)
+
+    def send(record):
+        sent[record['index']] += 1
+        # Slow enough that both threads are replaying at the same time without the lock
+        time.sleep(0.005)
+
+    def replay():
+        started.wait()
+        spool.replay(send)
+
+    threads = [threading.Thread(target=replay) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    spool.replay(send)
+
+    assert sent == {i: 1 for i in range(20)}
+    spool.close()